@@ -0,0 +1,245 @@
+"""
+Congestion-aware evacuation of many people at once.
+
+People are planned one after another (cooperative A*): every planned route
+is written into a reservation table, so later people avoid cells that are
+already full at that tick. Cells hold `capacity` people per tick and each
+exit lets `exit_capacity` people out per tick (unlimited by default), which
+models narrow corridors and doors.
+
+Each search runs over safe intervals (SIPP) rather than single ticks: a state
+is a cell together with a maximal run of ticks in which it has room, reached
+at the earliest possible tick. Waiting inside an interval costs nothing extra
+to search, so a person queueing for a door does not blow up the state space.
+The exit distance field is the heuristic; it is exact on an empty building.
+
+The result reports each person's timed route and arrival tick, and the total
+evacuation time (the tick at which the last person leaves).
+"""
+import heapq
+from bisect import bisect_right
+
+from .distance_field import UNREACHABLE, compute_distance_field
+from .pathfinding import EXIT, PERSON
+from .progress import FRONTIER_SAMPLE, REPORT_EVERY
+
+FOREVER = float("inf")
+
+
+class ReservationTable:
+    """Number of people in each cell at each tick, shared by all planned routes"""
+
+    def __init__(self, exits, capacity=1, exit_capacity=None):
+        self.exits = exits
+        self.capacity = capacity
+        self.exit_capacity = exit_capacity
+        self.counts = {}
+        # Cell -> (run starts, run ends): sorted, merged runs of ticks at which it is full
+        self.full = {}
+        self.moves = set()
+        # Start cells of people not planned yet: they may still be standing there
+        self.parked = set()
+
+    def limit(self, idx):
+        return self.exit_capacity if self.exits[idx] else self.capacity
+
+    def occupy(self, t, idx):
+        count = self.counts.get((t, idx), 0) + 1
+        self.counts[(t, idx)] = count
+        limit = self.limit(idx)
+        if limit is not None and count == limit:
+            self._mark_full(idx, t)
+
+    def _mark_full(self, idx, t):
+        starts, ends = self.full.setdefault(idx, ([], []))
+        i = bisect_right(starts, t)
+        join_left = i > 0 and ends[i - 1] == t - 1
+        join_right = i < len(starts) and starts[i] == t + 1
+        if join_left and join_right:
+            ends[i - 1] = ends[i]
+            del starts[i], ends[i]
+        elif join_left:
+            ends[i - 1] = t
+        elif join_right:
+            starts[i] = t
+        else:
+            starts.insert(i, t)
+            ends.insert(i, t)
+
+    def reserve(self, schedule):
+        for t, idx in enumerate(schedule):
+            self.occupy(t, idx)
+            if t:
+                self.moves.add((t, schedule[t - 1], idx))
+
+    def next_interval(self, idx, t):
+        """The first safe interval (first, last) of idx that contains or follows tick t"""
+        runs = self.full.get(idx)
+        if not runs:
+            return 0, FOREVER
+        starts, ends = runs
+        i = bisect_right(starts, t)
+        first = ends[i - 1] + 1 if i else 0
+        last = starts[i] - 1 if i < len(starts) else FOREVER
+        return first, last
+
+
+class EvacuationPlan:
+    """Timed routes for every person, in the order the starts were given"""
+
+    def __init__(self, starts, schedules, shortest, expanded=0):
+        self.starts = list(starts)
+        self.schedules = schedules
+        self.arrival_times = [None if s is None else len(s) - 1 for s in schedules]
+        self.stranded = [start for start, s in zip(self.starts, schedules) if s is None]
+        # (cell, safe interval) states expanded over all searches
+        self.expanded = expanded
+
+        arrived = [t for t in self.arrival_times if t is not None]
+        self.evacuation_time = max(arrived, default=0)
+        self.total_person_time = sum(arrived)
+        # Ticks lost to congestion compared with everyone walking alone
+        self.congestion_delay = sum(
+            t - d for t, d in zip(self.arrival_times, shortest) if t is not None
+        )
+
+    def route(self, i):
+        """Cells visited by person i in the same form as astar(), waits removed"""
+        schedule = self.schedules[i]
+        if schedule is None:
+            return None
+        return [cell for prev, cell in zip(schedule, schedule[1:]) if cell != prev]
+
+    def routes(self):
+        return [self.route(i) for i in range(len(self.starts))]
+
+
+def _safe_interval_astar(start, dist, rows, cols, table, horizon, progress=None):
+    """Earliest-arrival schedule (one cell per tick) from start to an exit, and the states expanded"""
+    first, _ = table.next_interval(start, 0)
+    if first > 0:
+        return None, 0
+    state = (start, 0)
+    h = dist[start]
+    open_set = [(h, h, 0, state)]
+    # state -> (arrival tick, parent state)
+    arrival = {state: (0, None)}
+    closed = set()
+    next_interval = table.next_interval
+    exits, parked = table.exits, table.parked
+    moves = table.moves if table.capacity == 1 else ()
+
+    while open_set:
+        _, h, t, state = heapq.heappop(open_set)
+        if state in closed:
+            continue
+        closed.add(state)
+        idx = state[0]
+        if progress is not None and not len(closed) % REPORT_EVERY:
+            progress.report(len(closed), [divmod(entry[-1][0], cols) for entry in open_set[:FRONTIER_SAMPLE]])
+
+        if exits[idx]:
+            reverse = []
+            while True:
+                t_in, parent = arrival[state]
+                reverse.append(state[0])
+                if parent is None:
+                    break
+                # waited in the parent cell until the tick before moving
+                reverse.extend([parent[0]] * (t_in - 1 - arrival[parent][0]))
+                state = parent
+            reverse.reverse()
+            return reverse, len(closed)
+
+        # The person may stay here until its safe interval closes
+        leave_by = min(next_interval(idx, t)[1], horizon - 1)
+
+        r, c = divmod(idx, cols)
+        options = []
+        if r > 0:
+            options.append(idx - cols)
+        if r < rows - 1:
+            options.append(idx + cols)
+        if c > 0:
+            options.append(idx - 1)
+        if c < cols - 1:
+            options.append(idx + 1)
+
+        for nb in options:
+            d = dist[nb]
+            if d == UNREACHABLE or nb in parked:
+                continue
+            # Enter each safe interval of nb that opens before we have to leave
+            nt = t + 1
+            while nt <= leave_by + 1:
+                first, last = next_interval(nb, nt)
+                if first > nt:
+                    nt = first
+                    if nt > leave_by + 1:
+                        break
+                # With one person per cell, two people may not swap places head-on
+                if (nt, nb, idx) in moves:
+                    nt += 1
+                    continue
+                key = (nb, first)
+                if key not in closed and nt < arrival.get(key, (FOREVER,))[0]:
+                    arrival[key] = (nt, state)
+                    heapq.heappush(open_set, (nt + d, d, nt, key))
+                nt = last + 1
+
+    return None, len(closed)
+
+
+def plan_evacuation(grid, starts=None, capacity=1, exit_capacity=None, horizon=None, field=None,
+                    progress=None):
+    """
+    Plan every person's route to an exit with cooperative A*.
+
+    starts defaults to every PERSON cell. People closest to an exit are planned
+    first so they clear the way for those behind them; until their turn, the
+    others are obstacles that earlier routes must walk around. horizon caps the
+    tick at which anyone may still arrive; by default it is the longest
+    shortest path plus two ticks per person. Anyone who cannot reach an exit
+    within it (or at all) is listed in plan.stranded. A SearchProgress
+    passed as progress is updated while people are planned.
+    """
+    if field is None:
+        field = compute_distance_field(grid)
+    rows, cols = field.shape
+
+    if starts is None:
+        starts = [(r, c) for r in range(rows) for c in range(cols) if grid[r][c] == PERSON]
+    starts = list(starts)
+
+    dist = field.dist.tolist()
+    exits = [False] * (rows * cols)
+    for r in range(rows):
+        for c in range(cols):
+            if grid[r][c] == EXIT:
+                exits[r * cols + c] = True
+
+    cells = [r * cols + c for r, c in starts]
+    shortest = [dist[idx] for idx in cells]
+    if horizon is None:
+        horizon = max((d for d in shortest if d != UNREACHABLE), default=0) + 2 * len(starts)
+
+    table = ReservationTable(exits, capacity, exit_capacity)
+    table.parked.update(cells)
+
+    schedules = [None] * len(starts)
+    expanded = 0
+    order = sorted(range(len(starts)), key=lambda i: shortest[i])
+    for i in order:
+        table.parked.discard(cells[i])
+        if shortest[i] == UNREACHABLE:
+            continue
+        schedule, searched = _safe_interval_astar(cells[i], dist, rows, cols, table, horizon, progress)
+        expanded += searched
+        if progress is not None:
+            progress.finish(searched)
+        if schedule is None:
+            continue
+        table.reserve(schedule)
+        schedules[i] = [(idx // cols, idx % cols) for idx in schedule]
+
+    return EvacuationPlan(starts, schedules, shortest, expanded)
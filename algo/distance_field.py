@@ -0,0 +1,109 @@
+"""
+Multi-source exit distance field.
+
+A single breadth-first pass that starts from every EXIT cell at once labels
+each cell with its step count to the nearest exit and with the neighbouring
+cell to move to next. After that O(cells) pass, the evacuation path for any
+person is a walk along the next-step array, O(path length), so routing many
+people costs one search instead of one A* per person.
+
+The BFS is level-synchronous over flat NumPy index arrays, so it scales to
+grids of several thousand cells per side (e.g. 4096x4096).
+"""
+import numpy as np
+
+from .pathfinding import BLOCKED, EXIT
+from .progress import FRONTIER_SAMPLE
+
+UNREACHABLE = -1
+
+
+class DistanceField:
+    """Per-cell distance to the nearest exit and next step towards it"""
+
+    def __init__(self, shape, dist, next_step):
+        self.shape = shape
+        self.dist = dist
+        self.next_step = next_step
+
+    def _index(self, cell):
+        return cell[0] * self.shape[1] + cell[1]
+
+    def distance(self, cell):
+        """Steps from cell to the nearest exit, or None if no exit is reachable"""
+        d = int(self.dist[self._index(cell)])
+        return None if d == UNREACHABLE else d
+
+    def path(self, start):
+        """
+        Path from start to the nearest exit in the same form as astar():
+        a list of (row, col) cells excluding start and ending on the exit.
+        """
+        idx = self._index(start)
+        if self.dist[idx] == UNREACHABLE:
+            return None
+        cols = self.shape[1]
+        path = []
+        while self.dist[idx] > 0:
+            idx = int(self.next_step[idx])
+            path.append((idx // cols, idx % cols))
+        return path
+
+    def paths(self, starts):
+        return [self.path(s) for s in starts]
+
+    def as_grid(self):
+        """Distances reshaped to the grid (UNREACHABLE for cut-off cells)"""
+        return self.dist.reshape(self.shape)
+
+
+def compute_distance_field(grid, blocked=BLOCKED, sources=(EXIT,), progress=None):
+    """
+    Run one multi-source BFS from every source cell over a list-of-lists or
+    NumPy grid and return a DistanceField. A SearchProgress passed as
+    progress hears about every BFS level, with the new level as frontier.
+    """
+    cells = np.asarray(grid, dtype=np.uint8)
+    rows, cols = cells.shape
+    flat = cells.ravel()
+    n = flat.size
+
+    passable = ~np.isin(flat, blocked)
+    dist = np.full(n, UNREACHABLE, dtype=np.int32)
+    next_step = np.full(n, UNREACHABLE, dtype=np.int64)
+
+    frontier = np.flatnonzero(np.isin(flat, sources) & passable)
+    dist[frontier] = 0
+    level = 0
+    reached = int(frontier.size)
+
+    while frontier.size:
+        level += 1
+        r = frontier // cols
+        c = frontier % cols
+
+        up = frontier[r > 0]
+        down = frontier[r < rows - 1]
+        left = frontier[c > 0]
+        right = frontier[c < cols - 1]
+        candidates = np.concatenate((up - cols, down + cols, left - 1, right + 1))
+        parents = np.concatenate((up, down, left, right))
+
+        fresh = passable[candidates] & (dist[candidates] == UNREACHABLE)
+        candidates, parents = candidates[fresh], parents[fresh]
+
+        # Several frontier cells may reach the same cell. The fancy-index
+        # store keeps one parent per cell; the entries whose parent survived
+        # form the next frontier without duplicates and without sorting.
+        next_step[candidates] = parents
+        frontier = candidates[next_step[candidates] == parents]
+        dist[frontier] = level
+        reached += int(frontier.size)
+        if progress is not None:
+            sample = frontier[:FRONTIER_SAMPLE]
+            progress.report(reached, list(zip((sample // cols).tolist(), (sample % cols).tolist())))
+
+    if progress is not None:
+        progress.finish(reached)
+
+    return DistanceField((rows, cols), dist, next_step)
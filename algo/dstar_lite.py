@@ -0,0 +1,171 @@
+"""
+D* Lite over the 4-connected grid (Koenig & Likhachev, 2002).
+
+The search runs backwards from every exit to the person. When the person
+moves, only the heuristic offset km changes; when cells become blocked or
+free, only the vertices whose shortest distance actually changes are
+re-expanded, instead of searching the whole grid again.
+
+Moving into a cell costs 1 unless the cell is blocked, so the person may
+always leave the cell they are standing on.
+"""
+import heapq
+
+from .pathfinding import BLOCKED, EXIT
+
+INF = float("inf")
+
+
+class DStarLite:
+    def __init__(self, grid, start, blocked=BLOCKED):
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        flat = [cell for row in grid for cell in row]
+        n = len(flat)
+
+        self.blocked = bytearray(cell in blocked for cell in flat)
+        self.goal = bytearray(cell == EXIT for cell in flat)
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.km = 0
+        self.start = self.last = start[0] * self.cols + start[1]
+        self.queue = []
+        self.keys = {}
+        # Vertices expanded over the planner's lifetime
+        self.expanded = 0
+
+        for idx in range(n):
+            if self.goal[idx]:
+                self.rhs[idx] = 0
+                self._push(idx)
+
+    # ---------- helpers ----------
+
+    def _h(self, idx):
+        r, c = divmod(idx, self.cols)
+        sr, sc = divmod(self.start, self.cols)
+        return abs(r - sr) + abs(c - sc)
+
+    def _key(self, idx):
+        m = min(self.g[idx], self.rhs[idx])
+        return (m + self._h(idx) + self.km, m)
+
+    def _push(self, idx):
+        key = self._key(idx)
+        self.keys[idx] = key
+        heapq.heappush(self.queue, (key[0], key[1], idx))
+
+    def _neighbors(self, idx):
+        r, c = divmod(idx, self.cols)
+        result = []
+        if r > 0:
+            result.append(idx - self.cols)
+        if r < self.rows - 1:
+            result.append(idx + self.cols)
+        if c > 0:
+            result.append(idx - 1)
+        if c < self.cols - 1:
+            result.append(idx + 1)
+        return result
+
+    def _best(self, idx):
+        """rhs of a non-goal vertex: one step to the best unblocked neighbour"""
+        g, blocked = self.g, self.blocked
+        best = INF
+        for nb in self._neighbors(idx):
+            if not blocked[nb] and g[nb] + 1 < best:
+                best = g[nb] + 1
+        return best
+
+    def _update_vertex(self, idx):
+        if self.g[idx] != self.rhs[idx]:
+            self._push(idx)
+        else:
+            # stale heap entries are skipped when popped
+            self.keys.pop(idx, None)
+
+    # ---------- public API ----------
+
+    def compute_shortest_path(self):
+        g, rhs, queue, keys = self.g, self.rhs, self.queue, self.keys
+        start = self.start
+        while queue:
+            k1, k2, u = queue[0]
+            if keys.get(u) != (k1, k2):
+                heapq.heappop(queue)
+                continue
+            if (k1, k2) >= self._key(start) and rhs[start] <= g[start]:
+                break
+            heapq.heappop(queue)
+
+            new_key = self._key(u)
+            if (k1, k2) < new_key:
+                keys[u] = new_key
+                heapq.heappush(queue, (new_key[0], new_key[1], u))
+                continue
+            del keys[u]
+            self.expanded += 1
+
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                if not self.blocked[u]:
+                    for p in self._neighbors(u):
+                        if not self.goal[p] and rhs[p] > g[u] + 1:
+                            rhs[p] = g[u] + 1
+                            self._update_vertex(p)
+            else:
+                g_old = g[u]
+                g[u] = INF
+                if not self.goal[u]:
+                    rhs[u] = self._best(u)
+                self._update_vertex(u)
+                if not self.blocked[u]:
+                    for p in self._neighbors(u):
+                        if not self.goal[p] and rhs[p] == g_old + 1:
+                            rhs[p] = self._best(p)
+                            self._update_vertex(p)
+
+    def move_to(self, cell):
+        """The person moved; keep the queue keys valid without re-sorting"""
+        idx = cell[0] * self.cols + cell[1]
+        self.start = idx
+        self.km += self._h(self.last)
+        self.last = idx
+
+    def set_blocked(self, cells, value=True):
+        """Block (or free) flat cell indices and repair the affected vertices"""
+        changed = []
+        for idx in cells:
+            if self.blocked[idx] != value:
+                self.blocked[idx] = value
+                changed.append(idx)
+        for v in changed:
+            for u in self._neighbors(v):
+                if not self.goal[u]:
+                    self.rhs[u] = self._best(u)
+                    self._update_vertex(u)
+        return len(changed)
+
+    def distance(self):
+        # The loop may stop with the start itself overconsistent; its
+        # neighbours are settled, so the one-step lookahead rhs is exact.
+        d = self.rhs[self.start]
+        return None if d == INF else int(d)
+
+    def path(self):
+        """Current route in the same form as astar(): cells after start, ending on an exit"""
+        if self.rhs[self.start] == INF:
+            return None
+        cols, g, blocked = self.cols, self.g, self.blocked
+        idx = self.start
+        path = []
+        while not self.goal[idx]:
+            nxt = min(
+                (nb for nb in self._neighbors(idx) if not blocked[nb]),
+                key=g.__getitem__, default=None
+            )
+            if nxt is None or g[nxt] == INF or len(path) > len(g):
+                return None
+            idx = nxt
+            path.append((idx // cols, idx % cols))
+        return path
@@ -1,16 +1,34 @@
+import argparse
+import os
 import tkinter as tk
-from tkinter import messagebox
-import heapq
+from tkinter import filedialog, messagebox
+
+from .pathfinding import EMPTY, WALL, FIRE, EXIT, PERSON, PATH
+from .engine import validate_counts, diagnose, EvacuationJob, find_cells, clear_paths, mark_paths, initial_scenario
+from .fire import FireEvacuation
+from .grid_core import GridCore
+from .grid_files import load_grid
+from .grid_view import GridView
+from .path_cache import PathCache
+from .risk import RISK_WEIGHT, clearance, fire_distance
+
+# Default grid size and zoom; larger grids and maps scroll inside the viewport
 ROWS = 10
 COLS = 15
 CELL_SIZE = 40
-
-EMPTY = 0
-WALL = 1
-FIRE = 2
-EXIT = 3
-PERSON = 4
-PATH = 5
+VIEW_WIDTH = COLS * CELL_SIZE
+VIEW_HEIGHT = ROWS * CELL_SIZE
+MAP_FILETYPES = [
+    ("Floor plans and grids", "*.png *.csv *.txt *.json *.evg *.evz"),
+    ("All files", "*.*"),
+]
+FIRE_TICK_MS = 400
+# Drag events are applied at most once per frame (~60 fps)
+FRAME_MS = 16
+# How often a running search is polled for progress
+POLL_MS = 50
+# Largest fire safety margin offered by the routing slider
+MAX_SAFETY_MARGIN = 10
 
 COLORS = {
     EMPTY: "#ffffff",
@@ -32,65 +50,45 @@ INFO_COLOR = "#3498db"
 BORDER_COLOR = "#d5d8dc"
 TEXT_SECONDARY = "#7f8c8d"
 SHADOW_COLOR = "#bdc3c7"
-def heuristic(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-def astar(grid, start, goals):
-    rows = len(grid)
-    cols = len(grid[0])
-
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-
-    came_from = {}
-    g_score = {start: 0}
-
-    while open_set:
-        _, current = heapq.heappop(open_set)
-
-        if current in goals:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.reverse()
-            return path
-
-        for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-            nr, nc = current[0] + dx, current[1] + dy
-
-            if 0 <= nr < rows and 0 <= nc < cols:
-                if grid[nr][nc] in (WALL, FIRE):
-                    continue
-
-                neighbor = (nr, nc)
-                tentative_g = g_score[current] + 1
-
-                if tentative_g < g_score.get(neighbor, float("inf")):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score = tentative_g + min(
-                        heuristic(neighbor, g) for g in goals
-                    )
-                    heapq.heappush(open_set, (f_score, neighbor))
-
-    return None
+
+
 class EvacuationGUI:
-    def __init__(self, root):
+    def __init__(self, root, rows=ROWS, cols=COLS, grid=None):
         self.root = root
         self.root.title("🚨 Emergency Evacuation System - A* Pathfinding")
         self.root.configure(bg=BG_COLOR)
         self.root.resizable(False, False)
 
-        self.grid = [[EMPTY for _ in range(COLS)] for _ in range(ROWS)]
+        if grid is not None:
+            rows, cols = len(grid), len(grid[0])
+        self.rows = rows
+        self.cols = cols
+        self.grid = GridCore(rows, cols)
         self.current_mode = WALL
         self.mode_buttons = {}  
+        self.pending_cells = []
+        self.last_cell = None
+        self.drag_scheduled = False
+        # Background search started by start_evacuation(), if one is running
+        self.job = None
+        # Fire simulation started by simulate_fire() and its pending tick (after id)
+        self.fire_sim = None
+        self.fire_after = None
+        # Finished evacuations by grid content; edits re-file or drop them
+        self.path_cache = PathCache(self.grid)
+        # Routes currently drawn as PATH cells, cleared before the next run
+        self.drawn_paths = []
 
         self.create_layout()
         self.draw_grid()
         
         if WALL in self.mode_buttons:
             self.set_mode(WALL)
-        self.load_initial_scenario()
+        if grid is not None:
+            self.set_grid(grid)
+            self.status.config(text=f"📂 Map loaded: {self.rows} × {self.cols} cells")
+        else:
+            self.load_initial_scenario()
         self.update_grid_status()
 
 
@@ -136,8 +134,8 @@ class EvacuationGUI:
 
         self.canvas = tk.Canvas(
             canvas_frame,
-            width=COLS * CELL_SIZE + 4,
-            height=ROWS * CELL_SIZE + 4,
+            width=VIEW_WIDTH + 4,
+            height=VIEW_HEIGHT + 4,
             bg="#e0e0e0",
             highlightthickness=3,
             highlightbackground="#b0b0b0",
@@ -145,9 +143,21 @@ class EvacuationGUI:
             relief=tk.FLAT,
             cursor="crosshair"
         )
-        self.canvas.pack()
+        self.canvas.grid(row=0, column=0)
         self.canvas.bind("<Button-1>", self.handle_click)
-        self.canvas.bind("<B1-Motion>", self.handle_click)  # Allow dragging
+        self.canvas.bind("<B1-Motion>", self.handle_drag)  # Allow dragging
+        # Wheel scrolls; Shift+wheel scrolls sideways; Ctrl+wheel zooms
+        self.canvas.bind("<MouseWheel>", self.handle_wheel)
+        self.canvas.bind("<Button-4>", self.handle_wheel)
+        self.canvas.bind("<Button-5>", self.handle_wheel)
+
+        self.view = GridView(self.canvas, self.rows, self.cols, CELL_SIZE, COLORS, VIEW_WIDTH, VIEW_HEIGHT)
+        y_scroll = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.view.yview)
+        y_scroll.grid(row=0, column=1, sticky="ns")
+        x_scroll = tk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.view.xview)
+        x_scroll.grid(row=1, column=0, sticky="ew")
+        self.view.yscroll = y_scroll.set
+        self.view.xscroll = x_scroll.set
 
         right_frame = tk.Frame(
             main_container, 
@@ -200,6 +210,57 @@ class EvacuationGUI:
         self.create_button(modes_frame, "👤 Person", PERSON, COLORS[PERSON], "#2980b9")
         self.create_button(modes_frame, "🧹 Clear", EMPTY, "#95a5a6", "#7f8c8d")
 
+        # Routing: 0 takes the shortest routes, a margin keeps routes that many cells from fire
+        routing_label = tk.Label(
+            parent,
+            text="Fire Safety Margin (0 = shortest route):",
+            font=("Segoe UI", 11, "bold"),
+            bg=PANEL_BG,
+            fg=ACCENT_COLOR,
+            anchor="w"
+        )
+        routing_label.pack(fill=tk.X, padx=20, pady=(0, 5))
+
+        self.safety_margin = tk.IntVar(value=0)
+        tk.Scale(
+            parent,
+            from_=0,
+            to=MAX_SAFETY_MARGIN,
+            orient=tk.HORIZONTAL,
+            variable=self.safety_margin,
+            bg=PANEL_BG,
+            fg=ACCENT_COLOR,
+            highlightthickness=0,
+            troughcolor=BORDER_COLOR
+        ).pack(fill=tk.X, padx=20, pady=(0, 5))
+
+        # Spread crowds over all exits by door width instead of the nearest one
+        self.balance_exits = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            parent,
+            text="⚖️ Balance people over exits",
+            variable=self.balance_exits,
+            font=("Segoe UI", 10),
+            bg=PANEL_BG,
+            fg=ACCENT_COLOR,
+            activebackground=PANEL_BG,
+            anchor="w"
+        ).pack(fill=tk.X, padx=20, pady=(0, 5))
+
+        # Cluster graph kept between runs: slow to build once, then edits
+        # only rebuild the clusters they touch (worth it on large maps)
+        self.hierarchical = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            parent,
+            text="🧭 Hierarchical routing (large maps)",
+            variable=self.hierarchical,
+            font=("Segoe UI", 10),
+            bg=PANEL_BG,
+            fg=ACCENT_COLOR,
+            activebackground=PANEL_BG,
+            anchor="w"
+        ).pack(fill=tk.X, padx=20, pady=(0, 15))
+
         # Action buttons section
         action_label = tk.Label(
             parent,
@@ -234,6 +295,45 @@ class EvacuationGUI:
         self.start_btn.bind("<Enter>", lambda e: self.start_btn.config(bg="#229954", relief=tk.RAISED))
         self.start_btn.bind("<Leave>", lambda e: self.start_btn.config(bg=SUCCESS_COLOR, relief=tk.FLAT))
 
+        # Stop button, enabled while a search runs
+        self.stop_btn = tk.Button(
+            actions_frame,
+            text="⏹ Stop Search",
+            bg=WARNING_COLOR,
+            fg="white",
+            font=("Segoe UI", 11),
+            command=self.stop_evacuation,
+            relief=tk.FLAT,
+            bd=0,
+            cursor="hand2",
+            padx=15,
+            pady=8,
+            activebackground="#d68910",
+            activeforeground="white",
+            state=tk.DISABLED
+        )
+        self.stop_btn.pack(fill=tk.X, pady=(0, 10))
+
+        # Fire simulation button
+        fire_btn = tk.Button(
+            actions_frame,
+            text="🔥 Simulate Fire Spread",
+            bg=DANGER_COLOR,
+            fg="white",
+            font=("Segoe UI", 11),
+            command=self.simulate_fire,
+            relief=tk.FLAT,
+            bd=0,
+            cursor="hand2",
+            padx=15,
+            pady=8,
+            activebackground="#c0392b",
+            activeforeground="white"
+        )
+        fire_btn.pack(fill=tk.X, pady=(0, 10))
+        fire_btn.bind("<Enter>", lambda e: fire_btn.config(bg="#c0392b", relief=tk.RAISED))
+        fire_btn.bind("<Leave>", lambda e: fire_btn.config(bg=DANGER_COLOR, relief=tk.FLAT))
+
         # Reset button
         reset_btn = tk.Button(
             actions_frame,
@@ -250,7 +350,44 @@ class EvacuationGUI:
             activebackground="#7f8c8d",
             activeforeground="white"
         )
-        reset_btn.pack(fill=tk.X)
+        reset_btn.pack(fill=tk.X, pady=(0, 10))
+
+        # Map import and zoom
+        map_btn = tk.Button(
+            actions_frame,
+            text="📂 Load Map",
+            bg=INFO_COLOR,
+            fg="white",
+            font=("Segoe UI", 11),
+            command=self.open_map,
+            relief=tk.FLAT,
+            bd=0,
+            cursor="hand2",
+            padx=15,
+            pady=8,
+            activebackground="#2980b9",
+            activeforeground="white"
+        )
+        map_btn.pack(fill=tk.X, pady=(0, 10))
+
+        zoom_frame = tk.Frame(actions_frame, bg=PANEL_BG)
+        zoom_frame.pack(fill=tk.X)
+        for text, command in (("🔍 +", lambda: self.zoom(1)), ("🔍 −", lambda: self.zoom(-1)),
+                              ("⤢ Fit", self.zoom_to_fit)):
+            tk.Button(
+                zoom_frame,
+                text=text,
+                bg="#95a5a6",
+                fg="white",
+                font=("Segoe UI", 10),
+                command=command,
+                relief=tk.FLAT,
+                bd=0,
+                cursor="hand2",
+                pady=6,
+                activebackground="#7f8c8d",
+                activeforeground="white"
+            ).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=2)
         reset_btn.bind("<Enter>", lambda e: reset_btn.config(bg="#7f8c8d", relief=tk.RAISED))
         reset_btn.bind("<Leave>", lambda e: reset_btn.config(bg="#95a5a6", relief=tk.FLAT))
 
@@ -282,7 +419,18 @@ class EvacuationGUI:
             wraplength=220,
             justify=tk.LEFT
         )
-        self.status.pack(pady=(0, 12), padx=12)
+        self.status.pack(pady=(0, 6), padx=12)
+
+        self.cache_status = tk.Label(
+            status_frame,
+            text="🗄️ Path cache: empty",
+            font=("Segoe UI", 9),
+            bg="#f8f9fa",
+            fg=TEXT_SECONDARY,
+            wraplength=220,
+            justify=tk.LEFT
+        )
+        self.cache_status.pack(pady=(0, 12), padx=12)
 
         # Legend section with enhanced styling
         legend_frame = tk.Frame(
@@ -389,16 +537,87 @@ class EvacuationGUI:
         
         mode_name = mode_names.get(mode, 'Unknown')
         self.status.config(text=f"✓ Mode: {mode_name}")
+
+    def busy(self):
+        """A search or a fire simulation is running; the grid must not change under it"""
+        return self.job is not None or self.fire_after is not None
+
     def handle_click(self, event):
-        col = event.x // CELL_SIZE
-        row = event.y // CELL_SIZE
+        if self.busy():
+            return
+        cell = self.view.cell_at(event.x, event.y)
+        self.last_cell = cell
+        if cell is None:
+            return
+        self.paint_cell(*cell)
+        self.view.flush()
 
-        if 0 <= row < ROWS and 0 <= col < COLS:
-            self.grid[row][col] = self.current_mode
-            self.draw_grid()
-            
-            # Update status with grid readiness
+        # Update status with grid readiness
+        self.update_grid_status()
+
+    def handle_drag(self, event):
+        """Queue the cell under the pointer; queued cells are painted once per frame"""
+        if self.busy():
+            return
+        cell = self.view.cell_at(event.x, event.y)
+        if cell is None:
+            return
+        self.pending_cells.append(cell)
+        if not self.drag_scheduled:
+            self.drag_scheduled = True
+            self.root.after(FRAME_MS, self.flush_drag)
+
+    def flush_drag(self):
+        self.drag_scheduled = False
+        pending, self.pending_cells = self.pending_cells, []
+        for cell in pending:
+            # Fill the cells between two motion events so fast drags leave no gaps
+            for row, col in cells_between(self.last_cell or cell, cell):
+                self.paint_cell(row, col)
+            self.last_cell = cell
+        if pending:
+            self.view.flush()
             self.update_grid_status()
+
+    def paint_cell(self, row, col):
+        if 0 <= row < self.rows and 0 <= col < self.cols and self.grid[row][col] != self.current_mode:
+            self.set_code(row, col, self.current_mode)
+            self.view.set_cell(row, col, self.current_mode)
+
+    def set_code(self, row, col, code):
+        """Change one cell and tell the path cache about it"""
+        self.path_cache.edit(row, col, self.grid[row][col], code)
+        self.grid[row][col] = code
+
+    def clear_drawn_paths(self):
+        """Turn the routes drawn by the last run back into floor, without a full grid scan"""
+        for path in self.drawn_paths:
+            for r, c in path or ():
+                if self.grid[r][c] == PATH:
+                    self.grid[r][c] = EMPTY
+                    self.view.set_cell(r, c, EMPTY)
+        self.drawn_paths = []
+        self.view.flush()
+
+    def show_cache_stats(self):
+        self.cache_status.config(text=self.path_cache.stats())
+
+    def handle_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        if event.state & 0x0004:  # Control
+            self.zoom(1 if up else -1, anchor=(event.x, event.y))
+        elif event.state & 0x0001:  # Shift
+            self.view.xview("scroll", -3 if up else 3, "units")
+        else:
+            self.view.yview("scroll", -3 if up else 3, "units")
+
+    def zoom(self, steps, anchor=None):
+        self.view.zoom(steps, anchor)
+        self.status.config(text=f"🔍 Zoom: {self.view.cell_size} px per cell")
+
+    def zoom_to_fit(self):
+        self.view.set_zoom(self.view.fit_zoom())
+        self.status.config(text=f"🔍 Zoom: {self.view.cell_size} px per cell")
     
     def update_grid_status(self):
         validation = self.validate_grid()
@@ -411,145 +630,22 @@ class EvacuationGUI:
         else:
             self.status.config(text="Ready to build map")
     def draw_grid(self):
-        self.canvas.delete("all")
-
-        for r in range(ROWS):
-            for c in range(COLS):
-                x = c * CELL_SIZE
-                y = r * CELL_SIZE
-                cell = self.grid[r][c]
-
-                # ممرات (أرضية)
-                if cell == EMPTY:
-                    self.canvas.create_rectangle(
-                        x, y,
-                        x + CELL_SIZE, y + CELL_SIZE,
-                        fill="#ecf0f1",
-                        outline="#bdc3c7"
-                    )
-
-                # جدران (سميكة)
-                elif cell == WALL:
-                    self.canvas.create_rectangle(
-                        x, y,
-                        x + CELL_SIZE, y + CELL_SIZE,
-                        fill=COLORS[WALL],
-                        outline=COLORS[WALL]
-                    )
-
-                # مخرج (باب)
-                elif cell == EXIT:
-                    self.canvas.create_rectangle(
-                        x + 6, y + 6,
-                        x + CELL_SIZE - 6, y + CELL_SIZE - 6,
-                        fill=COLORS[EXIT],
-                        outline="#145a32",
-                        width=3
-                    )
-                    self.canvas.create_text(
-                        x + CELL_SIZE//2,
-                        y + CELL_SIZE - 10,
-                        text="EXIT",
-                        fill="white",
-                        font=("Segoe UI", 8, "bold")
-                    )
-
-                # شخص (دائرة)
-                elif cell == PERSON:
-                    self.canvas.create_oval(
-                        x + 6, y + 6,
-                        x + CELL_SIZE - 6, y + CELL_SIZE - 6,
-                        fill=COLORS[PERSON],
-                        outline="#154360",
-                        width=2
-                    )
-
-                # حريق
-                elif cell == FIRE:
-                    self.canvas.create_rectangle(
-                        x, y,
-                        x + CELL_SIZE, y + CELL_SIZE,
-                        fill=COLORS[FIRE],
-                        outline="#922b21"
-                    )
-                    self.canvas.create_text(
-                        x + CELL_SIZE//2,
-                        y + CELL_SIZE//2,
-                        text="🔥",
-                        font=("Segoe UI", 14)
-                    )
-
-                # مسار الإخلاء
-                elif cell == PATH:
-                    self.canvas.create_rectangle(
-                        x + 2, y + 2,
-                        x + CELL_SIZE - 2, y + CELL_SIZE - 2,
-                        fill=COLORS[PATH],
-                        outline="#d68910",
-                        width=2
-                    )
-                    # Draw arrow indicator
-                    self.canvas.create_text(
-                        x + CELL_SIZE//2,
-                        y + CELL_SIZE//2,
-                        text="→",
-                        fill="white",
-                        font=("Segoe UI", 12, "bold")
-                    )
+        """Redraw the cells that changed since the last draw"""
+        self.view.refresh(self.grid)
 
     def validate_grid(self):
         """Validate that the grid has all required elements for evacuation"""
-        has_person = False
-        has_exit = False
-        has_wall = False
-        has_fire = False
-        
-        person_count = 0
-        exit_count = 0
-        
-        for r in range(ROWS):
-            for c in range(COLS):
-                cell = self.grid[r][c]
-                if cell == PERSON:
-                    has_person = True
-                    person_count += 1
-                elif cell == EXIT:
-                    has_exit = True
-                    exit_count += 1
-                elif cell == WALL:
-                    has_wall = True
-                elif cell == FIRE:
-                    has_fire = True
-        
-        errors = []
-        warnings = []
-        
-        # Required elements
-        if not has_person:
-            errors.append("Person")
-        elif person_count > 1:
-            warnings.append(f"Multiple persons ({person_count}) - using first one")
-        
-        if not has_exit:
-            errors.append("Exit")
-        elif exit_count == 0:
-            errors.append("Exit")
-        
-        # Optional but recommended
-        if not has_wall:
-            warnings.append("No walls placed")
-        
-        return {
-            'valid': len(errors) == 0,
-            'errors': errors,
-            'warnings': warnings,
-            'has_person': has_person,
-            'has_exit': has_exit,
-            'person_count': person_count,
-            'exit_count': exit_count
-        }
+        # The view counts the cells on screen, which match the grid after every draw
+        return validate_counts(self.view.counts)
 
     def start_evacuation(self):
+        if self.job is not None:
+            self.status.config(text="⏳ A search is already running")
+            return
+        if self.fire_after is not None:
+            self.status.config(text="⏳ Stop the fire simulation first")
+            return
+
         # Validate grid before starting
         validation = self.validate_grid()
         
@@ -575,35 +671,15 @@ class EvacuationGUI:
             self.status.config(text=f"⚠️ Missing: {missing}")
             return
         
-        # Show warnings if any
-        if validation['warnings']:
-            warnings_text = " | ".join(validation['warnings'])
-            self.status.config(text=f"ℹ️ {warnings_text}")
-            self.root.update()
-            self.root.after(2000)  # Show warning for 2 seconds
-        
-        self.status.config(text="⏳ Calculating path...")
-        self.root.update()
-        
         # تنظيف المسارات القديمة
-        for r in range(ROWS):
-            for c in range(COLS):
-                if self.grid[r][c] == PATH:
-                    self.grid[r][c] = EMPTY
+        self.clear_drawn_paths()
 
-        # البحث عن الشخص والمخارج
-        start = None
-        exits = []
-        for r in range(ROWS):
-            for c in range(COLS):
-                if self.grid[r][c] == PERSON:
-                    if start is None:  # Use first person if multiple
-                        start = (r, c)
-                elif self.grid[r][c] == EXIT:
-                    exits.append((r, c))
+        # البحث عن الأشخاص والمخارج
+        starts = find_cells(self.grid, PERSON)
+        exits = find_cells(self.grid, EXIT)
 
         # Double check (shouldn't happen after validation, but safety check)
-        if not start:
+        if not starts:
             messagebox.showerror(
                 "Error",
                 "Person not found on grid!\n\nPlease place a person on the grid before starting evacuation.",
@@ -621,20 +697,107 @@ class EvacuationGUI:
             self.status.config(text="❌ Error: No exits found on grid!")
             return
 
-        # Calculate path
-        path = astar(self.grid, start, exits)
-
-        if path is None:
-            # Check if person is completely blocked
-            blocked = True
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = start[0] + dx, start[1] + dy
-                if 0 <= nr < ROWS and 0 <= nc < COLS:
-                    if self.grid[nr][nc] not in (WALL, FIRE):
-                        blocked = False
-                        break
-            
-            if blocked:
+        # One distance-field pass routes every person; several persons
+        # sharing corridors and doors are planned together. With a safety
+        # margin, weighted A* keeps each route away from the fire instead;
+        # with balancing, people are spread over the exits by door width.
+        # Hierarchical routing reuses the engine's cluster graph from the
+        # previous run and only rebuilds what the edits touched.
+        # The search runs on a copy of the grid in a worker thread and is
+        # polled from here.
+        margin = self.safety_margin.get()
+        if margin > 0:
+            method = "safe"
+        elif self.balance_exits.get():
+            method = "balanced"
+        elif self.hierarchical.get():
+            method = "hpa"
+        else:
+            method = "auto"
+        # Show warnings if any, next to the progress
+        self.search_note = "".join(f" | ℹ️ {w}" for w in validation['warnings'])
+
+        # Same routing content, people and options as a cached run: reuse it
+        options = (method, margin if method == "safe" else 0)
+        cached = self.path_cache.get(starts, options)
+        self.show_cache_stats()
+        if cached is not None:
+            # The routes still hold, but fire may have moved closer to them
+            if validation['has_fire'] or cached.fire_clearance is not None:
+                cached.fire_clearance = clearance(fire_distance(self.grid), cached.paths)
+            self.show_evacuation(cached)
+            return
+        self.job_key = (starts, options)
+
+        self.job = EvacuationJob(self.grid.copy(), method, starts=starts, margin=margin).start()
+        self.start_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        self.status.config(text="⏳ Calculating path..." + self.search_note)
+        self.root.after(POLL_MS, self.poll_evacuation)
+
+    def stop_evacuation(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.status.config(text="⏹ Stopping search...")
+        elif self.fire_after is not None:
+            self.end_search()
+            self.status.config(text=f"⏹ Fire simulation stopped after {self.fire_sim.fire.tick} ticks")
+
+    def end_search(self):
+        """Forget the running search or fire simulation (if any) and restore the controls"""
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        if self.fire_after is not None:
+            self.root.after_cancel(self.fire_after)
+            self.fire_after = None
+        self.view.show_frontier([])
+        self.start_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+
+    def poll_evacuation(self):
+        job = self.job
+        if job is None:
+            return
+        if not job.done:
+            # Batched frontier animation: one overlay update per poll
+            self.view.show_frontier(job.progress.frontier)
+            self.status.config(
+                text=f"⏳ Searching... {job.progress.expanded:,} nodes expanded" + self.search_note
+            )
+            self.root.after(POLL_MS, self.poll_evacuation)
+            return
+
+        self.end_search()
+        if job.cancelled:
+            self.status.config(text=f"⏹ Search stopped after {job.progress.expanded:,} nodes")
+        elif job.error is not None:
+            messagebox.showerror("Search Failed", str(job.error), icon='error')
+            self.status.config(text=f"❌ Search failed: {job.error}")
+        else:
+            starts, (method, margin) = self.job_key
+            # Fire-aware costs reach margin cells from the fire and a step costs up to 1 + RISK_WEIGHT
+            self.path_cache.put(starts, (method, margin), job.result, radius=margin,
+                                cost_factor=1 + RISK_WEIGHT if method == "safe" else 1)
+            self.show_cache_stats()
+            self.show_evacuation(job.result)
+
+    def show_evacuation(self, result):
+        """Draw the routes of a finished search and report on them"""
+        validation = self.validate_grid()
+        exits = result.exits
+        paths = result.paths
+        plan = result.plan
+
+        mark_paths(self.grid, paths)
+        self.drawn_paths = paths
+        self.draw_grid()
+
+        if result.stranded:
+            start = result.stranded[0]
+            problem = diagnose(self.grid, start, exits)
+
+            if problem == "person_blocked":
                 error_msg = "Person is Completely Blocked!\n\n"
                 error_msg += "The person cannot move because all surrounding cells are blocked by walls or fire.\n\n"
                 error_msg += "Please remove walls or fire around the person to create a path."
@@ -648,19 +811,7 @@ class EvacuationGUI:
                 self.highlight_problem_areas(start, exits)
                 return
             
-            # Check if exits are reachable (at least one adjacent cell is not wall/fire)
-            exits_reachable = False
-            for exit_pos in exits:
-                for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                    nr, nc = exit_pos[0] + dx, exit_pos[1] + dy
-                    if 0 <= nr < ROWS and 0 <= nc < COLS:
-                        if self.grid[nr][nc] not in (WALL, FIRE):
-                            exits_reachable = True
-                            break
-                if exits_reachable:
-                    break
-            
-            if not exits_reachable:
+            if problem == "exits_blocked":
                 error_msg = "All Exits are Blocked!\n\n"
                 error_msg += "None of the exits are accessible because all paths to them are blocked.\n\n"
                 error_msg += "Please clear paths to the exits or add new accessible exits."
@@ -685,7 +836,7 @@ class EvacuationGUI:
             suggestions.append("• Ensure a clear route exists from person to exit")
             
             error_msg = "No Safe Path Found!\n\n"
-            error_msg += "The A* algorithm could not find a safe path from the person to any exit.\n\n"
+            error_msg += "The search could not find a safe path from the person to any exit.\n\n"
             error_msg += "Suggestions:\n" + "\n".join(suggestions)
             
             messagebox.showerror(
@@ -701,24 +852,142 @@ class EvacuationGUI:
             self.highlight_problem_areas(start, exits)
             return
 
-        # Success - display path
-        path_length = len(path)
-        self.status.config(text=f"✅ Path found! Distance: {path_length} cells")
+        # Success - all paths are already drawn
+        clearance = ""
+        if result.fire_clearance is not None:
+            clearance = f" | 🛡️ Closest to fire: {result.fire_clearance} cells"
+        if result.exit_clearance is not None:
+            clearance += " | 🚪 Exits clear after: " + " / ".join(map(str, result.exit_clearance)) + " steps"
+        if len(paths) == 1:
+            self.status.config(text=f"✅ Path found! Distance: {len(paths[0])} cells" + clearance)
+        elif plan is not None or result.assignment is not None:
+            self.status.config(
+                text=f"✅ {len(paths)} persons evacuated in {result.evacuation_time} steps "
+                     f"(congestion delay: {result.congestion_delay})" + clearance
+            )
+        else:
+            longest = max(len(path) for path in paths)
+            self.status.config(
+                text=f"✅ Paths found for {len(paths)} persons! Longest: {longest} cells" + clearance
+            )
+    
+    def simulate_fire(self):
+        """Spread the fire tick by tick while the first person walks out"""
+        if self.job is not None:
+            self.status.config(text="⏳ Stop the running search first")
+            return
+        if self.fire_after is not None:
+            self.status.config(text="⏳ The fire simulation is already running")
+            return
+        validation = self.validate_grid()
+        if not validation['valid']:
+            self.status.config(text=f"⚠️ Missing: {', '.join(validation['errors'])}")
+            return
+        if not validation['has_fire']:
+            self.status.config(text="ℹ️ Place at least one fire cell to simulate spreading")
+            return
 
-        for r, c in path:
-            if self.grid[r][c] == EMPTY:
-                self.grid[r][c] = PATH
+        clear_paths(self.grid)
+        start = find_cells(self.grid, PERSON)[0]
 
+        self.fire_sim = FireEvacuation(self.grid, start)
+        self.show_fire_tick()
+        if self.fire_sim.outcome is None:
+            self.fire_after = self.root.after(FIRE_TICK_MS, self.fire_tick)
+            self.start_btn.config(state=tk.DISABLED)
+            self.stop_btn.config(state=tk.NORMAL)
+        else:
+            self.finish_fire_simulation()
+
+    def fire_tick(self):
+        self.fire_after = None
+        sim = self.fire_sim
+        previous = sim.position
+        stats = sim.step()
+        if self.grid[previous[0]][previous[1]] == PERSON:
+            self.set_code(previous[0], previous[1], EMPTY)
+        self.show_fire_tick()
+
+        if sim.outcome is not None:
+            self.finish_fire_simulation()
+            return
+        route = "safe route" if stats.safe else "⚠️ no safe route, crossing fire risk"
+        self.status.config(
+            text=f"🔥 Tick {stats.tick}: {int(sim.fire.burning.sum())} cells burning | "
+                 f"{route} | replanned in {stats.replan_seconds * 1000:.1f} ms"
+        )
+        self.fire_after = self.root.after(FIRE_TICK_MS, self.fire_tick)
+
+    def show_fire_tick(self):
+        sim = self.fire_sim
+        clear_paths(self.grid)
+        for r, c in sim.fire.burning_cells():
+            if self.grid[r][c] != FIRE:
+                self.set_code(r, c, FIRE)
+        mark_paths(self.grid, [sim.path])
+        self.drawn_paths = [sim.path]
+        r, c = sim.position
+        if self.grid[r][c] != EXIT:
+            self.set_code(r, c, PERSON)
         self.draw_grid()
-    
+
+    def finish_fire_simulation(self):
+        self.end_search()
+        sim = self.fire_sim
+        ticks = sim.fire.tick
+        if sim.outcome == "escaped":
+            replans = [h.replan_seconds for h in sim.history]
+            average = 1000 * sum(replans) / len(replans) if replans else 0.0
+            self.status.config(
+                text=f"✅ Escaped after {ticks} ticks! Average replan: {average:.2f} ms"
+            )
+            return
+        if sim.outcome == "caught":
+            message = "The fire reached the person before they could escape."
+        else:
+            message = "Every route to an exit is blocked by the fire."
+        messagebox.showerror("Evacuation Failed", message, icon='error')
+        self.status.config(text=f"❌ {sim.outcome.capitalize()} after {ticks} ticks")
+
     def highlight_problem_areas(self, start, exits):
         """Temporarily highlight person and exits when no path is found"""
         # The grid is already drawn, but we can add visual feedback
         # by ensuring person and exits are clearly visible
         # This is handled in draw_grid, but we could add a blinking effect
         pass
+    def set_grid(self, grid):
+        """Replace the grid, possibly with one of another size, and redraw it"""
+        self.end_search()
+        self.grid = grid
+        self.path_cache.reset(grid)
+        # Routes saved with the map are cleared like drawn ones
+        self.drawn_paths = [find_cells(grid, PATH)]
+        if (len(grid), len(grid[0])) != (self.rows, self.cols):
+            self.rows, self.cols = len(grid), len(grid[0])
+            self.view.set_shape(self.rows, self.cols)
+            self.view.set_zoom(min(CELL_SIZE, self.view.fit_zoom()))
+        self.draw_grid()
+
+    def open_map(self):
+        path = filedialog.askopenfilename(title="Load floor plan", filetypes=MAP_FILETYPES)
+        if path:
+            self.load_map(path)
+
+    def load_map(self, path):
+        """Load a PNG/CSV floor plan or a saved grid (see algo.grid_files)"""
+        try:
+            grid = load_grid(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Cannot Load Map", f"{os.path.basename(path)}:\n\n{e}", icon='error')
+            return
+        self.set_grid(grid)
+        self.status.config(text=f"📂 Map loaded: {self.rows} × {self.cols} cells")
+
     def reset_grid(self):
-        self.grid = [[EMPTY for _ in range(COLS)] for _ in range(ROWS)]
+        self.end_search()
+        self.grid = GridCore(self.rows, self.cols)
+        self.path_cache.reset(self.grid)
+        self.drawn_paths = []
         self.draw_grid()
         self.status.config(text="🔄 Grid reset. Ready to build map")
         # Update status after a brief delay to show current state
@@ -728,40 +997,36 @@ class EvacuationGUI:
         """
         Load a predefined initial evacuation scenario
         """
-        # تفريغ الشبكة أولاً
-        self.grid = [[EMPTY for _ in range(COLS)] for _ in range(ROWS)]
-
-        # 🧍‍♂️ الشخص
-        self.grid[7][2] = PERSON
-
-        # 🚪 المخرج
-        self.grid[1][13] = EXIT
-
-        # 🔥 الحريق
-        fire_positions = [
-            (4, 5), (4, 6), (5, 5), (5, 6),
-            (6, 6)
-        ]
-        for r, c in fire_positions:
-            self.grid[r][c] = FIRE
-
-        # 🧱 الجدران (لجعل السيناريو واقعي)
-        wall_positions = [
-            (2, 3), (2, 4), (2, 5),
-            (3, 3),
-            (6, 3), (7, 3), (8, 3),
-            (8, 4), (8, 5)
-        ]
-        for r, c in wall_positions:
-            self.grid[r][c] = WALL
+        if self.rows < ROWS or self.cols < COLS:
+            self.status.config(text=f"ℹ️ The initial scenario needs at least {ROWS} × {COLS} cells")
+            return
+        self.set_grid(initial_scenario(self.rows, self.cols))
 
         # تحديث الواجهة والحالة
-        self.draw_grid()
         self.status.config(
             text="📍 Initial scenario loaded: Person, Fire, Exit"
         )
 
+def cells_between(a, b):
+    """Cells on the straight line from a (exclusive) to b (inclusive)"""
+    steps = max(abs(b[0] - a[0]), abs(b[1] - a[1]))
+    return [
+        (a[0] + round((b[0] - a[0]) * i / steps), a[1] + round((b[1] - a[1]) * i / steps))
+        for i in range(1, steps + 1)
+    ] or [b]
+
+
 if __name__ == "__main__":
+    # Run from the repository root:
+    #   python -m algo.evacuation_system
+    #   python -m algo.evacuation_system --rows 500 --cols 800
+    #   python -m algo.evacuation_system --map floor_plan.png
+    parser = argparse.ArgumentParser(description="emergency evacuation system")
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--cols", type=int, default=COLS)
+    parser.add_argument("--map", help="floor plan or grid file to open (.png .csv .txt .json .evg .evz)")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = EvacuationGUI(root)
+    app = EvacuationGUI(root, args.rows, args.cols, load_grid(args.map) if args.map else None)
     root.mainloop()
@@ -0,0 +1,231 @@
+"""
+Time-stepped fire spread and evacuation under a moving fire.
+
+FireSpread is a stochastic cellular automaton: every tick, each burning cell
+ignites each non-wall 4-neighbour with probability spread_probability. Only
+the burning front is touched, so a tick costs O(front) rather than O(grid).
+
+IgnitionForecast predicts when each flammable cell will burn. Each hop takes
+1 / spread_probability ticks on average, so a cell k hops from the fire is
+expected to ignite k / p ticks from now. A route cell is blocked only when
+the fire is expected to reach it before the person does (plus safety_ticks);
+cells the person passes long before the fire arrives stay open.
+
+FireEvacuation moves a person one cell per tick while the fire spreads. The
+route is repaired with D* Lite after every tick instead of being replanned
+from scratch, and each tick's replanning latency is recorded. When every
+route crosses the forecast, a second D* Lite that only avoids burning cells
+gives the least bad way out.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .dstar_lite import INF, DStarLite
+from .pathfinding import WALL, FIRE, EXIT
+
+# Hop count of cells the fire has not reached
+UNREACHED = np.iinfo(np.int64).max
+
+TickStats = namedtuple("TickStats", "tick position ignited newly_blocked replan_seconds expanded safe")
+
+
+class FireSpread:
+    def __init__(self, grid, spread_probability=0.3, seed=None):
+        if not 0 < spread_probability <= 1:
+            raise ValueError("spread_probability must be in (0, 1]")
+        cells = np.asarray(grid, dtype=np.uint8)
+        self.shape = cells.shape
+        flat = cells.ravel()
+        self.spread_probability = spread_probability
+        self.flammable = flat != WALL
+        self.burning = flat == FIRE
+        # Burning cells that may still ignite a neighbour
+        self.front = np.flatnonzero(self.burning)
+        self.rng = np.random.default_rng(seed)
+        self.tick = 0
+
+    def _neighbors(self, cells):
+        rows, cols = self.shape
+        r = cells // cols
+        c = cells % cols
+        return (
+            np.concatenate((cells[r > 0] - cols, cells[r < rows - 1] + cols,
+                            cells[c > 0] - 1, cells[c < cols - 1] + 1)),
+            np.concatenate((cells[r > 0], cells[r < rows - 1],
+                            cells[c > 0], cells[c < cols - 1])),
+        )
+
+    def step(self):
+        """Advance one tick and return the flat indices of newly ignited cells"""
+        self.tick += 1
+        targets, sources = self._neighbors(self.front)
+        open_ = self.flammable[targets] & ~self.burning[targets]
+        targets, sources = targets[open_], sources[open_]
+
+        # A cell next to k burning cells ignites with probability 1 - (1 - p)^k
+        cells, exposure = np.unique(targets, return_counts=True)
+        chance = 1.0 - (1.0 - self.spread_probability) ** exposure
+        ignited = cells[self.rng.random(cells.size) < chance]
+        self.burning[ignited] = True
+
+        # Keep only front cells that still have something left to ignite
+        front = np.concatenate((np.unique(sources), ignited))
+        targets, sources = self._neighbors(front)
+        alive = self.flammable[targets] & ~self.burning[targets]
+        self.front = np.unique(sources[alive])
+        return ignited
+
+    def is_burning(self, cell):
+        return bool(self.burning[cell[0] * self.shape[1] + cell[1]])
+
+    def burning_cells(self):
+        cols = self.shape[1]
+        return [(int(i) // cols, int(i) % cols) for i in np.flatnonzero(self.burning)]
+
+
+class IgnitionForecast:
+    """
+    Hop distance to the fire for every flammable cell, kept up to date as
+    cells ignite. expected_ignition(idx) = hops / spread_probability ticks from
+    now; burns_first() compares it with the person's arrival tick.
+    """
+
+    def __init__(self, fire, safety_ticks=10):
+        self.fire = fire
+        self.safety_ticks = safety_ticks
+        self.hops = np.full(fire.flammable.size, UNREACHED, dtype=np.int64)
+        # Scratch for de-duplicating BFS levels without sorting
+        self._owner = np.zeros(fire.flammable.size, dtype=np.int64)
+        # Cells blocked because the fire is expected to get there before the person
+        self.blocked = set()
+
+    def expected_ignition(self, idx):
+        """Ticks from now until the cell is expected to burn (inf if the fire cannot reach it)"""
+        hops = self.hops[idx]
+        return INF if hops == UNREACHED else hops / self.fire.spread_probability
+
+    def burns_first(self, idx, arrival):
+        """True when the fire is expected to reach idx within safety_ticks of the person's arrival"""
+        return self.expected_ignition(idx) < arrival + self.safety_ticks
+
+    def update(self, ignited):
+        """
+        Fold in newly burning cells. Level-synchronous BFS from them that only
+        continues through cells whose hop count drops, so a tick costs the
+        region the new cells bring closer, not the whole grid.
+        """
+        rows, cols = self.fire.shape
+        flammable, hops = self.fire.flammable, self.hops
+        frontier = ignited[hops[ignited] > 0]
+        hops[frontier] = 0
+        level = 0
+        while frontier.size:
+            level += 1
+            r = frontier // cols
+            c = frontier % cols
+            candidates = np.concatenate((frontier[r > 0] - cols, frontier[r < rows - 1] + cols,
+                                         frontier[c > 0] - 1, frontier[c < cols - 1] + 1))
+            candidates = candidates[flammable[candidates] & (hops[candidates] > level)]
+            # The fancy-index store keeps one position per cell, as in compute_distance_field
+            stamp = np.arange(candidates.size)
+            self._owner[candidates] = stamp
+            frontier = candidates[self._owner[candidates] == stamp]
+            hops[frontier] = level
+
+
+class FireEvacuation:
+    """One person walking to an exit while the fire spreads, with incremental replanning"""
+
+    def __init__(self, grid, start, spread_probability=0.3, safety_ticks=10, seed=None):
+        self.fire = FireSpread(grid, spread_probability, seed)
+        self.forecast = IgnitionForecast(self.fire, safety_ticks)
+        self.exits = {(r, c) for r, row in enumerate(grid) for c, cell in enumerate(row) if cell == EXIT}
+        self.position = start
+        self.outcome = None
+        self.history = []
+
+        # Avoids cells the fire reaches before the person; the fallback only avoids burning cells
+        self.planner = DStarLite(grid, start, blocked=(WALL, FIRE))
+        self.fallback = DStarLite(grid, start, blocked=(WALL, FIRE))
+        self.forecast.update(np.flatnonzero(self.fire.burning))
+        self.path, self.safe, _ = self._replan()
+        if self.path is None:
+            self.outcome = "trapped"
+
+    def _refresh_forecast(self, ignited):
+        """
+        Block the new burning cells and re-decide the cells blocked by the
+        forecast so far. The person's arrival tick at such a cell is at least
+        g(start) - g(cell) from the last search (exact on the route).
+        """
+        forecast, planner = self.forecast, self.planner
+        forecast.update(ignited)
+        g = planner.g
+        reach = planner.rhs[planner.start]
+        free = [idx for idx in forecast.blocked
+                if reach < INF and g[idx] < INF and not forecast.burns_first(idx, max(0, reach - g[idx]))]
+        forecast.blocked.difference_update(free)
+        planner.set_blocked(free, False)
+        return planner.set_blocked(ignited.tolist())
+
+    def _replan(self):
+        """
+        (path, safe, cells blocked on the way). Every cell on the route is
+        checked at its exact arrival tick; cells the fire reaches first are
+        blocked and the route repaired until none are left.
+        """
+        forecast, planner, cols = self.forecast, self.planner, self.fire.shape[1]
+        blocked = 0
+        while True:
+            planner.compute_shortest_path()
+            path = planner.path()
+            if path is None:
+                break
+            late = [r * cols + c for tick, (r, c) in enumerate(path, 1)
+                    if forecast.burns_first(r * cols + c, tick)]
+            if not late:
+                return path, True, blocked
+            forecast.blocked.update(late)
+            blocked += planner.set_blocked(late)
+        self.fallback.compute_shortest_path()
+        return self.fallback.path(), False, blocked
+
+    def step(self):
+        """Move one cell, spread the fire one tick and repair the route"""
+        if self.outcome is not None:
+            return None
+
+        if self.path:
+            self.position = self.path[0]
+            self.planner.move_to(self.position)
+            self.fallback.move_to(self.position)
+        if self.position in self.exits:
+            self.outcome = "escaped"
+            return None
+
+        ignited = self.fire.step()
+        if self.fire.is_burning(self.position):
+            self.outcome = "caught"
+            return None
+
+        expanded = self.planner.expanded + self.fallback.expanded
+        started = time.perf_counter()
+        newly_blocked = self._refresh_forecast(ignited)
+        self.fallback.set_blocked(ignited.tolist())
+        self.path, self.safe, late = self._replan()
+        newly_blocked += late
+        elapsed = time.perf_counter() - started
+
+        stats = TickStats(self.fire.tick, self.position, int(ignited.size), newly_blocked, elapsed,
+                          self.planner.expanded + self.fallback.expanded - expanded, self.safe)
+        self.history.append(stats)
+        if self.path is None:
+            self.outcome = "trapped"
+        return stats
+
+    def run(self, max_ticks=100000):
+        while self.outcome is None and self.fire.tick < max_ticks:
+            self.step()
+        return self.outcome
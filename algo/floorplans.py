@@ -0,0 +1,193 @@
+"""
+Procedural floor plans for pathfinding benchmarks.
+
+Every generator returns a (rows, cols) uint8 grid in the usual cell codes,
+closed by an outer wall, and draws everything from one seeded generator, so
+the same arguments always give the same map. All of them are whole-array
+NumPy operations, so a 10,000 x 10,000 map takes seconds.
+
+    rooms    offices: rooms of random size in blocks of up to 2 x 2
+             between corridors. Every room has a door to each corridor it
+             touches and, with probability `connect`, to each neighbouring
+             room.
+    maze     perfect maze (exactly one route between any two cells) with
+             one-cell corridors, carved with the Sidewinder algorithm. The
+             algorithm leaves one side open end to end; the map is flipped
+             at random so that side can be any of the four.
+    hall     open hall with square pillars on a jittered lattice.
+    random   independent random walls at a given density.
+
+Exits are single cells cut into the outer wall next to floor; people and
+fires are dropped on random floor cells. write_corpus() saves a set of
+maps, one per kind and size, in the compressed .evz format of
+algo.grid_files.
+"""
+import os
+
+import numpy as np
+
+from .grid_files import save_grid
+from .pathfinding import EMPTY, WALL, FIRE, EXIT, PERSON
+
+KINDS = ("rooms", "maze", "hall", "random")
+
+
+def _rooms(rows, cols, rng, room=(6, 14), corridor=3, connect=0.3):
+    cells = np.full((rows, cols), EMPTY, dtype=np.uint8)
+    row_bands = _bands(rows, room, corridor, rng)
+    col_bands = _bands(cols, room, corridor, rng)
+
+    # Wall lines between bands, left open where they would cross a corridor
+    for (_, _, above), (start, _, below) in zip(row_bands, row_bands[1:]):
+        cells[start - 1] = WALL
+        _doors(cells, start - 1, col_bands, above or below, connect, rng, axis=0)
+    for (_, _, left), (start, _, right) in zip(col_bands, col_bands[1:]):
+        cells[:, start - 1] = WALL
+        _doors(cells, start - 1, row_bands, left or right, connect, rng, axis=1)
+    for start, end, is_corridor in row_bands:
+        if is_corridor:
+            cells[start:end] = EMPTY
+    for start, end, is_corridor in col_bands:
+        if is_corridor:
+            cells[:, start:end] = EMPTY
+    return cells
+
+
+def _bands(length, room, corridor, rng):
+    """
+    (start, end, is_corridor) spans along one axis, one wall cell apart:
+    room, corridor, room, room, corridor, ..., so every room touches a corridor
+    """
+    bands, at, i = [], 1, 0
+    while at < length - 1:
+        is_corridor = i % 3 == 1
+        size = corridor if is_corridor else int(rng.integers(room[0], room[1] + 1))
+        end = min(at + size, length - 1)
+        bands.append((at, end, is_corridor))
+        at, i = end + 1, i + 1
+    if len(bands) > 1 and (len(bands) - 1) % 3 == 0:
+        # A last room without a corridor of its own joins the room before it
+        bands[-2:] = [(bands[-2][0], bands[-1][1], False)]
+    return bands
+
+
+def _doors(cells, line, bands, to_corridor, connect, rng, axis):
+    """One door per room-sized segment of a wall line; always when the line faces a corridor"""
+    spans = np.array([(start, end) for start, end, is_corridor in bands if not is_corridor and end > start])
+    if spans.size == 0:
+        return
+    keep = np.ones(len(spans), dtype=bool) if to_corridor else rng.random(len(spans)) < connect
+    at = spans[:, 0] + (rng.random(len(spans)) * (spans[:, 1] - spans[:, 0])).astype(np.int64)
+    if axis == 0:
+        cells[line, at[keep]] = EMPTY
+    else:
+        cells[at[keep], line] = EMPTY
+
+
+def _maze(rows, cols, rng):
+    cells = np.full((rows, cols), WALL, dtype=np.uint8)
+    n_rows, n_cols = (rows - 1) // 2, (cols - 1) // 2
+    if n_rows < 1 or n_cols < 1:
+        return cells
+    cells[1:2 * n_rows:2, 1:2 * n_cols:2] = EMPTY
+    # First row: one corridor end to end
+    cells[1, 1:2 * n_cols] = EMPTY
+    if n_rows > 1:
+        # Every other row is cut into runs; each run is carved east and opened north once
+        close = rng.random((n_rows - 1, n_cols)) < 0.5
+        close[:, -1] = True
+        r, c = np.nonzero(~close)
+        cells[2 * r + 3, 2 * c + 2] = EMPTY
+        ends = np.flatnonzero(close.ravel())
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        up = starts + (rng.random(len(ends)) * (ends - starts + 1)).astype(np.int64)
+        cells[2 * (up // n_cols) + 2, 2 * (up % n_cols) + 1] = EMPTY
+    if rng.random() < 0.5:
+        cells = cells[::-1]
+    if rng.random() < 0.5:
+        cells = cells[:, ::-1]
+    return np.ascontiguousarray(cells)
+
+
+def _hall(rows, cols, rng, pillar=2, spacing=8):
+    cells = np.full((rows, cols), EMPTY, dtype=np.uint8)
+    slack = max(spacing - pillar - 1, 0)
+    r0 = np.arange(2, rows - pillar - 1, spacing)
+    c0 = np.arange(2, cols - pillar - 1, spacing)
+    r0, c0 = np.meshgrid(r0, c0, indexing="ij")
+    r0 = np.minimum(r0 + rng.integers(0, slack + 1, r0.shape), rows - pillar - 1)
+    c0 = np.minimum(c0 + rng.integers(0, slack + 1, c0.shape), cols - pillar - 1)
+    for dr in range(pillar):
+        for dc in range(pillar):
+            cells[r0 + dr, c0 + dc] = WALL
+    return cells
+
+
+def _random(rows, cols, rng, density=0.2):
+    return np.where(rng.random((rows, cols)) < density, WALL, EMPTY).astype(np.uint8)
+
+
+LAYOUTS = {"rooms": _rooms, "maze": _maze, "hall": _hall, "random": _random}
+
+
+def _place_exits(cells, count, rng):
+    rows, cols = cells.shape
+    # Outer wall cells next to interior floor
+    sides = (
+        [(0, c) for c in np.flatnonzero(cells[1, 1:-1] == EMPTY) + 1],
+        [(rows - 1, c) for c in np.flatnonzero(cells[-2, 1:-1] == EMPTY) + 1],
+        [(r, 0) for r in np.flatnonzero(cells[1:-1, 1] == EMPTY) + 1],
+        [(r, cols - 1) for r in np.flatnonzero(cells[1:-1, -2] == EMPTY) + 1],
+    )
+    candidates = [cell for side in sides for cell in side]
+    if not candidates:
+        return
+    for i in rng.choice(len(candidates), size=min(count, len(candidates)), replace=False):
+        cells[candidates[i]] = EXIT
+
+
+def _scatter(cells, code, count, rng):
+    free = np.flatnonzero(cells.ravel() == EMPTY)
+    if count and free.size:
+        cells.flat[rng.choice(free, size=min(count, free.size), replace=False)] = code
+
+
+def generate(kind, rows, cols=None, seed=None, exits=4, people=0, fires=0, **options):
+    """
+    A (rows, cols) uint8 floor plan of the given kind (see KINDS); cols
+    defaults to rows. options go to the layout: room=(min, max),
+    corridor and connect for rooms, pillar and spacing for hall, density
+    for random.
+    """
+    if kind not in LAYOUTS:
+        raise ValueError(f"unknown floor plan kind {kind!r}; choose from {', '.join(KINDS)}")
+    cols = rows if cols is None else cols
+    if rows < 3 or cols < 3:
+        raise ValueError("a floor plan needs at least 3 x 3 cells")
+    rng = np.random.default_rng(seed)
+    cells = LAYOUTS[kind](rows, cols, rng, **options)
+    cells[[0, -1]] = WALL
+    cells[:, [0, -1]] = WALL
+    _place_exits(cells, exits, rng)
+    _scatter(cells, PERSON, people, rng)
+    _scatter(cells, FIRE, fires, rng)
+    return cells
+
+
+def corpus_seed(seed, kind, size):
+    """Seed of one corpus map, independent of which other maps are generated"""
+    return np.random.SeedSequence([seed, KINDS.index(kind), size])
+
+
+def write_corpus(directory, sizes, kinds=KINDS, seed=0, exits=4, people=100, fires=0):
+    """Generate one map per kind and size into directory as <kind>-<size>.evz; returns the paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for size in sizes:
+        for kind in kinds:
+            cells = generate(kind, size, seed=corpus_seed(seed, kind, size),
+                             exits=exits, people=people, fires=fires)
+            path = os.path.join(directory, f"{kind}-{size}.evz")
+            save_grid(cells, path)
+            paths.append(path)
+    return paths
@@ -0,0 +1,157 @@
+"""
+Compact grid core: every cell in one flat uint8 buffer.
+
+The buffer is padded with a one-cell OUTSIDE border, so the four neighbours of
+any interior cell are idx - width, idx + width, idx - 1 and idx + 1 with no
+bounds checks. Rows are exposed as memoryview slices, so existing code that
+reads and writes grid[r][c] keeps working unchanged, and np.asarray(grid)
+is a zero-copy view.
+
+GridCore.astar() is the same search as pathfinding.astar() on integer cell
+indices with flat g-score and parent arrays, a closed set, and ties on f
+broken towards the smaller heuristic (the cell closer to an exit).
+"""
+import heapq
+from array import array
+
+import numpy as np
+
+from .pathfinding import BLOCKED, EMPTY
+
+UNSET = -1
+# Border cells around the grid; never passable whatever `blocked` says
+OUTSIDE = 255
+
+
+class GridCore:
+    def __init__(self, rows, cols, fill=EMPTY):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.cells = bytearray([OUTSIDE]) * (self.width * (rows + 2))
+        view = memoryview(self.cells)
+        self._rows = [view[self._offset(r):self._offset(r) + cols] for r in range(rows)]
+        for row in self._rows:
+            row[:] = bytes([fill]) * cols
+        # Neighbour offsets in the padded buffer: up, down, left, right
+        self.offsets = (-self.width, self.width, -1, 1)
+
+    @classmethod
+    def from_rows(cls, grid):
+        """Copy a list-of-lists or NumPy grid into a new GridCore"""
+        if isinstance(grid, np.ndarray):
+            return cls.from_array(grid)
+        rows = len(grid)
+        cols = len(grid[0])
+        core = cls(rows, cols)
+        for r in range(rows):
+            core._rows[r][:] = bytes(np.asarray(grid[r], dtype=np.uint8))
+        return core
+
+    @classmethod
+    def from_array(cls, cells):
+        """Copy a 2-D array of cell codes in one bulk NumPy assignment"""
+        rows, cols = cells.shape
+        core = cls(rows, cols)
+        np.asarray(core)[:] = cells
+        return core
+
+    def copy(self):
+        core = GridCore(self.rows, self.cols)
+        core.cells[:] = self.cells
+        return core
+
+    def _offset(self, r):
+        return (r + 1) * self.width + 1
+
+    # ---------- list-of-lists compatibility ----------
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, r):
+        return self._rows[r]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __array__(self, dtype=None, copy=None):
+        padded = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows + 2, self.width)
+        view = padded[1:-1, 1:-1]
+        return view if dtype is None else view.astype(dtype, copy=False)
+
+    def to_rows(self):
+        return [list(row) for row in self._rows]
+
+    # ---------- cell indices ----------
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, idx):
+        r, c = divmod(idx, self.width)
+        return r - 1, c - 1
+
+    # ---------- search ----------
+
+    def astar(self, start, goals, blocked=BLOCKED):
+        """A* from start to the nearest goal; returns cells after start, like astar()"""
+        width = self.width
+        cells = self.cells
+        passable = bytearray([1]) * 256
+        for code in (*blocked, OUTSIDE):
+            passable[code] = 0
+
+        goal_set = {self.index(g) for g in goals}
+        if not goal_set:
+            return None
+        goal_rc = [divmod(g, width) for g in goal_set]
+        if len(goal_rc) == 1:
+            (gr, gc), = goal_rc
+
+            def h(idx):
+                return abs(idx // width - gr) + abs(idx % width - gc)
+        else:
+            def h(idx):
+                r, c = divmod(idx, width)
+                return min(abs(r - gr) + abs(c - gc) for gr, gc in goal_rc)
+
+        n = len(cells)
+        g_score = array("l", [UNSET]) * n
+        parent = array("l", [UNSET]) * n
+        closed = bytearray(n)
+
+        src = self.index(start)
+        g_score[src] = 0
+        h0 = h(src)
+        open_set = [(h0, h0, src)]
+        offsets = self.offsets
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        while open_set:
+            _, _, current = heappop(open_set)
+            if closed[current]:
+                continue
+            closed[current] = 1
+
+            if current in goal_set:
+                path = []
+                while current != src:
+                    path.append(self.cell(current))
+                    current = parent[current]
+                path.reverse()
+                return path
+
+            tentative = g_score[current] + 1
+            for offset in offsets:
+                nb = current + offset
+                if closed[nb] or not passable[cells[nb]]:
+                    continue
+                g_nb = g_score[nb]
+                if g_nb == UNSET or tentative < g_nb:
+                    g_score[nb] = tentative
+                    parent[nb] = current
+                    hn = h(nb)
+                    heappush(open_set, (tentative + hn, hn, nb))
+
+        return None
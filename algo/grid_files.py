@@ -0,0 +1,286 @@
+"""
+Grid files for headless evacuation studies.
+
+Seven formats, picked by file extension:
+
+    .txt   one row per line, one character per cell:
+               .  empty      #  wall      F  fire
+               E  exit       P  person    *  path
+    .json  {"rows": R, "cols": C, "grid": [...]} where grid is a list of
+           rows, each either a list of cell codes or a string as in .txt
+    .evg   compact binary: 8-byte magic, rows and cols as little-endian
+           uint32, then rows * cols cell codes, one byte each
+    .evz   .evg with its own magic and the cell codes zlib-compressed;
+           generated floor plans shrink to a few percent of .evg
+    .rle   run-length text: "rows cols" on the first line, then the cells
+           in row-major order as runs of <count><symbol> (symbols as in
+           .txt, count 1 when left out); whitespace is ignored, e.g.
+           "3 4\n5#2.E4#"
+    .csv   one row per line, cell codes separated by commas (or spaces,
+           semicolons or tabs)
+    .png   a floor plan, one pixel per cell: dark pixels are walls, and
+           strongly red, green and blue pixels are fire, exits and people;
+           everything else is floor. Needs Pillow.
+
+CSV and PNG maps are parsed with whole-array NumPy operations, so floor
+plans thousands of cells per side load in well under a second.
+"""
+import io
+import json
+import os
+import re
+import struct
+import zlib
+
+import numpy as np
+
+from .grid_core import GridCore
+from .pathfinding import EMPTY, WALL, FIRE, EXIT, PERSON, PATH
+
+SYMBOLS = {EMPTY: ".", WALL: "#", FIRE: "F", EXIT: "E", PERSON: "P", PATH: "*"}
+CODES = {symbol: code for code, symbol in SYMBOLS.items()}
+
+MAGIC = b"EVGRID\x00\x01"
+COMPRESSED_MAGIC = b"EVGRIDZ\x01"
+HEADER = struct.Struct("<8sII")
+
+FORMATS = {".txt": "text", ".json": "json", ".evg": "binary", ".evz": "compressed", ".rle": "rle", ".csv": "csv", ".png": "png"}
+
+# Pixel colours used when a grid is saved as PNG (paths are saved as floor)
+PNG_COLORS = {
+    EMPTY: (255, 255, 255),
+    WALL: (0, 0, 0),
+    FIRE: (231, 76, 60),
+    EXIT: (39, 174, 96),
+    PERSON: (52, 152, 219),
+    PATH: (255, 255, 255),
+}
+# A pixel darker than this (brightest channel) is a wall
+WALL_BRIGHTNESS = 96
+# A pixel whose channels spread by at least this much is fire, an exit or a person
+MARKER_SATURATION = 96
+
+
+def _format_for(path, fmt=None):
+    if fmt is not None:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"unknown grid format for {path!r}; use one of {', '.join(FORMATS)}")
+    return FORMATS[ext]
+
+
+def _parse_row(row):
+    if isinstance(row, str):
+        try:
+            return [CODES[ch] for ch in row]
+        except KeyError as e:
+            raise ValueError(f"unknown cell symbol {e.args[0]!r}") from None
+    return [int(cell) for cell in row]
+
+
+def _from_rows(rows):
+    if not rows or not rows[0]:
+        raise ValueError("grid is empty")
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("grid rows have different lengths")
+    valid = set(SYMBOLS)
+    if any(cell not in valid for row in rows for cell in row):
+        raise ValueError("grid contains an unknown cell code")
+    return GridCore.from_rows(rows)
+
+
+def parse_text(text):
+    return _from_rows([_parse_row(line.strip()) for line in text.splitlines() if line.strip()])
+
+
+def parse_json(data):
+    if isinstance(data, (str, bytes)):
+        data = json.loads(data)
+    grid = data["grid"] if isinstance(data, dict) else data
+    return _from_rows([_parse_row(row) for row in grid])
+
+
+def _check_cells(rows, cols, max_cells):
+    if max_cells is not None and rows * cols > max_cells:
+        raise ValueError(f"grid has {rows * cols} cells, more than the limit of {max_cells}")
+
+
+def parse_binary(data, magic=MAGIC, max_cells=None):
+    if len(data) < HEADER.size:
+        raise ValueError("binary grid is truncated")
+    found, rows, cols = HEADER.unpack_from(data)
+    if found != magic:
+        raise ValueError("not an evacuation grid file")
+    _check_cells(rows, cols, max_cells)
+    body = data[HEADER.size:]
+    if magic == COMPRESSED_MAGIC:
+        # Inflate at most one byte past the declared size, so a small payload
+        # claiming a small grid cannot expand into gigabytes
+        inflater = zlib.decompressobj()
+        try:
+            body = inflater.decompress(body, rows * cols + 1)
+        except zlib.error as e:
+            raise ValueError(f"corrupt compressed grid: {e}") from None
+        if inflater.unconsumed_tail:
+            raise ValueError(f"expected {rows * cols} cells, found more")
+        if not inflater.eof:
+            raise ValueError("corrupt compressed grid: stream is truncated")
+    if len(body) != rows * cols:
+        raise ValueError(f"expected {rows * cols} cells, found {len(body)}")
+    cells = np.frombuffer(body, dtype=np.uint8)
+    if cells.size and cells.max() > PATH:
+        raise ValueError("grid contains an unknown cell code")
+    return GridCore.from_array(cells.reshape(rows, cols))
+
+
+def parse_compressed(data, max_cells=None):
+    return parse_binary(data, COMPRESSED_MAGIC, max_cells)
+
+
+_RUN = re.compile(r"(\d*)(\S)")
+_SYMBOL_CODES = np.full(256, 255, dtype=np.uint8)
+for _code, _symbol in SYMBOLS.items():
+    _SYMBOL_CODES[ord(_symbol)] = _code
+
+
+def parse_rle(text, max_cells=None):
+    header, _, body = text.strip().partition("\n")
+    try:
+        rows, cols = (int(n) for n in header.split())
+    except ValueError:
+        raise ValueError("run-length grid must start with 'rows cols'") from None
+    _check_cells(rows, cols, max_cells)
+    body = "".join(body.split())
+    runs = _RUN.findall(body)
+    if sum(len(count) + len(symbol) for count, symbol in runs) != len(body):
+        raise ValueError("run-length grid contains a count without a symbol")
+    counts = np.array([int(count) if count else 1 for count, _ in runs], dtype=np.int64)
+    symbols = np.frombuffer("".join(symbol for _, symbol in runs).encode("utf-8"), dtype=np.uint8)
+    if symbols.size != len(runs):
+        raise ValueError("unknown cell symbol in run-length grid")
+    codes = _SYMBOL_CODES[symbols]
+    if np.any(codes == 255):
+        raise ValueError("unknown cell symbol in run-length grid")
+    if rows < 1 or cols < 1 or counts.sum() != rows * cols:
+        raise ValueError(f"expected {rows * cols} cells, found {int(counts.sum())}")
+    return GridCore.from_array(np.repeat(codes, counts).reshape(rows, cols))
+
+
+def dump_rle(grid):
+    cells = np.asarray(grid, dtype=np.uint8).ravel()
+    rows, cols = len(grid), len(grid[0])
+    starts = np.flatnonzero(np.concatenate(([True], cells[1:] != cells[:-1])))
+    counts = np.diff(np.append(starts, cells.size))
+    runs = [f"{count}{SYMBOLS[code]}" if count > 1 else SYMBOLS[code]
+            for count, code in zip(counts.tolist(), cells[starts].tolist())]
+    return f"{rows} {cols}\n" + "".join(runs) + "\n"
+
+
+def parse_csv(data):
+    """Cell codes (single digits) separated by commas or whitespace, one row per line"""
+    if isinstance(data, str):
+        data = data.encode("ascii")
+    buf = np.frombuffer(data, dtype=np.uint8)
+    digit = (buf >= ord("0")) & (buf <= ord("9"))
+    separators = np.frombuffer(b", ;\t\r\n", dtype=np.uint8)
+    if not np.all(digit | np.isin(buf, separators)):
+        raise ValueError("CSV grid may only contain cell codes and separators")
+    if np.any(digit[1:] & digit[:-1]):
+        raise ValueError("unknown cell code in CSV grid")
+
+    # Digits per line; lines without any digit are blank and skipped
+    newlines = np.flatnonzero(buf == ord("\n"))
+    seen = np.concatenate(([0], np.cumsum(digit)))
+    bounds = np.concatenate(([0], newlines + 1, [buf.size]))
+    per_line = np.diff(seen[bounds])
+    per_line = per_line[per_line > 0]
+    if per_line.size == 0:
+        raise ValueError("grid is empty")
+    if np.any(per_line != per_line[0]):
+        raise ValueError("grid rows have different lengths")
+
+    cells = buf[digit] - ord("0")
+    if cells.max() > PATH:
+        raise ValueError("grid contains an unknown cell code")
+    return GridCore.from_array(cells.reshape(per_line.size, per_line[0]))
+
+
+def classify_pixels(rgb):
+    """(H, W, 3) uint8 pixels -> (H, W) cell codes"""
+    rgb = rgb.astype(np.int16)
+    brightest = rgb.max(axis=2)
+    spread = brightest - rgb.min(axis=2)
+    dominant = rgb.argmax(axis=2)
+
+    cells = np.full(brightest.shape, EMPTY, dtype=np.uint8)
+    marker = spread >= MARKER_SATURATION
+    # Orange and yellow (red with a strong green) stay floor, as drawn paths do
+    cells[marker & (dominant == 0) & (rgb[..., 1] < 128)] = FIRE
+    cells[marker & (dominant == 1)] = EXIT
+    cells[marker & (dominant == 2)] = PERSON
+    cells[brightest < WALL_BRIGHTNESS] = WALL
+    return cells
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ValueError("PNG floor plans need Pillow (pip install pillow)") from None
+    return Image
+
+
+def parse_png(data):
+    with _pillow().open(io.BytesIO(data)) as image:
+        rgb = np.asarray(image.convert("RGB"))
+    return GridCore.from_array(classify_pixels(rgb))
+
+
+def load_grid(path, fmt=None):
+    """Read a grid file into a GridCore"""
+    fmt = _format_for(path, fmt)
+    if fmt in ("binary", "compressed", "csv", "png"):
+        with open(path, "rb") as f:
+            data = f.read()
+        parsers = {"binary": parse_binary, "compressed": parse_compressed, "csv": parse_csv, "png": parse_png}
+        return parsers[fmt](data)
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    return {"text": parse_text, "json": parse_json, "rle": parse_rle}[fmt](content)
+
+
+def dump_grid(grid, fmt):
+    """Serialise a grid (GridCore or list of lists) to bytes in the given format"""
+    rows = len(grid)
+    cols = len(grid[0])
+    if fmt == "binary":
+        return HEADER.pack(MAGIC, rows, cols) + b"".join(bytes(row) for row in grid)
+    if fmt == "compressed":
+        body = np.asarray(grid, dtype=np.uint8).tobytes()
+        return HEADER.pack(COMPRESSED_MAGIC, rows, cols) + zlib.compress(body, 1)
+    if fmt == "csv":
+        cells = np.asarray(grid, dtype=np.uint8)
+        text = np.full((rows, 2 * cols), ord(","), dtype=np.uint8)
+        text[:, 0::2] = cells + ord("0")
+        text[:, -1] = ord("\n")
+        return text.tobytes()
+    if fmt == "png":
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        for code, color in PNG_COLORS.items():
+            palette[code] = color
+        out = io.BytesIO()
+        _pillow().fromarray(palette[np.asarray(grid, dtype=np.uint8)]).save(out, format="PNG")
+        return out.getvalue()
+    if fmt == "rle":
+        return dump_rle(grid).encode("utf-8")
+    lines = ["".join(SYMBOLS[cell] for cell in row) for row in grid]
+    if fmt == "text":
+        return ("\n".join(lines) + "\n").encode("utf-8")
+    return json.dumps({"rows": rows, "cols": cols, "grid": lines}).encode("utf-8")
+
+
+def save_grid(grid, path, fmt=None):
+    data = dump_grid(grid, _format_for(path, fmt))
+    with open(path, "wb") as f:
+        f.write(data)
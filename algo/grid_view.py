@@ -0,0 +1,335 @@
+"""
+Viewport-culled, incremental canvas rendering for the evacuation grid.
+
+Only the part of the grid inside the viewport is drawn, so the grid can be
+thousands of cells per side. Each visible slot (a cell position on screen)
+owns three persistent canvas items (a rectangle, an oval and a text label).
+Drawing only reconfigures the slots whose code changed, so scrolling over
+floor that looks the same, or redrawing after an edit, touches few items.
+
+Below TILE_MIN_CELL pixels per cell, the visible window is instead rendered
+to one image with a NumPy colour lookup and blitted as a single canvas item.
+
+The view keeps its own copy of the whole grid, refreshed by diffing, and a
+running count of every cell code, so the GUI can validate the grid in O(1)
+instead of rescanning it.
+
+Scrolling follows Tk's protocol: xview()/yview() take "moveto"/"scroll"
+arguments from scrollbars, and the xscroll/yscroll callbacks receive the
+visible (first, last) fractions, like a Canvas's xscrollcommand.
+
+While a search runs, show_frontier() outlines a sample of its open cells
+with a pool of overlay rectangles that is reused from one update to the next.
+"""
+import tkinter as tk
+
+import numpy as np
+
+from .pathfinding import EMPTY, WALL, FIRE, EXIT, PERSON, PATH
+
+# Code of a cell that has not been drawn yet
+UNDRAWN = 255
+# Outline of cells on the frontier of a running search
+FRONTIER_COLOR = "#8e44ad"
+# Pixels per cell the zoom steps through
+ZOOM_LEVELS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 40, 48, 64)
+# Smaller cells are drawn as one image instead of canvas items
+TILE_MIN_CELL = 8
+# Styles are designed at this cell size and scaled to the zoom
+BASE_CELL = 40
+
+
+def cell_styles(colors, cell_size):
+    """
+    code -> (rectangle, oval, label) where rectangle and oval are
+    (inset, fill, outline, width) or None, and label is
+    (text, fill, font, y offset) or None
+    """
+    scale = cell_size / BASE_CELL
+
+    def shape(inset, fill, outline, width):
+        return round(inset * scale), fill, outline, max(1, round(width * scale))
+
+    def label(text, fill, font_size, weight, dy):
+        if cell_size < 20:
+            return None
+        font = ("Segoe UI", max(6, round(font_size * scale))) + ((weight,) if weight else ())
+        return text, fill, font, dy
+
+    return {
+        # ممرات (أرضية)
+        EMPTY: (shape(0, "#ecf0f1", "#bdc3c7", 1), None, None),
+        # جدران (سميكة)
+        WALL: (shape(0, colors[WALL], colors[WALL], 1), None, None),
+        # مخرج (باب)
+        EXIT: (shape(6, colors[EXIT], "#145a32", 3), None,
+               label("EXIT", "white", 8, "bold", cell_size - round(10 * scale))),
+        # شخص (دائرة)
+        PERSON: (None, shape(6, colors[PERSON], "#154360", 2), None),
+        # حريق
+        FIRE: (shape(0, colors[FIRE], "#922b21", 1), None,
+               label("🔥", "black", 14, None, cell_size // 2)),
+        # مسار الإخلاء
+        PATH: (shape(2, colors[PATH], "#d68910", 2), None,
+               label("→", "white", 12, "bold", cell_size // 2)),
+    }
+
+
+def _rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+class GridView:
+    def __init__(self, canvas, rows, cols, cell_size, colors, width, height):
+        self.canvas = canvas
+        self.colors = colors
+        # Viewport size in pixels
+        self.width = width
+        self.height = height
+        self.xscroll = None
+        self.yscroll = None
+
+        self.palette = np.zeros((256, 3), dtype=np.uint8)
+        self.palette[EMPTY] = _rgb("#ecf0f1")
+        for code in (WALL, FIRE, EXIT, PERSON, PATH):
+            self.palette[code] = _rgb(colors[code])
+
+        self.slots = []
+        self.slot_codes = np.zeros((0, 0), dtype=np.uint8)
+        self.photo = None
+        self.image_item = None
+        self.frontier_items = []
+        self.frontier_shown = 0
+        self.dirty = False
+        self.cell_size = cell_size
+        self.set_shape(rows, cols)
+
+    # ---------- grid state ----------
+
+    def set_shape(self, rows, cols):
+        """Start over with an empty grid of a new size"""
+        self.rows = rows
+        self.cols = cols
+        # The grid as last synced, and the number of cells holding each code
+        self.known = np.full((rows, cols), UNDRAWN, dtype=np.uint8)
+        self.counts = [0] * (PATH + 1)
+        self.origin = (0, 0)
+        self.set_zoom(self.cell_size)
+
+    def set_cell(self, r, c, code):
+        """Record a single edited cell and draw it if it is visible"""
+        old = int(self.known[r, c])
+        if old == code:
+            return
+        if old != UNDRAWN:
+            self.counts[old] -= 1
+        self.counts[code] += 1
+        self.known[r, c] = code
+
+        i, j = r - self.origin[0], c - self.origin[1]
+        if 0 <= i < self.slot_codes.shape[0] and 0 <= j < self.slot_codes.shape[1]:
+            if self.image_item is None:
+                self._paint_slot(i, j, code)
+            else:
+                self.dirty = True
+
+    def refresh(self, grid):
+        """Sync with the grid (one array compare) and redraw the visible changes"""
+        current = np.asarray(grid, dtype=np.uint8)
+        changed = current != self.known
+        if changed.any():
+            old = self.known[changed]
+            old = old[old != UNDRAWN]
+            removed = np.bincount(old, minlength=PATH + 1)
+            added = np.bincount(current[changed], minlength=PATH + 1)
+            for code in range(PATH + 1):
+                self.counts[code] += int(added[code]) - int(removed[code])
+            self.known[changed] = current[changed]
+        self.render()
+
+    # ---------- drawing ----------
+
+    def _window(self):
+        r0, c0 = self.origin
+        vr, vc = self.slot_codes.shape
+        return self.known[r0:r0 + vr, c0:c0 + vc]
+
+    def render(self):
+        """Redraw the visible slots whose code changed since they were drawn"""
+        if self.image_item is not None:
+            self._blit()
+            return
+        window = self._window()
+        for i, j in np.argwhere(window != self.slot_codes).tolist():
+            self._paint_slot(i, j, int(window[i, j]))
+
+    def flush(self):
+        """Draw pending single-cell edits; only the image mode defers them"""
+        if self.dirty:
+            self._blit()
+
+    def _shape(self, item, box, style):
+        if style is None:
+            self.canvas.itemconfigure(item, state="hidden")
+            return
+        inset, fill, outline, width = style
+        x, y = box
+        size = self.cell_size
+        self.canvas.coords(item, x + inset, y + inset, x + size - inset, y + size - inset)
+        self.canvas.itemconfigure(item, state="normal", fill=fill, outline=outline, width=width)
+
+    def _paint_slot(self, i, j, code):
+        self.slot_codes[i, j] = code
+        rect, oval, label = self.slots[i * self.slot_codes.shape[1] + j]
+        if code == UNDRAWN:
+            for item in (rect, oval, label):
+                self.canvas.itemconfigure(item, state="hidden")
+            return
+        rect_style, oval_style, label_style = self.styles[code]
+        box = (j * self.cell_size, i * self.cell_size)
+        self._shape(rect, box, rect_style)
+        self._shape(oval, box, oval_style)
+        if label_style is None:
+            self.canvas.itemconfigure(label, state="hidden")
+        else:
+            text, fill, font, dy = label_style
+            self.canvas.coords(label, box[0] + self.cell_size // 2, box[1] + dy)
+            self.canvas.itemconfigure(label, state="normal", text=text, fill=fill, font=font)
+
+    def _blit(self):
+        self.dirty = False
+        window = self._window()
+        if window.size == 0:
+            return
+        size = self.cell_size
+        pixels = self.palette[window]
+        if size > 1:
+            pixels = pixels.repeat(size, axis=0).repeat(size, axis=1)
+        h, w = pixels.shape[:2]
+        ppm = b"P6 %d %d 255\n" % (w, h) + pixels.tobytes()
+        if self.photo is None:
+            self.photo = tk.PhotoImage(master=self.canvas, data=ppm, format="PPM")
+            self.canvas.itemconfigure(self.image_item, image=self.photo)
+        else:
+            self.photo.configure(data=ppm, format="PPM", width=w, height=h)
+
+    # ---------- viewport ----------
+
+    def set_zoom(self, cell_size, anchor=None):
+        """
+        Change pixels per cell. anchor is a canvas (x, y) whose cell stays
+        under the pointer; by default the top-left cell stays put.
+        """
+        if anchor is not None:
+            fixed = (self.origin[0] + anchor[1] / self.cell_size, self.origin[1] + anchor[0] / self.cell_size)
+        self.cell_size = cell_size
+        self.styles = cell_styles(self.colors, cell_size)
+        if anchor is not None:
+            self.origin = (round(fixed[0] - anchor[1] / cell_size), round(fixed[1] - anchor[0] / cell_size))
+
+        for slot in self.slots:
+            for item in slot:
+                self.canvas.delete(item)
+        self.slots = []
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+            self.image_item = None
+            self.photo = None
+
+        vr = min(self.rows, -(-self.height // cell_size))
+        vc = min(self.cols, -(-self.width // cell_size))
+        self.slot_codes = np.full((vr, vc), UNDRAWN, dtype=np.uint8)
+        if cell_size < TILE_MIN_CELL:
+            self.image_item = self.canvas.create_image(0, 0, anchor="nw")
+        else:
+            for i in range(vr):
+                for j in range(vc):
+                    x, y = j * cell_size, i * cell_size
+                    self.slots.append((
+                        self.canvas.create_rectangle(x, y, x + cell_size, y + cell_size, state="hidden"),
+                        self.canvas.create_oval(x, y, x + cell_size, y + cell_size, state="hidden"),
+                        self.canvas.create_text(x + cell_size // 2, y + cell_size // 2, state="hidden"),
+                    ))
+        # Keep the frontier overlay above the cells
+        for item in self.frontier_items:
+            self.canvas.delete(item)
+        self.frontier_items = []
+        self.frontier_shown = 0
+        self.scroll_to(*self.origin)
+
+    def fit_zoom(self):
+        """Largest zoom level at which the whole grid fits the viewport (at least 1 px)"""
+        fitting = [s for s in ZOOM_LEVELS if s * self.cols <= self.width and s * self.rows <= self.height]
+        return fitting[-1] if fitting else ZOOM_LEVELS[0]
+
+    def zoom(self, steps, anchor=None):
+        """Move steps zoom levels in (positive) or out (negative)"""
+        current = min(range(len(ZOOM_LEVELS)), key=lambda k: abs(ZOOM_LEVELS[k] - self.cell_size))
+        level = max(0, min(len(ZOOM_LEVELS) - 1, current + steps))
+        if ZOOM_LEVELS[level] != self.cell_size:
+            self.set_zoom(ZOOM_LEVELS[level], anchor)
+
+    def scroll_to(self, r0, c0):
+        vr, vc = self.slot_codes.shape
+        r0 = max(0, min(r0, self.rows - vr))
+        c0 = max(0, min(c0, self.cols - vc))
+        self.origin = (r0, c0)
+        self.render()
+        self._report_scroll()
+
+    def _report_scroll(self):
+        if self.xscroll is not None:
+            self.xscroll(*self.xview())
+        if self.yscroll is not None:
+            self.yscroll(*self.yview())
+
+    def _view(self, axis, args):
+        total = (self.rows, self.cols)[axis]
+        visible = min(total, (self.height, self.width)[axis] / self.cell_size)
+        start = self.origin[axis]
+        if not args:
+            return start / total, min(1.0, (start + visible) / total)
+        if args[0] == "moveto":
+            start = round(float(args[1]) * total)
+        else:
+            count, what = int(args[1]), args[2]
+            start += count * (max(1, int(visible) - 1) if what == "pages" else max(1, int(visible) // 10))
+        origin = list(self.origin)
+        origin[axis] = start
+        self.scroll_to(*origin)
+
+    def xview(self, *args):
+        return self._view(1, args)
+
+    def yview(self, *args):
+        return self._view(0, args)
+
+    def cell_at(self, x, y):
+        """Grid cell under canvas pixel (x, y), or None outside the grid"""
+        r = self.origin[0] + int(y) // self.cell_size
+        c = self.origin[1] + int(x) // self.cell_size
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            return r, c
+        return None
+
+    # ---------- overlay ----------
+
+    def show_frontier(self, cells):
+        """Outline the given cells above the grid; an empty list clears the overlay"""
+        canvas, size = self.canvas, self.cell_size
+        r0, c0 = self.origin
+        vr, vc = self.slot_codes.shape
+        visible = [(r - r0, c - c0) for r, c in cells if 0 <= r - r0 < vr and 0 <= c - c0 < vc]
+        while len(self.frontier_items) < len(visible):
+            self.frontier_items.append(
+                canvas.create_rectangle(0, 0, 0, 0, outline=FRONTIER_COLOR,
+                                        width=2 if size >= TILE_MIN_CELL else 1, state="hidden")
+            )
+        inset = 3 if size >= TILE_MIN_CELL else 0
+        for item, (i, j) in zip(self.frontier_items, visible):
+            x, y = j * size, i * size
+            canvas.coords(item, x + inset, y + inset, x + size - inset, y + size - inset)
+            canvas.itemconfigure(item, state="normal")
+        for item in self.frontier_items[len(visible):self.frontier_shown]:
+            canvas.itemconfigure(item, state="hidden")
+        self.frontier_shown = len(visible)
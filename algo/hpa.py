@@ -0,0 +1,521 @@
+"""
+Hierarchical evacuation routing (HPA*) for large, multi-floor buildings.
+
+Every floor is cut into square clusters of cluster_size cells. Where two
+neighbouring clusters share an open stretch of border, the stretch gets one
+transition (two for long stretches, one at each end); its two cells become
+nodes of the abstract graph, joined by a step of cost 1. Stair links join
+cells on different floors. Inside each cluster, every pair of nodes is
+joined by their shortest in-cluster distance, and each node also knows its
+distance to the nearest exit inside the cluster.
+
+The in-cluster distances come from one breadth-first search per source,
+run for all clusters and up to 64 sources at once: each cell holds a uint64
+bitmask of the sources that have reached it, and one NumPy pass advances
+every search by a level. Clusters are laid out as (cluster, row, col)
+blocks, so a shift never leaks from one cluster into the next.
+
+A nearest-exit query is a small search in the start's own cluster plus a
+lookup in the abstract exit table, which a Dijkstra pass over the abstract
+graph fills (again only after the map changes). The route is refined cluster
+by cluster with local searches that are cached per cluster.
+
+set_cells() changes cells in place. Only the clusters that contain a change,
+and the neighbours whose shared border changed, are rebuilt.
+
+Routes go through transition cells, so they can be a few steps longer than
+the true shortest route; benchmarks/hpa.py measures by how much.
+"""
+import heapq
+from collections import deque
+
+import numpy as np
+
+from .pathfinding import BLOCKED, EXIT, WALL
+
+# Open border stretches at least this long get a transition at each end
+LONG_ENTRANCE = 6
+# toward[] marker: the nearest exit is inside the node's own cluster
+TO_EXIT = -1
+INF = float("inf")
+# Clusters searched together by one bit-parallel BFS (bounds its memory)
+BATCH = 4096
+# paths() solves the abstract exit table for this many starts or more
+TABLE_QUERIES = 16
+
+
+class Building:
+    def __init__(self, floors, stairs=(), cluster_size=32, stair_cost=1, blocked=BLOCKED):
+        """
+        floors: 2-D grids of the same shape, one per floor.
+        stairs: pairs ((floor, row, col), (floor, row, col)) of cells joined
+                by a staircase with the given cost.
+        """
+        arrays = [np.asarray(f, dtype=np.uint8) for f in floors]
+        if not arrays or any(a.shape != arrays[0].shape for a in arrays):
+            raise ValueError("floors must be non-empty grids of the same shape")
+        self.floors = len(arrays)
+        self.rows, self.cols = arrays[0].shape
+        self.size = k = cluster_size
+        self.cluster_rows = -(-self.rows // k)
+        self.cluster_cols = -(-self.cols // k)
+        self.per_floor = self.cluster_rows * self.cluster_cols
+        self.prows, self.pcols = self.cluster_rows * k, self.cluster_cols * k
+
+        # Padded to whole clusters with walls
+        self.cells = np.full((self.floors, self.prows, self.pcols), WALL, dtype=np.uint8)
+        self.cells[:, :self.rows, :self.cols] = arrays
+        self.blocked = np.zeros(256, dtype=bool)
+        self.blocked[list(blocked)] = True
+
+        # node -> {node: cost} for steps between clusters: transitions and stairs
+        self.links = {}
+        self.stair_nodes = {}
+        for a, b in stairs:
+            ga, gb = self._gid(*a), self._gid(*b)
+            for x, y in ((ga, gb), (gb, ga)):
+                self.links.setdefault(x, {})[y] = stair_cost
+                self.stair_nodes.setdefault(self._cluster_of(x), set()).add(x)
+
+        # (cluster, "E" | "S") -> [(cell in cluster, cell in neighbour)]
+        self.borders = {}
+        self.nodes = {}      # cluster -> node ids inside it
+        self.intra = {}      # cluster -> {node: {node: distance inside the cluster}}
+        self.exit_dist = {}  # cluster -> {node: distance to the nearest exit inside the cluster}
+        self.segments = {}   # cluster -> {(a, b): cached cells from a to b}
+        self.to_exit = None  # node -> abstract distance to the nearest exit, solved lazily
+        self.toward = None   # node -> next node on that route, or TO_EXIT
+
+        clusters = range(self.floors * self.per_floor)
+        for cid in clusters:
+            self._set_border(cid, "E")
+            self._set_border(cid, "S")
+        self._rebuild(list(clusters))
+
+    # ---------- ids ----------
+
+    def _gid(self, f, r, c):
+        return (f * self.prows + r) * self.pcols + c
+
+    def _cell(self, gid):
+        fr, c = divmod(gid, self.pcols)
+        f, r = divmod(fr, self.prows)
+        return f, r, c
+
+    def _cluster_of(self, gid):
+        f, r, c = self._cell(gid)
+        return f * self.per_floor + (r // self.size) * self.cluster_cols + c // self.size
+
+    def _cluster_origin(self, cid):
+        f, rest = divmod(cid, self.per_floor)
+        bi, bj = divmod(rest, self.cluster_cols)
+        return f, bi * self.size, bj * self.size
+
+    def _open(self, gid):
+        return not self.blocked[self.cells.flat[gid]]
+
+    # ---------- abstract graph construction ----------
+
+    def _neighbour(self, cid, side):
+        f, r0, c0 = self._cluster_origin(cid)
+        if side == "E":
+            return cid + 1 if c0 + self.size < self.pcols else None
+        return cid + self.cluster_cols if r0 + self.size < self.prows else None
+
+    def _set_border(self, cid, side):
+        """Recompute the transitions on one border; True if they changed"""
+        other = self._neighbour(cid, side)
+        if other is None:
+            return False
+        f, r0, c0 = self._cluster_origin(cid)
+        k = self.size
+        floor = self.cells[f]
+        if side == "E":
+            inside = floor[r0:r0 + k, c0 + k - 1]
+            outside = floor[r0:r0 + k, c0 + k]
+        else:
+            inside = floor[r0 + k - 1, c0:c0 + k]
+            outside = floor[r0 + k, c0:c0 + k]
+        both = ~self.blocked[inside] & ~self.blocked[outside]
+
+        edges = np.diff(np.concatenate(([0], both.astype(np.int8), [0])))
+        positions = []
+        for start, end in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+            if end - start >= LONG_ENTRANCE:
+                positions += [start, end - 1]
+            else:
+                positions.append((start + end - 1) // 2)
+
+        if side == "E":
+            pairs = [(self._gid(f, r0 + i, c0 + k - 1), self._gid(f, r0 + i, c0 + k)) for i in positions]
+        else:
+            pairs = [(self._gid(f, r0 + k - 1, c0 + i), self._gid(f, r0 + k, c0 + i)) for i in positions]
+
+        old = self.borders.get((cid, side), [])
+        if pairs == old:
+            return False
+        for a, b in old:
+            self.links[a].pop(b, None)
+            self.links[b].pop(a, None)
+        for a, b in pairs:
+            self.links.setdefault(a, {})[b] = 1
+            self.links.setdefault(b, {})[a] = 1
+        self.borders[(cid, side)] = pairs
+        return True
+
+    def _cluster_nodes(self, cid):
+        nodes = set()
+        nodes.update(a for a, _ in self.borders.get((cid, "E"), ()))
+        nodes.update(a for a, _ in self.borders.get((cid, "S"), ()))
+        f, r0, c0 = self._cluster_origin(cid)
+        if c0 > 0:
+            nodes.update(b for _, b in self.borders.get((cid - 1, "E"), ()))
+        if r0 > 0:
+            nodes.update(b for _, b in self.borders.get((cid - self.cluster_cols, "S"), ()))
+        nodes.update(g for g in self.stair_nodes.get(cid, ()) if self._open(g))
+        return sorted(nodes)
+
+    def _blocks(self, cids):
+        """(n, size, size) cell codes of the given clusters"""
+        k = self.size
+        view = self.cells.reshape(self.floors, self.cluster_rows, k, self.cluster_cols, k)
+        f, rest = np.divmod(np.asarray(cids), self.per_floor)
+        bi, bj = np.divmod(rest, self.cluster_cols)
+        return view[f, bi, :, bj, :]
+
+    def _rebuild(self, cids):
+        for cid in cids:
+            self.nodes[cid] = nodes = self._cluster_nodes(cid)
+            self.intra[cid] = {a: {} for a in nodes}
+            self.exit_dist[cid] = {}
+            self.segments.pop(cid, None)
+        for i in range(0, len(cids), BATCH):
+            self._cluster_bfs(cids[i:i + BATCH])
+        self.to_exit = self.toward = None
+
+    def _cluster_bfs(self, cids):
+        """Fill intra and exit_dist for a batch of clusters with bit-parallel BFS"""
+        blocks = self._blocks(cids)
+        passable = ~self.blocked[blocks]
+        exit_cells = np.argwhere((blocks == EXIT) & passable)
+
+        # Targets are the nodes of every cluster, grouped by cluster
+        t_cluster, t_r, t_c, t_node = [], [], [], []
+        for i, cid in enumerate(cids):
+            _, r0, c0 = self._cluster_origin(cid)
+            for g in self.nodes[cid]:
+                _, r, c = self._cell(g)
+                t_cluster.append(i)
+                t_r.append(r - r0)
+                t_c.append(c - c0)
+                t_node.append(g)
+        if not t_node:
+            return
+        t_cluster = np.array(t_cluster)
+        t_r, t_c, t_node = np.array(t_r), np.array(t_c), np.array(t_node)
+        # Sources of cluster i: ordinal 0 is all of its exits, then its nodes in order
+        first = np.searchsorted(t_cluster, np.arange(len(cids)))
+        t_ordinal = np.arange(len(t_node)) - first[t_cluster] + 1
+
+        hits = []
+        for low in range(0, int(t_ordinal.max()) + 1, 64):
+            reached = np.zeros(blocks.shape, dtype=np.uint64)
+            if low == 0 and exit_cells.size:
+                reached[exit_cells[:, 0], exit_cells[:, 1], exit_cells[:, 2]] = 1
+            seeds = (t_ordinal >= low) & (t_ordinal < low + 64)
+            np.bitwise_or.at(
+                reached, (t_cluster[seeds], t_r[seeds], t_c[seeds]),
+                np.left_shift(np.uint64(1), (t_ordinal[seeds] - low).astype(np.uint64))
+            )
+            hits += self._spread(reached, passable, low, t_cluster, t_r, t_c)
+
+        target, ordinal, level = (np.concatenate(column) for column in zip(*hits))
+        from_exit = ordinal == 0
+        for i, node, d in zip(t_cluster[target[from_exit]].tolist(),
+                              t_node[target[from_exit]].tolist(), level[from_exit].tolist()):
+            self.exit_dist[cids[i]][node] = d
+
+        # Remaining hits, grouped by source: source -> {node: distance}
+        target, ordinal, level = target[~from_exit], ordinal[~from_exit], level[~from_exit]
+        source = first[t_cluster[target]] + ordinal - 1
+        keep = source != target
+        source, target, level = source[keep], target[keep], level[keep]
+        if not source.size:
+            return
+        order = np.argsort(source, kind="stable")
+        source, nodes, level = source[order], t_node[target[order]].tolist(), level[order].tolist()
+        bounds = np.flatnonzero(np.diff(source)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(nodes)]
+        for s, start, end in zip(source[starts].tolist(), starts, ends):
+            cid = cids[t_cluster[s]]
+            self.intra[cid][int(t_node[s])] = dict(zip(nodes[start:end], level[start:end]))
+
+    def _spread(self, reached, passable, low, t_cluster, t_r, t_c):
+        """
+        Run the BFS from the seeded bits; returns (target, ordinal, level)
+        arrays for every source bit that reaches a target node
+        """
+        hits = []
+        targets = np.arange(len(t_r))
+        frontier = reached.copy()
+        mask = np.where(passable, np.uint64(0xFFFFFFFFFFFFFFFF), np.uint64(0))
+        level = 0
+        while True:
+            bits = frontier[t_cluster[targets], t_r[targets], t_c[targets]]
+            hit = np.flatnonzero(bits)
+            if hit.size:
+                unpacked = np.unpackbits(bits[hit].view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+                rows, bit = np.nonzero(unpacked)
+                hits.append((targets[hit[rows]], bit + low, np.full(rows.size, level)))
+
+            level += 1
+            grown = np.zeros_like(frontier)
+            grown[:, :-1] |= frontier[:, 1:]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :, :-1] |= frontier[:, :, 1:]
+            grown[:, :, 1:] |= frontier[:, :, :-1]
+            grown &= ~reached
+            grown &= mask
+            reached |= grown
+            frontier = grown
+
+            if level % 8 == 0:
+                alive = frontier.reshape(len(frontier), -1).any(axis=1)
+                if not alive.any():
+                    return hits
+                if alive.sum() * 2 < len(alive):
+                    # Drop finished clusters so late levels only touch deep ones
+                    remap = np.cumsum(alive) - 1
+                    targets = targets[alive[t_cluster[targets]]]
+                    t_cluster = t_cluster.copy()
+                    t_cluster[targets] = remap[t_cluster[targets]]
+                    frontier, reached, mask = frontier[alive], reached[alive], mask[alive]
+            elif not frontier.any():
+                return hits
+
+    # ---------- updates ----------
+
+    def set_cells(self, floor, cells, code):
+        """Set (row, col) cells of a floor to code; returns the number of clusters rebuilt"""
+        changed = set()
+        new_blocked = self.blocked[code]
+        for r, c in cells:
+            old = self.cells[floor, r, c]
+            if old == code:
+                continue
+            self.cells[floor, r, c] = code
+            if self.blocked[old] != new_blocked or (old == EXIT) != (code == EXIT):
+                changed.add(self._cluster_of(self._gid(floor, r, c)))
+        if not changed:
+            return 0
+
+        dirty = set(changed)
+        for cid in changed:
+            f, r0, c0 = self._cluster_origin(cid)
+            borders = [(cid, "E"), (cid, "S")]
+            if c0 > 0:
+                borders.append((cid - 1, "E"))
+            if r0 > 0:
+                borders.append((cid - self.cluster_cols, "S"))
+            for owner, side in borders:
+                if self._set_border(owner, side):
+                    dirty.add(owner)
+                    dirty.add(self._neighbour(owner, side))
+        self._rebuild(sorted(dirty))
+        return len(dirty)
+
+    # ---------- queries ----------
+
+    def _solve_exits(self):
+        """Dijkstra over the abstract graph from every node that sees an exit"""
+        to_exit, toward = {}, {}
+        heap = []
+        for distances in self.exit_dist.values():
+            for node, d in distances.items():
+                to_exit[node] = d
+                toward[node] = TO_EXIT
+                heap.append((d, node))
+        heapq.heapify(heap)
+        while heap:
+            d, a = heapq.heappop(heap)
+            if d > to_exit[a]:
+                continue
+            intra = self.intra[self._cluster_of(a)].get(a, {})
+            for neighbours in (intra, self.links.get(a, {})):
+                for b, w in neighbours.items():
+                    if d + w < to_exit.get(b, INF) and self._open(b):
+                        to_exit[b] = d + w
+                        toward[b] = a
+                        heapq.heappush(heap, (d + w, b))
+        self.to_exit, self.toward = to_exit, toward
+
+    def _local_search(self, src, cid):
+        """BFS from src inside its cluster: (distance, parent) over local indices"""
+        k = self.size
+        f, r0, c0 = self._cluster_origin(cid)
+        block = self.cells[f, r0:r0 + k, c0:c0 + k]
+        passable = (~self.blocked[block]).ravel().tolist()
+        _, r, c = self._cell(src)
+        start = (r - r0) * k + c - c0
+        dist = [-1] * (k * k)
+        parent = [-1] * (k * k)
+        dist[start] = 0
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            ir, ic = divmod(i, k)
+            for j, ok in ((i - k, ir > 0), (i + k, ir < k - 1), (i - 1, ic > 0), (i + 1, ic < k - 1)):
+                if ok and dist[j] == -1 and passable[j]:
+                    dist[j] = dist[i] + 1
+                    parent[j] = i
+                    queue.append(j)
+        return dist, parent
+
+    def _to_local(self, gid, cid):
+        _, r0, c0 = self._cluster_origin(cid)
+        _, r, c = self._cell(gid)
+        return (r - r0) * self.size + c - c0
+
+    def _walk(self, parent, end, cid):
+        f, r0, c0 = self._cluster_origin(cid)
+        cells = []
+        while parent[end] != -1:
+            r, c = divmod(end, self.size)
+            cells.append((f, r0 + r, c0 + c))
+            end = parent[end]
+        cells.reverse()
+        return cells
+
+    def _nearest_local_exit(self, dist, cid):
+        f, r0, c0 = self._cluster_origin(cid)
+        k = self.size
+        block = self.cells[f, r0:r0 + k, c0:c0 + k]
+        best = None
+        for r, c in np.argwhere(block == EXIT).tolist():
+            d = dist[r * k + c]
+            if d != -1 and (best is None or d < dist[best]):
+                best = r * k + c
+        return best
+
+    def _search_exit(self, sources, bound):
+        """
+        Dijkstra over the abstract graph from sources {node: distance}, stopping
+        as soon as no route shorter than bound can remain. Returns the best
+        distance, the source node the route leaves from and a toward map along
+        it, or (bound, None, None).
+        """
+        dist, parent = dict(sources), {}
+        heap = [(d, node) for node, d in sources.items()]
+        heapq.heapify(heap)
+        best, last = bound, None
+        while heap:
+            d, a = heapq.heappop(heap)
+            if d >= best:
+                break
+            if d > dist[a]:
+                continue
+            e = self.exit_dist[self._cluster_of(a)].get(a)
+            if e is not None and d + e < best:
+                best, last = d + e, a
+            intra = self.intra[self._cluster_of(a)].get(a, {})
+            for neighbours in (intra, self.links.get(a, {})):
+                for b, w in neighbours.items():
+                    if d + w < dist.get(b, INF) and self._open(b):
+                        dist[b] = d + w
+                        parent[b] = a
+                        heapq.heappush(heap, (d + w, b))
+        if last is None:
+            return bound, None, None
+        toward = {last: TO_EXIT}
+        while last in parent:
+            toward[parent[last]] = last
+            last = parent[last]
+        return best, last, toward
+
+    def _plan(self, start, search=False):
+        """
+        Route to the nearest exit through the start's cluster. With search, the
+        abstract part is a Dijkstra from this start only instead of the exit table.
+        """
+        if not self._open(start):
+            return None
+        cid = self._cluster_of(start)
+        dist, parent = self._local_search(start, cid)
+        best, via, toward = INF, None, self.toward
+        local_exit = self._nearest_local_exit(dist, cid)
+        if local_exit is not None:
+            best = dist[local_exit]
+        sources = {}
+        for node in self.nodes[cid]:
+            d = dist[self._to_local(node, cid)]
+            if d != -1:
+                sources[node] = d
+        if search:
+            best, via, toward = self._search_exit(sources, best)
+        else:
+            if self.to_exit is None:
+                self._solve_exits()
+                toward = self.toward
+            for node, d in sources.items():
+                if node in self.to_exit and d + self.to_exit[node] < best:
+                    best, via = d + self.to_exit[node], node
+        if best == INF:
+            return None
+        return best, via, toward, local_exit, parent, cid
+
+    def _full(self, start):
+        return self._gid(*start) if len(start) == 3 else self._gid(0, *start)
+
+    def distance(self, start):
+        """Steps from start ((row, col) or (floor, row, col)) to the nearest exit, or None"""
+        plan = self._plan(self._full(start))
+        return None if plan is None else plan[0]
+
+    def _segment(self, a, b, cid):
+        """Cells after a up to b (an exit when b is TO_EXIT) inside cluster cid, cached"""
+        cache = self.segments.setdefault(cid, {})
+        if (a, b) not in cache:
+            dist, parent = self._local_search(a, cid)
+            end = self._nearest_local_exit(dist, cid) if b == TO_EXIT else self._to_local(b, cid)
+            cache[(a, b)] = self._walk(parent, end, cid)
+        return cache[(a, b)]
+
+    def path(self, start, search=False):
+        """
+        Route from start to the nearest exit in the same form as astar():
+        the cells after start, ending on an exit. Cells are (row, col) when
+        start is, and (floor, row, col) otherwise. search routes without the
+        abstract exit table (see paths()).
+        """
+        plan = self._plan(self._full(start), search and self.to_exit is None)
+        if plan is None:
+            return None
+        _, node, toward, local_exit, parent, cid = plan
+        if node is None:
+            cells = self._walk(parent, local_exit, cid)
+        else:
+            cells = self._walk(parent, self._to_local(node, cid), cid)
+            while True:
+                nxt = toward[node]
+                cid = self._cluster_of(node)
+                if nxt == TO_EXIT:
+                    cells += self._segment(node, TO_EXIT, cid)
+                    break
+                if self._cluster_of(nxt) == cid and nxt not in self.links.get(node, ()):
+                    cells += self._segment(node, nxt, cid)
+                else:
+                    cells.append(self._cell(nxt))
+                node = nxt
+        if len(start) == 2:
+            return [(r, c) for _, r, c in cells]
+        return cells
+
+    def paths(self, starts):
+        """
+        path() for every start. Solving the exit table labels the whole
+        abstract graph, so while it is unsolved (after a build or an edit) a
+        few starts are routed with searches that stop at their nearest exit.
+        """
+        search = len(starts) < TABLE_QUERIES
+        return [self.path(start, search) for start in starts]
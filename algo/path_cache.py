@@ -0,0 +1,191 @@
+"""
+Evacuation result cache keyed by grid content.
+
+GridHash is a Zobrist-style hash of the cells that matter for routing. Each
+(cell, code) pair maps to a pseudo-random 64-bit word (splitmix64 of the
+pair, so no table is stored, even for maps with millions of cells), and the
+hash is the XOR of the words of all cells. People and drawn paths count as
+floor, and floor contributes nothing. One edit updates the hash with two
+XORs. A second hash covers the exit cells alone.
+
+PathCache keeps finished evacuations under (grid hash, exit hash, starts,
+options). When a cell changes, the cache does not just drop everything
+filed under the old hash. Each entry is checked against the edit and moves
+to the new hash if its routes are still optimal:
+
+  - an edit on a cached route (or, for fire-aware routing, within its
+    margin) invalidates it;
+  - an edit that opens a cell or adds an exit elsewhere invalidates it only
+    if a route through that cell could beat a cached one. Any such route
+    is at least dist(start, cell) + dist(cell, nearest exit) steps long,
+    less twice the margin for fire-aware routing;
+  - anything else (a wall or fire off the routes, a person placed
+    elsewhere) only makes other routes worse, so the entry stays.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from .pathfinding import EMPTY, WALL, FIRE, EXIT, PERSON, PATH, BLOCKED
+
+# Code each cell is hashed as; people and drawn paths route like floor
+ROUTING_CODE = {EMPTY: EMPTY, PERSON: EMPTY, PATH: EMPTY, WALL: WALL, FIRE: FIRE, EXIT: EXIT}
+# Finished evacuations kept, least recently used dropped first
+CACHE_SIZE = 64
+
+MASK64 = (1 << 64) - 1
+
+
+def zobrist(index, code):
+    """64-bit word of one (flat cell index, routing code) pair; floor is 0"""
+    if code == EMPTY:
+        return 0
+    z = ((index << 3) | code) + 0x9E3779B97F4A7C15 & MASK64
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & MASK64
+    return z ^ (z >> 31)
+
+
+def _zobrist_all(indices, codes):
+    """zobrist() over arrays of indices and non-floor codes, XOR-folded"""
+    z = (indices.astype(np.uint64) << np.uint64(3)) | codes.astype(np.uint64)
+    z += np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return int(np.bitwise_xor.reduce(z)) if z.size else 0
+
+
+class GridHash:
+    """Zobrist hash of a grid's routing content, updated one edit at a time"""
+
+    def __init__(self, grid):
+        cells = np.asarray(grid, dtype=np.uint8)
+        self.cols = cells.shape[1]
+        table = np.zeros(256, dtype=np.uint8)
+        for code, routing in ROUTING_CODE.items():
+            table[code] = routing
+        flat = table[cells.ravel()]
+        occupied = np.flatnonzero(flat)
+        self.value = _zobrist_all(occupied, flat[occupied])
+        exits = np.flatnonzero(flat == EXIT)
+        self.exits = _zobrist_all(exits, flat[exits])
+
+    def update(self, row, col, old, new):
+        """Apply one cell edit; returns False when it does not change routing"""
+        old, new = ROUTING_CODE[old], ROUTING_CODE[new]
+        if old == new:
+            return False
+        index = row * self.cols + col
+        self.value ^= zobrist(index, old) ^ zobrist(index, new)
+        for code in (old, new):
+            if code == EXIT:
+                self.exits ^= zobrist(index, EXIT)
+        return True
+
+
+class _Entry:
+    def __init__(self, result, radius, diagonal, cost_factor):
+        self.result = result
+        self.radius = radius
+        self.diagonal = diagonal
+        self.cells = {cell for path in result.paths if path for cell in path}
+        self.cells.update(result.starts)
+        # Most a cached route can cost per step, so bounds compare safely with len(path)
+        self.routes = [(start, len(path) * cost_factor)
+                       for start, path in zip(result.starts, result.paths) if path is not None]
+        self.stranded = len(self.routes) < len(result.starts)
+
+    def distance(self, a, b):
+        dr, dc = abs(a[0] - b[0]), abs(a[1] - b[1])
+        return max(dr, dc) if self.diagonal else dr + dc
+
+    def near(self, cell):
+        r, c = cell
+        k = self.radius
+        if not k:
+            return cell in self.cells
+        return any((r + dr, c + dc) in self.cells
+                   for dr in range(-k, k + 1) for dc in range(abs(dr) - k, k - abs(dr) + 1))
+
+    def survives(self, cell, old, new, exits):
+        """Are the cached routes still optimal after cell changed from old to new?"""
+        if self.near(cell):
+            return False
+        opens = (old in BLOCKED and new not in BLOCKED) or new == EXIT or self.radius > 0
+        if not opens:
+            return True
+        # A person without a route may get one through any opened cell
+        if self.stranded:
+            return False
+        to_exit = 0 if new == EXIT else min((self.distance(cell, e) for e in exits), default=None)
+        if to_exit is None:
+            return True
+        return all(self.distance(start, cell) + to_exit - 2 * self.radius >= cost
+                   for start, cost in self.routes)
+
+
+class PathCache:
+    """LRU cache of Evacuation results that survives edits away from the cached routes"""
+
+    def __init__(self, grid, size=CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        # Entries dropped because an edit could change their routes
+        self.invalidated = 0
+        self.reset(grid)
+
+    def reset(self, grid):
+        """Start over on a new or replaced grid"""
+        self.hash = GridHash(grid)
+        self.exits = {(int(r), int(c)) for r, c in np.argwhere(np.asarray(grid) == EXIT)}
+        self.entries = OrderedDict()
+
+    def _key(self, starts, options):
+        return self.hash.value, self.hash.exits, tuple(starts), options
+
+    def get(self, starts, options):
+        key = self._key(starts, options)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry.result
+
+    def put(self, starts, options, result, radius=0, diagonal=False, cost_factor=1.0):
+        """
+        Cache a result. radius: how far edits can change route costs (the
+        fire margin for fire-aware routing); cost_factor: the most one step
+        can cost.
+        """
+        self.entries[self._key(starts, options)] = _Entry(result, radius, diagonal, cost_factor)
+        self.entries.move_to_end(self._key(starts, options))
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def edit(self, row, col, old, new):
+        """Record a cell edit; re-files the entries it cannot affect"""
+        if not self.hash.update(row, col, old, new):
+            return
+        cell = (row, col)
+        if new == EXIT:
+            self.exits.add(cell)
+        else:
+            self.exits.discard(cell)
+        old, new = ROUTING_CODE[old], ROUTING_CODE[new]
+        kept = OrderedDict()
+        for (_, _, starts, options), entry in self.entries.items():
+            if entry.survives(cell, old, new, self.exits):
+                kept[self._key(starts, options)] = entry
+            else:
+                self.invalidated += 1
+        self.entries = kept
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        rate = 100 * self.hits / lookups if lookups else 0.0
+        return (f"🗄️ Path cache: {self.hits} hits / {self.misses} misses ({rate:.0f}%) | "
+                f"{len(self.entries)} cached, {self.invalidated} invalidated")
@@ -0,0 +1,60 @@
+"""
+Grid model and A* search shared by the GUI and the headless tools.
+
+Cells hold one of the integer codes below; WALL and FIRE are impassable.
+"""
+import heapq
+
+EMPTY = 0
+WALL = 1
+FIRE = 2
+EXIT = 3
+PERSON = 4
+PATH = 5
+
+BLOCKED = (WALL, FIRE)
+NEIGHBORS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+def heuristic(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+def astar(grid, start, goals):
+    rows = len(grid)
+    cols = len(grid[0])
+
+    open_set = []
+    heapq.heappush(open_set, (0, start))
+
+    came_from = {}
+    g_score = {start: 0}
+
+    while open_set:
+        _, current = heapq.heappop(open_set)
+
+        if current in goals:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            path.reverse()
+            return path
+
+        for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
+            nr, nc = current[0] + dx, current[1] + dy
+
+            if 0 <= nr < rows and 0 <= nc < cols:
+                if grid[nr][nc] in (WALL, FIRE):
+                    continue
+
+                neighbor = (nr, nc)
+                tentative_g = g_score[current] + 1
+
+                if tentative_g < g_score.get(neighbor, float("inf")):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    f_score = tentative_g + min(
+                        heuristic(neighbor, g) for g in goals
+                    )
+                    heapq.heappush(open_set, (f_score, neighbor))
+
+    return None
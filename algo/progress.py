@@ -0,0 +1,48 @@
+"""
+Progress reporting and cooperative cancellation for long searches.
+
+A search that is given a SearchProgress calls report() every
+REPORT_EVERY expansions (once per BFS level for the distance field). The
+thread that started the search polls `expanded` and `frontier` and may call
+cancel(); the next report() then raises Cancelled inside the search.
+
+Reports only assign attributes, so the searching thread and the polling
+thread need no lock.
+"""
+
+# Expansions between two progress reports
+REPORT_EVERY = 1024
+# Largest frontier sample kept for display
+FRONTIER_SAMPLE = 256
+
+
+class Cancelled(Exception):
+    """The search was stopped through SearchProgress.cancel()"""
+
+
+class SearchProgress:
+    def __init__(self):
+        # Nodes expanded so far, over every search of the run
+        self.expanded = 0
+        # Sample of (row, col) cells on the open frontier at the last report
+        self.frontier = []
+        self.cancelled = False
+        self._finished = 0
+
+    def report(self, expanded, frontier=()):
+        """Called by the search with its own expansion count so far"""
+        if self.cancelled:
+            raise Cancelled()
+        self.expanded = self._finished + expanded
+        if frontier:
+            self.frontier = frontier[:FRONTIER_SAMPLE]
+
+    def finish(self, expanded):
+        """Called once a search is over; later searches count on top of it"""
+        if self.cancelled:
+            raise Cancelled()
+        self._finished += expanded
+        self.expanded = self._finished
+
+    def cancel(self):
+        self.cancelled = True
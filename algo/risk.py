@@ -0,0 +1,61 @@
+"""
+Fire-proximity risk for evacuation routing.
+
+Fire only blocks its own cell, so a shortest route may run right along a
+burning wall. Here every cell gets its distance to the nearest fire, from
+one multi-source BFS that starts at every FIRE cell and spreads through
+anything but walls (smoke goes round walls, not through them). Entering a
+cell within `margin` steps of fire then costs extra, rising linearly from
+weight / margin at the edge of the margin to weight next to the fire:
+
+    cost(cell) = 1 + weight * (margin + 1 - d) / margin     for 1 <= d <= margin
+    cost(cell) = 1                                           otherwise
+
+Every step still costs at least 1, so the plain distance heuristics of the
+search strategies stay admissible and weighted A* still returns the least
+costly route. margin=0 gives plain shortest paths; a larger margin (or
+weight) buys distance from the fire with extra steps.
+
+The field is computed once per grid state and shared by every person's
+search.
+"""
+import numpy as np
+
+from .distance_field import UNREACHABLE, compute_distance_field
+from .pathfinding import WALL, FIRE
+
+# Steps from fire within which cells cost extra
+DEFAULT_MARGIN = 3
+# Extra cost of a cell right next to fire
+RISK_WEIGHT = 4.0
+
+
+def fire_distance(grid):
+    """(rows, cols) int32 steps to the nearest fire, UNREACHABLE where no fire can spread"""
+    cells = np.asarray(grid, dtype=np.uint8)
+    field = compute_distance_field(cells, blocked=(WALL,), sources=(FIRE,))
+    return field.dist.reshape(cells.shape)
+
+
+def step_costs(fire_dist, margin=DEFAULT_MARGIN, weight=RISK_WEIGHT):
+    """(rows, cols) float cost of entering each cell (see module docstring)"""
+    costs = np.ones(fire_dist.shape, dtype=np.float64)
+    if margin <= 0:
+        return costs
+    near = (fire_dist != UNREACHABLE) & (fire_dist <= margin)
+    costs[near] += weight * (margin + 1 - fire_dist[near]) / margin
+    return costs
+
+
+def clearance(fire_dist, paths):
+    """Closest any routed path comes to fire, in steps (None without fire on the way)"""
+    closest = None
+    for path in paths:
+        if not path:
+            continue
+        rows, cols = zip(*path)
+        d = fire_dist[list(rows), list(cols)]
+        d = d[d != UNREACHABLE]
+        if d.size and (closest is None or d.min() < closest):
+            closest = int(d.min())
+    return closest
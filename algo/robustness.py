@@ -0,0 +1,220 @@
+"""
+Monte-Carlo robustness study of a floor plan under random fires.
+
+Each trial ignites `fires` random floor cells, lets them spread for `ticks`
+ticks with the stochastic FireSpread model, and asks, for every person:
+can they still reach an exit, and how much longer is their way out?
+
+The exit distance field of the fire-free plan is computed once. A trial
+that burns no cell of any person's baseline route reuses it as is, since
+fire only blocks cells, so those routes stay valid and shortest. Only
+trials that cut a route pay for a new field, one BFS for everyone.
+
+Trials are spread over a process pool. Trial i always draws from the i-th
+child of SeedSequence(seed), so a study gives the same numbers for any
+number of workers or chunk size. Workers return partial sums and the
+parent adds them up, so the per-cell heatmaps are plain NumPy count arrays:
+
+    burn_probability   fraction of trials in which the cell burned
+    route_use          fraction of trials in which some route used the cell
+    ignition_risk      of the trials ignited at the cell, the fraction
+                       that trapped at least one person
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .distance_field import UNREACHABLE, compute_distance_field
+from .fire import FireSpread
+from .pathfinding import EMPTY, FIRE, PERSON, PATH
+
+# Trials handed to a worker at once
+CHUNK = 64
+
+_COUNTS = ("burned", "route_use", "ignited", "ignited_trapping")
+_PER_PERSON = ("trapped", "reached", "growth_sum", "growth_max")
+
+
+class _Baseline:
+    """Fire-free routes of every person, shared by all trials of a worker"""
+
+    def __init__(self, grid, starts, fires, ticks, spread_probability):
+        self.cells = np.asarray(grid, dtype=np.uint8).copy()
+        self.cells[self.cells == PATH] = EMPTY
+        self.shape = self.cells.shape
+        self.fires, self.ticks, self.spread_probability = fires, ticks, spread_probability
+        cols = self.shape[1]
+        self.starts = np.array([r * cols + c for r, c in starts], dtype=np.int64)
+
+        field = compute_distance_field(self.cells)
+        self.distance = field.dist[self.starts]
+        paths = field.paths(starts)
+        # Flat cells of every baseline route, with the person each belongs to
+        route_cells = [np.array([r * cols + c for r, c in path or ()], dtype=np.int64) for path in paths]
+        self.route_cells = np.concatenate(route_cells + [self.starts])
+        self.route_owner = np.concatenate(
+            [np.full(len(cells), i) for i, cells in enumerate(route_cells)] + [np.arange(len(self.starts))]
+        )
+        # Ignition candidates: plain floor
+        self.floor = np.flatnonzero(self.cells.ravel() == EMPTY)
+
+    def trial(self, seed, totals):
+        """Run one trial and add its outcome to totals"""
+        rng = np.random.default_rng(seed)
+        ignition = rng.choice(self.floor, size=min(self.fires, self.floor.size), replace=False)
+        cells = self.cells.copy()
+        cells.flat[ignition] = FIRE
+        fire = FireSpread(cells, self.spread_probability, seed=rng)
+        for _ in range(self.ticks):
+            fire.step()
+        burned = fire.burning
+
+        cut = np.unique(self.route_owner[burned[self.route_cells]])
+        if cut.size:
+            cells.flat[burned] = FIRE
+            field = compute_distance_field(cells)
+            distance = field.dist[self.starts]
+            totals["recomputed"] += 1
+        else:
+            field = None
+            distance = self.distance
+        totals["trials"] += 1
+
+        trapped = (distance == UNREACHABLE) & (self.distance != UNREACHABLE)
+        reached = distance != UNREACHABLE
+        growth = np.where(reached, distance - self.distance, 0)
+        totals["trapped"] += trapped
+        totals["reached"] += reached
+        totals["growth_sum"] += growth
+        np.maximum(totals["growth_max"], growth, out=totals["growth_max"])
+
+        totals["burned"] += burned
+        # Routes: the baseline ones where intact, the new field's where cut
+        intact = np.ones(len(self.starts), dtype=bool)
+        intact[cut] = False
+        used = np.zeros(burned.size, dtype=bool)
+        used[self.route_cells[intact[self.route_owner]]] = True
+        if field is not None:
+            cols = self.shape[1]
+            for i in cut.tolist():
+                for r, c in field.path(divmod(int(self.starts[i]), cols)) or ():
+                    used[r * cols + c] = True
+        totals["route_use"] += used
+        totals["ignited"][ignition] += 1
+        if trapped.any():
+            totals["ignited_trapping"][ignition] += 1
+
+
+def _empty_totals(cells, people):
+    totals = {name: np.zeros(cells, dtype=np.int64) for name in _COUNTS}
+    totals.update({name: np.zeros(people, dtype=np.int64) for name in _PER_PERSON})
+    totals.update(trials=0, recomputed=0)
+    return totals
+
+
+_worker = None
+
+
+def _init_worker(grid, starts, fires, ticks, spread_probability):
+    global _worker
+    _worker = _Baseline(grid, starts, fires, ticks, spread_probability)
+
+
+def _run_chunk(seeds):
+    totals = _empty_totals(_worker.cells.size, len(_worker.starts))
+    for seed in seeds:
+        _worker.trial(seed, totals)
+    return totals
+
+
+def _add(totals, part):
+    for name, value in part.items():
+        if name == "growth_max":
+            np.maximum(totals[name], value, out=totals[name])
+        else:
+            totals[name] += value
+
+
+class RobustnessStudy:
+    """Aggregated outcome of a Monte-Carlo fire study"""
+
+    def __init__(self, shape, starts, baseline, totals):
+        self.shape = shape
+        self.starts = starts
+        # Fire-free distance of every person to the nearest exit
+        self.baseline = baseline
+        self.trials = totals["trials"]
+        # Trials that needed a new distance field instead of reusing the baseline
+        self.recomputed = totals["recomputed"]
+        self.totals = totals
+
+    @property
+    def trapped_fraction(self):
+        """Per person: fraction of trials in which no exit could be reached"""
+        return self.totals["trapped"] / max(self.trials, 1)
+
+    @property
+    def mean_growth(self):
+        """Per person: average extra steps over the trials they got out in"""
+        reached = self.totals["reached"]
+        return np.divide(self.totals["growth_sum"], reached, out=np.zeros(len(reached)), where=reached > 0)
+
+    @property
+    def max_growth(self):
+        return self.totals["growth_max"]
+
+    def heatmaps(self):
+        """Per-cell (rows, cols) float arrays, see the module docstring"""
+        trials = max(self.trials, 1)
+        ignited = self.totals["ignited"]
+        ignition_risk = np.divide(self.totals["ignited_trapping"], ignited,
+                                  out=np.zeros(ignited.shape), where=ignited > 0)
+        return {
+            "burn_probability": (self.totals["burned"] / trials).reshape(self.shape),
+            "route_use": (self.totals["route_use"] / trials).reshape(self.shape),
+            "ignition_risk": ignition_risk.reshape(self.shape),
+        }
+
+    def people(self):
+        """One row per person: start, fire-free distance, trapped fraction, growth"""
+        return [
+            {"start": start, "baseline": None if base == UNREACHABLE else int(base),
+             "trapped_fraction": round(float(trapped), 6), "mean_growth": round(float(mean), 3),
+             "max_growth": int(worst)}
+            for start, base, trapped, mean, worst in zip(
+                self.starts, self.baseline.tolist(), self.trapped_fraction, self.mean_growth, self.max_growth)
+        ]
+
+    def save(self, path):
+        """Heatmaps and per-person arrays in one compressed .npz file"""
+        np.savez_compressed(
+            path, starts=np.array(self.starts, dtype=np.int64).reshape(-1, 2), baseline=self.baseline,
+            trapped_fraction=self.trapped_fraction, mean_growth=self.mean_growth,
+            max_growth=self.max_growth, trials=self.trials, recomputed=self.recomputed,
+            **self.heatmaps()
+        )
+
+
+def run_study(grid, starts=None, trials=1000, fires=1, ticks=10, spread_probability=0.3,
+              seed=0, jobs=1):
+    """
+    Run `trials` random fires on grid and aggregate what they do to the
+    people at starts (by default every PERSON cell).
+    """
+    if starts is None:
+        starts = [(int(r), int(c)) for r, c in np.argwhere(np.asarray(grid) == PERSON)]
+    args = (np.asarray(grid, dtype=np.uint8), starts, fires, ticks, spread_probability)
+    seeds = np.random.SeedSequence(seed).spawn(trials)
+    chunks = [seeds[i:i + CHUNK] for i in range(0, trials, CHUNK)]
+
+    _init_worker(*args)
+    baseline = _worker
+    totals = _empty_totals(baseline.cells.size, len(starts))
+    if jobs <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            _add(totals, _run_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=args) as pool:
+            for part in pool.map(_run_chunk, chunks):
+                _add(totals, part)
+    return RobustnessStudy(baseline.shape, starts, baseline.distance, totals)
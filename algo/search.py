@@ -0,0 +1,404 @@
+"""
+Selectable search strategies behind one pathfinding API.
+
+    find_path(grid, start, goals, strategy="jps", diagonal=True)
+
+Strategies (all optimal: they return a least-cost path or None):
+    astar          A* with a closed set and ties broken on h
+    bidirectional  A* from the start and from every goal at once, stopping
+                   when the best meeting cost cannot be beaten by either side
+    jps            Jump Point Search: skips over the symmetric paths of
+                   uniform-cost grids and only expands jump points
+
+With diagonal=False people move in 4 directions at cost 1 under the
+Manhattan heuristic. With diagonal=True they may also move diagonally at
+cost sqrt(2) under the octile heuristic, but never cut a wall corner: a
+diagonal step needs both orthogonal neighbours to be free.
+
+astar also takes per-cell costs: entering a cell then costs its weight
+(at least 1) times the move length, so the heuristics stay admissible. The
+other strategies rely on uniform costs and reject them.
+
+All strategies run on the padded GridCore buffer; a list-of-lists grid is
+copied into one first.
+"""
+import heapq
+import math
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+from .grid_core import GridCore, OUTSIDE
+from .pathfinding import BLOCKED
+from .progress import FRONTIER_SAMPLE, REPORT_EVERY
+
+SQRT2 = math.sqrt(2)
+INF = float("inf")
+
+SearchResult = namedtuple("SearchResult", "path cost expanded")
+
+
+class _Problem:
+    """Flat passability map, goal set and heuristic shared by every strategy"""
+
+    def __init__(self, grid, start, goals, blocked, diagonal, progress=None):
+        core = grid if isinstance(grid, GridCore) else GridCore.from_rows(grid)
+        self.core = core
+        self.width = width = core.width
+        self.diagonal = diagonal
+        self.progress = progress
+
+        table = bytearray([1]) * 256
+        for code in (*blocked, OUTSIDE):
+            table[code] = 0
+        # One byte per cell: 1 if the cell can be entered
+        self.open = bytes(core.cells).translate(table)
+
+        self.src = core.index(start)
+        self.goals = {core.index(g) for g in goals}
+        self.goal_rc = [divmod(g, width) for g in self.goals]
+
+        steps = [(-width, 1.0), (width, 1.0), (-1, 1.0), (1, 1.0)]
+        if diagonal:
+            steps += [(-width - 1, SQRT2), (-width + 1, SQRT2), (width - 1, SQRT2), (width + 1, SQRT2)]
+        self.steps = steps
+
+    def distance(self, a_rc, b_rc):
+        dr = abs(a_rc[0] - b_rc[0])
+        dc = abs(a_rc[1] - b_rc[1])
+        if self.diagonal:
+            return dr + dc + (SQRT2 - 2) * min(dr, dc)
+        return dr + dc
+
+    def h_goals(self, idx):
+        rc = divmod(idx, self.width)
+        return min(self.distance(rc, g) for g in self.goal_rc)
+
+    def h_start(self, idx):
+        return self.distance(divmod(idx, self.width), divmod(self.src, self.width))
+
+    def moves(self, idx):
+        """Enterable neighbours with their step cost; diagonals may not cut corners"""
+        op, width = self.open, self.width
+        for offset, cost in self.steps:
+            nb = idx + offset
+            if not op[nb]:
+                continue
+            if cost != 1.0:
+                dr = -width if offset < 0 else width
+                dc = offset - dr
+                if not (op[idx + dr] and op[idx + dc]):
+                    continue
+            yield nb, cost
+
+    def cells(self, indices):
+        return [self.core.cell(i) for i in indices]
+
+    def weigh(self, costs):
+        """Make moves() charge the (rows, cols) entry costs, laid out like the padded buffer"""
+        core = self.core
+        padded = np.ones((core.rows + 2, core.width))
+        padded[1:-1, 1:-1] = costs
+        self.weight = padded.ravel().tolist()
+        self.moves = self.weighted_moves
+
+    def weighted_moves(self, idx):
+        weight = self.weight
+        for nb, cost in _Problem.moves(self, idx):
+            yield nb, cost * weight[nb]
+
+    def report(self, expanded, queue):
+        """Pass the expansion count and a sample of open cells to the progress object"""
+        self.progress.report(expanded, self.cells(entry[-1] for entry in queue[:FRONTIER_SAMPLE]))
+
+
+def _walk_back(parent, idx, stop):
+    chain = []
+    while idx != stop:
+        chain.append(idx)
+        idx = parent[idx]
+    chain.reverse()
+    return chain
+
+
+# ---------- A* ----------
+
+def _astar(problem):
+    src, progress = problem.src, problem.progress
+    n = len(problem.open)
+    g = array("d", [INF]) * n
+    parent = array("l", [-1]) * n
+    closed = bytearray(n)
+    g[src] = 0.0
+    h0 = problem.h_goals(src)
+    open_set = [(h0, h0, src)]
+    expanded = 0
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+        if progress is not None and not expanded % REPORT_EVERY:
+            problem.report(expanded, open_set)
+        if current in problem.goals:
+            return problem.cells(_walk_back(parent, current, src)), g[current], expanded
+
+        for nb, cost in problem.moves(current):
+            tentative = g[current] + cost
+            if not closed[nb] and tentative < g[nb]:
+                g[nb] = tentative
+                parent[nb] = current
+                hn = problem.h_goals(nb)
+                heapq.heappush(open_set, (tentative + hn, hn, nb))
+
+    return None, None, expanded
+
+
+# ---------- bidirectional A* ----------
+
+def _bidirectional(problem):
+    src, progress = problem.src, problem.progress
+    n = len(problem.open)
+    g = (array("d", [INF]) * n, array("d", [INF]) * n)
+    parent = (array("l", [-1]) * n, array("l", [-1]) * n)
+    closed = (bytearray(n), bytearray(n))
+    heuristic = (problem.h_goals, problem.h_start)
+
+    g[0][src] = 0.0
+    queues = ([(heuristic[0](src), src)], [])
+    for goal in problem.goals:
+        g[1][goal] = 0.0
+        queues[1].append((heuristic[1](goal), goal))
+    heapq.heapify(queues[1])
+
+    best, meet = INF, -1
+    if src in problem.goals:
+        best, meet = 0.0, src
+    expanded = 0
+
+    while queues[0] and queues[1]:
+        # With consistent heuristics no path through either frontier can beat best
+        if best <= max(queues[0][0][0], queues[1][0][0]):
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        _, current = heapq.heappop(queues[side])
+        if closed[side][current]:
+            continue
+        closed[side][current] = 1
+        expanded += 1
+        if progress is not None and not expanded % REPORT_EVERY:
+            problem.report(expanded, queues[side])
+
+        g_side, g_other = g[side], g[1 - side]
+        for nb, cost in problem.moves(current):
+            tentative = g_side[current] + cost
+            if tentative < g_side[nb]:
+                g_side[nb] = tentative
+                parent[side][nb] = current
+                heapq.heappush(queues[side], (tentative + heuristic[side](nb), nb))
+                if tentative + g_other[nb] < best:
+                    best, meet = tentative + g_other[nb], nb
+
+    if meet == -1:
+        return None, None, expanded
+
+    forward = _walk_back(parent[0], meet, src)
+    backward = []
+    idx = meet
+    while idx not in problem.goals:
+        idx = parent[1][idx]
+        backward.append(idx)
+    return problem.cells(forward + backward), best, expanded
+
+
+# ---------- Jump Point Search ----------
+
+def _jps(problem):
+    op, width, goals = problem.open, problem.width, problem.goals
+
+    def jump4(idx, d):
+        """Scan from idx in direction d until a jump point; -1 if the scan dies"""
+        horizontal = d in (1, -1)
+        while True:
+            if not op[idx]:
+                return -1
+            if idx in goals:
+                return idx
+            if horizontal:
+                if (op[idx - width] and not op[idx - d - width]) or (op[idx + width] and not op[idx - d + width]):
+                    return idx
+            else:
+                if (op[idx - 1] and not op[idx - d - 1]) or (op[idx + 1] and not op[idx - d + 1]):
+                    return idx
+                # A vertical scan stops wherever a horizontal scan would find something
+                if jump4(idx + 1, 1) != -1 or jump4(idx - 1, -1) != -1:
+                    return idx
+            idx += d
+
+    def jump8(idx, dr, dc):
+        while True:
+            if not op[idx]:
+                return -1
+            if idx in goals:
+                return idx
+            if dr and dc:
+                if jump8(idx + dc, 0, dc) != -1 or jump8(idx + dr, dr, 0) != -1:
+                    return idx
+                if not (op[idx + dc] and op[idx + dr]):
+                    return -1
+            elif dc:
+                if (op[idx - width] and not op[idx - dc - width]) or (op[idx + width] and not op[idx - dc + width]):
+                    return idx
+            else:
+                if (op[idx - 1] and not op[idx - dr - 1]) or (op[idx + 1] and not op[idx - dr + 1]):
+                    return idx
+            idx += dr + dc
+
+    def directions(idx, parent_idx):
+        """Flat offsets of the directions worth scanning from idx (pruned by parent)"""
+        if parent_idx == -1:
+            return [nb - idx for nb, _ in problem.moves(idx)]
+        r, c = divmod(idx, width)
+        pr, pc = divmod(parent_idx, width)
+        dr = width * ((r > pr) - (r < pr))
+        dc = (c > pc) - (c < pc)
+        result = []
+        if not problem.diagonal:
+            if dc:
+                for d in (-width, width, dc):
+                    if op[idx + d]:
+                        result.append(d)
+            else:
+                for d in (-1, 1, dr):
+                    if op[idx + d]:
+                        result.append(d)
+            return result
+        if dr and dc:
+            if op[idx + dr]:
+                result.append(dr)
+            if op[idx + dc]:
+                result.append(dc)
+            if op[idx + dr] and op[idx + dc] and op[idx + dr + dc]:
+                result.append(dr + dc)
+        elif dc:
+            ahead, up, down = op[idx + dc], op[idx - width], op[idx + width]
+            if ahead:
+                result.append(dc)
+                if up and op[idx + dc - width]:
+                    result.append(dc - width)
+                if down and op[idx + dc + width]:
+                    result.append(dc + width)
+            if up:
+                result.append(-width)
+            if down:
+                result.append(width)
+        else:
+            ahead, left, right = op[idx + dr], op[idx - 1], op[idx + 1]
+            if ahead:
+                result.append(dr)
+                if left and op[idx + dr - 1]:
+                    result.append(dr - 1)
+                if right and op[idx + dr + 1]:
+                    result.append(dr + 1)
+            if left:
+                result.append(-1)
+            if right:
+                result.append(1)
+        return result
+
+    def split(d):
+        """Flat direction offset -> (row offset, column offset), both already scaled"""
+        dc = ((d + 1) % width) - 1
+        return d - dc, dc
+
+    src, progress = problem.src, problem.progress
+    g = {src: 0.0}
+    parent = {src: -1}
+    closed = set()
+    h0 = problem.h_goals(src)
+    open_set = [(h0, h0, src)]
+    expanded = 0
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)
+        if current in closed:
+            continue
+        closed.add(current)
+        expanded += 1
+        if progress is not None and not expanded % REPORT_EVERY:
+            problem.report(expanded, open_set)
+        if current in goals:
+            return problem.cells(_expand_jumps(_walk_back(parent, current, src), src, width)), g[current], expanded
+
+        current_rc = divmod(current, width)
+        for d in directions(current, parent[current]):
+            if problem.diagonal:
+                dr, dc = split(d)
+                point = jump8(current + d, dr, dc)
+            else:
+                point = jump4(current + d, d)
+            if point == -1 or point in closed:
+                continue
+            tentative = g[current] + problem.distance(current_rc, divmod(point, width))
+            if tentative < g.get(point, INF):
+                g[point] = tentative
+                parent[point] = current
+                hn = problem.h_goals(point)
+                heapq.heappush(open_set, (tentative + hn, hn, point))
+
+    return None, None, expanded
+
+
+def _expand_jumps(points, src, width):
+    """Fill in the straight or diagonal runs between consecutive jump points"""
+    path = []
+    previous = src
+    for point in points:
+        r, c = divmod(point, width)
+        pr, pc = divmod(previous, width)
+        step = width * ((r > pr) - (r < pr)) + ((c > pc) - (c < pc))
+        idx = previous
+        while idx != point:
+            idx += step
+            path.append(idx)
+        previous = point
+    return path
+
+
+STRATEGIES = {
+    "astar": _astar,
+    "bidirectional": _bidirectional,
+    "jps": _jps,
+}
+
+
+def find_path(grid, start, goals, strategy="astar", diagonal=False, blocked=BLOCKED, progress=None,
+              costs=None):
+    """
+    Least-cost path from start to the nearest goal with the chosen strategy.
+
+    Returns SearchResult(path, cost, expanded): path is a list of cells after
+    start ending on a goal (None if unreachable), cost its length in moves
+    (diagonals count sqrt(2)), and expanded the number of nodes the search
+    expanded. A SearchProgress passed as progress is updated while the
+    search runs, and cancelling it stops the search with Cancelled.
+
+    costs, a (rows, cols) array of per-cell entry weights >= 1, makes cost
+    the weighted total instead; only astar accepts it.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r}; choose from {', '.join(STRATEGIES)}")
+    if costs is not None and strategy != "astar":
+        raise ValueError(f"strategy {strategy!r} needs uniform costs; use astar for weighted routing")
+    problem = _Problem(grid, start, goals, blocked, diagonal, progress)
+    if costs is not None:
+        problem.weigh(costs)
+    if not problem.goals:
+        return SearchResult(None, None, 0)
+    result = SearchResult(*STRATEGIES[strategy](problem))
+    if progress is not None:
+        progress.finish(result.expanded)
+    return result
@@ -0,0 +1,239 @@
+"""
+التحكم في قبول الطلبات حسب تكلفتها
+
+لكل مسار تكلفة تقديرية بوحدة تقارب ميلي ثانية من وقت المعالج:
+    cost = base + per_kb × (حجم الجسم بالكيلوبايت)
+والمعاملات مأخوذة من قياس كل مشفر (Playfair أغلى من Additive، والـ bruteforce
+يقيّم كل المفاتيح بنموذج اللغة). المسار الذي لا يعتمد عمله على حجم الجسم
+(مثل /rc4/keystream المحدود بـ length) له تكلفة ثابتة.
+
+التكلفة تُحسب من Content-Length قبل قراءة الجسم أو تحليله، وإذا لم يُرسل
+Content-Length (chunked) يُقرأ الجسم حتى الحد الأقصى فقط:
+  - 413 إذا تجاوز الجسم max_bytes (أو حد المسار نفسه إن كان له حد)، أو كانت
+    التكلفة أكبر من سعة الـ bucket (لن يُقبل أبداً).
+  - 429 مع Retry-After إذا لم يبقَ للعميل رصيد كافٍ. لكل عميل (عنوان IP)
+    token bucket يمتلئ بـ rate وحدة في الثانية حتى burst، ويُخصم منه بقدر
+    التكلفة وليس بعدد الطلبات.
+  - الطلبات الغالية (cost >= heavy_cost) تمر عبر عدد محدود من الأماكن
+    (heavy_slots)، فلا تشغل كل الـ threads ويبقى للطلبات الرخيصة مكان.
+    إذا انتظر طلب غالٍ أكثر من heavy_wait ثانية يحصل على 429.
+
+مسارات الـ stream لا حد لحجمها، وتُخصم تكلفتها قطعة قطعة أثناء القراءة:
+عند نفاد الرصيد تتباطأ القراءة (backpressure) بدلاً من رفض الطلب.
+
+المسار قد يحتوي معاملات مثل /evacuation/grids/{grid_id}/routes، وكل معامل
+يطابق جزءاً واحداً من المسار. ردود المسارات العادية تحمل X-Request-Cost. الـ buckets في ذاكرة كل عملية،
+فمع عدة عمال يكون الحد لكل عامل. المسارات غير المذكورة واتصالات WebSocket لا تمر
+بهذا الفحص.
+"""
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024
+DEFAULT_RATE = 250.0
+DEFAULT_BURST = 1000.0
+DEFAULT_HEAVY_COST = 50.0
+DEFAULT_HEAVY_SLOTS = 2
+DEFAULT_HEAVY_WAIT = 10.0
+# عدد العملاء الذين نحتفظ بـ bucket لهم، ويُحذف الأقدم استخداماً أولاً
+MAX_CLIENTS = 10000
+
+
+class RouteCost:
+    """تكلفة مسار: base + per_kb لكل كيلوبايت من الجسم، وmax_bytes يغيّر حد الحجم العام"""
+
+    def __init__(self, per_kb=0.0, base=1.0, stream=False, max_bytes=None):
+        self.per_kb = per_kb
+        self.base = base
+        self.stream = stream
+        self.max_bytes = max_bytes
+
+    def cost(self, size):
+        return self.base + self.per_kb * size / 1024
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost):
+        """خصم التكلفة إن وُجد رصيد، وإلا إرجاع عدد الثواني حتى يكفي الرصيد"""
+        self._refill()
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def drain(self, cost):
+        """خصم التكلفة حتى لو أصبح الرصيد سالباً، وإرجاع وقت الانتظار المناسب"""
+        self._refill()
+        self.tokens -= cost
+        return max(0.0, -self.tokens / self.rate)
+
+
+class AdmissionControl:
+    """ASGI middleware يفرض حدود الحجم والتكلفة لكل مسار قبل تحليل الجسم"""
+
+    def __init__(self, app, routes, max_bytes=DEFAULT_MAX_BYTES, rate=DEFAULT_RATE,
+                 burst=DEFAULT_BURST, heavy_cost=DEFAULT_HEAVY_COST,
+                 heavy_slots=DEFAULT_HEAVY_SLOTS, heavy_wait=DEFAULT_HEAVY_WAIT):
+        self.app = app
+        # المسارات الثابتة بالبحث المباشر، والتي فيها {معامل} بتعبير منتظم
+        self.routes = {path: route for path, route in routes.items() if "{" not in path}
+        self.patterns = [(_template(path), route) for path, route in routes.items() if "{" in path]
+        self.max_bytes = max_bytes
+        # rate=0 يلغي حد المعدل ويبقي حدود الحجم
+        self.rate = rate
+        self.burst = burst
+        self.heavy_cost = heavy_cost
+        self.heavy_wait = heavy_wait
+        self.heavy = asyncio.Semaphore(heavy_slots)
+        self.buckets = OrderedDict()
+
+    def _bucket(self, scope):
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = self.buckets[client] = TokenBucket(self.rate, self.burst)
+            while len(self.buckets) > MAX_CLIENTS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client)
+        return bucket
+
+    def _route(self, path):
+        route = self.routes.get(path)
+        if route is None:
+            for pattern, cost in self.patterns:
+                if pattern.match(path):
+                    return cost
+        return route
+
+    async def __call__(self, scope, receive, send):
+        route = self._route(scope["path"]) if scope["type"] == "http" else None
+        if route is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        if route.stream:
+            await self._stream(route, scope, receive, send)
+            return
+
+        limit = self.max_bytes if route.max_bytes is None else route.max_bytes
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is None:
+            # بدون Content-Length: قراءة الجسم حتى الحد فقط ثم إعادته للتطبيق
+            body = await self._read(receive, limit)
+            if body is None:
+                await _reject(send, 413, f"حجم الطلب أكبر من الحد ({limit} بايت)")
+                return
+            size, receive = len(body), _replay(body, receive)
+        else:
+            size = int(length)
+            if size > limit:
+                await _reject(send, 413, f"حجم الطلب أكبر من الحد ({limit} بايت)")
+                return
+
+        cost = route.cost(size)
+        if self.rate:
+            if cost > self.burst:
+                await _reject(send, 413, f"تكلفة الطلب ({cost:.0f}) أكبر من الحد المسموح ({self.burst:.0f})")
+                return
+            wait = self._bucket(scope).take(cost)
+            if wait:
+                await _reject(send, 429, "تم تجاوز معدل الطلبات، حاول لاحقاً", wait)
+                return
+
+        send = _with_cost(send, cost)
+        if cost < self.heavy_cost:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await asyncio.wait_for(self.heavy.acquire(), self.heavy_wait)
+        except asyncio.TimeoutError:
+            await _reject(send, 429, "الخادم مشغول بطلبات غالية، حاول لاحقاً", self.heavy_wait)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.heavy.release()
+
+    async def _read(self, receive, limit):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return b""
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def _stream(self, route, scope, receive, send):
+        bucket = self._bucket(scope) if self.rate else None
+        if bucket is not None:
+            bucket.drain(route.base)
+
+        async def metered():
+            message = await receive()
+            if bucket is not None and message["type"] == "http.request":
+                wait = bucket.drain(route.per_kb * len(message.get("body", b"")) / 1024)
+                if wait:
+                    await asyncio.sleep(wait)
+            return message
+
+        await self.app(scope, metered, send)
+
+
+def _template(path):
+    """/grids/{grid_id} -> تعبير منتظم يطابق أي قيمة في مكان المعامل"""
+    parts = ("[^/]+" if part.startswith("{") else re.escape(part) for part in path.split("/"))
+    return re.compile("/".join(parts) + "$")
+
+
+def _replay(body, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+def _with_cost(send, cost):
+    header = (b"x-request-cost", f"{cost:.2f}".encode("latin-1"))
+
+    async def with_cost(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), header]}
+        await send(message)
+
+    return with_cost
+
+
+async def _reject(send, status, detail, retry_after=None):
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(math.ceil(retry_after)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,566 @@
+"""
+API لتشفير وفك التشفير باستخدام مختلف المشفرات
+"""
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.requests import ClientDisconnect
+from typing import List, Optional
+from collections import deque
+import codecs
+import logging
+import os
+
+# يتم تحميل كل مشفر عند أول طلب يستخدمه فقط
+import information_security as ciphers
+from api import admission
+from api.evacuation_api import router as evacuation_router
+from api.jobs import router as jobs_router
+from api.response_cache import (DEFAULT_DISK_BYTES, DEFAULT_MAX_BYTES, DEFAULT_TTL, CacheMiddleware,
+                                 ResponseCache)
+from api.sessions import router as sessions_router
+
+# CIPHER_API_WARMUP=1 يحمّل كل المشفرات عند الاستيراد، مفيد مع gunicorn --preload
+# حتى يتم بناء الجداول مرة واحدة قبل تفرع العمال
+if os.environ.get("CIPHER_API_WARMUP") == "1":
+    ciphers.warm_up()
+
+log = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="Cipher API",
+    description="API شامل لاستخدام مختلف المشفرات الكلاسيكية والحديثة",
+    version="1.0.0"
+)
+
+# مسارات الإخلاء تحت /evacuation (انظر api/evacuation_api.py)
+app.include_router(evacuation_router)
+# المهام الطويلة تحت /jobs (انظر api/jobs.py)
+app.include_router(jobs_router)
+# جلسات WebSocket بمفتاح ثابت تحت /ws/session (انظر api/sessions.py)
+app.include_router(sessions_router)
+
+
+# ========== نماذج البيانات ==========
+
+class EncryptRequest(BaseModel):
+    plaintext: str = Field(..., description="النص المراد تشفيره")
+    key: str = Field(..., description="المفتاح")
+
+
+class DecryptRequest(BaseModel):
+    ciphertext: str = Field(..., description="النص المشفر")
+    key: str = Field(..., description="المفتاح")
+
+
+class AdditiveEncryptRequest(BaseModel):
+    plaintext: str = Field(..., description="النص المراد تشفيره")
+    key: int = Field(..., ge=0, le=25, description="المفتاح (رقم من 0 إلى 25)")
+
+
+class AdditiveDecryptRequest(BaseModel):
+    ciphertext: str = Field(..., description="النص المشفر")
+    key: int = Field(..., ge=0, le=25, description="المفتاح (رقم من 0 إلى 25)")
+
+
+class MultiplicativeEncryptRequest(BaseModel):
+    plaintext: str = Field(..., description="النص المراد تشفيره")
+    key: int = Field(..., ge=1, le=25, description="المفتاح (رقم من 1 إلى 25)")
+
+
+class MultiplicativeDecryptRequest(BaseModel):
+    ciphertext: str = Field(..., description="النص المشفر")
+    key: int = Field(..., ge=1, le=25, description="المفتاح (رقم من 1 إلى 25)")
+
+
+class BruteforceRequest(BaseModel):
+    ciphertext: str = Field(..., description="النص المشفر")
+
+
+class RC4Request(BaseModel):
+    key: str = Field(..., description="المفتاح")
+    length: int = Field(..., ge=1, le=10000, description="طول المفتاح المطلوب")
+
+
+class DESRequest(BaseModel):
+    hex_key: str = Field(..., description="المفتاح بصيغة hexadecimal (16 حرف)")
+
+
+# ========== Streaming Helpers ==========
+
+# وصف جسم الطلب في التوثيق: نص خام بدلاً من JSON
+TEXT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"text/plain": {"schema": {"type": "string"}}}
+    }
+}
+
+
+def _drain(inbox):
+    while inbox:
+        yield inbox.popleft()
+
+
+async def _pipe(request, inbox, stream):
+    """
+    تمرير جسم الطلب قطعة قطعة عبر نسخة الـ generator من المشفر.
+    المشفر يُنتج قطعة واحدة لكل قطعة مدخلة، لذلك نضع قطعة في inbox
+    ثم نطلب الناتج المقابل لها، وبعد انتهاء الجسم نفرغ ما تبقى (مثل Playfair).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for raw in request.stream():
+        text = decoder.decode(raw)
+        if not text:
+            continue
+        inbox.append(text)
+        out = next(stream)
+        if out:
+            yield out
+
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        inbox.append(tail)
+        out = next(stream)
+        if out:
+            yield out
+
+    for out in stream:
+        if out:
+            yield out
+
+
+async def _resume(first, outputs):
+    """
+    أول قطعة ثم باقي الناتج. بعد إرسال الـ headers لا يمكن تحويل الخطأ إلى 400،
+    لذلك نسجل الخطأ ثم نعيد رفعه: الخادم يقطع الاتصال دون القطعة الأخيرة من
+    الـ chunked encoding فيرى العميل نقلاً غير مكتمل بدلاً من ناتج مبتور يبدو سليماً.
+    """
+    if first:
+        yield first
+    try:
+        async for out in outputs:
+            yield out
+    except ClientDisconnect:
+        return
+    except Exception:
+        log.warning("توقف stream بعد بدء الرد", exc_info=True)
+        raise
+
+
+class PipeResponse(StreamingResponse):
+    """
+    StreamingResponse يقرأ جسم الطلب أثناء إرسال الرد.
+    StreamingResponse العادي يستهلك receive() لمراقبة انقطاع الاتصال وهذا يتعارض
+    مع request.stream()، لذلك نترك قراءة الجسم نفسها تكتشف الانقطاع.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def stream_text(request: Request, make_stream):
+    """
+    أول قطعة من الناتج تُحسب قبل بدء الرد، فالمفتاح غير الصالح أو الخطأ في أول
+    الجسم يعطي 400 بدلاً من رد 200 مقطوع
+    """
+    inbox = deque()
+    try:
+        outputs = _pipe(request, inbox, make_stream(_drain(inbox)))
+        first = await outputs.__anext__()
+    except StopAsyncIteration:
+        first = ""
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PipeResponse(_resume(first, outputs), media_type="text/plain; charset=utf-8")
+
+
+# ========== Classical Ciphers ==========
+
+@app.post("/classical/additive/encrypt", tags=["Classical Ciphers"])
+async def encrypt_additive(request: AdditiveEncryptRequest):
+    """تشفير باستخدام Additive (Caesar) Cipher"""
+    try:
+        result = ciphers.additive_encrypt(request.plaintext, request.key)
+        return {"plaintext": request.plaintext, "key": request.key, "ciphertext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/classical/additive/decrypt", tags=["Classical Ciphers"])
+async def decrypt_additive(request: AdditiveDecryptRequest):
+    """فك التشفير باستخدام Additive (Caesar) Cipher"""
+    try:
+        result = ciphers.additive_decrypt(request.ciphertext, request.key)
+        return {"ciphertext": request.ciphertext, "key": request.key, "plaintext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/classical/additive/bruteforce", tags=["Classical Ciphers"])
+def bruteforce_additive(request: BruteforceRequest):
+    """محاولة فك التشفير باستخدام جميع المفاتيح الممكنة (0-25) مرتبة حسب نموذج اللغة"""
+    try:
+        results = ciphers.additive_bruteforce(request.ciphertext)
+        return {
+            "ciphertext": request.ciphertext,
+            "results": [{"key": k, "plaintext": pt, "score": score} for k, pt, score in results]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/classical/multiplicative/encrypt", tags=["Classical Ciphers"])
+async def encrypt_multiplicative(request: MultiplicativeEncryptRequest):
+    """تشفير باستخدام Multiplicative Cipher"""
+    try:
+        result = ciphers.multiplicative_encrypt(request.plaintext, request.key)
+        return {"plaintext": request.plaintext, "key": request.key, "ciphertext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/classical/multiplicative/decrypt", tags=["Classical Ciphers"])
+async def decrypt_multiplicative(request: MultiplicativeDecryptRequest):
+    """فك التشفير باستخدام Multiplicative Cipher"""
+    try:
+        result = ciphers.multiplicative_decrypt(request.ciphertext, request.key)
+        return {"ciphertext": request.ciphertext, "key": request.key, "plaintext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/classical/multiplicative/bruteforce", tags=["Classical Ciphers"])
+def bruteforce_multiplicative(request: BruteforceRequest):
+    """محاولة فك التشفير باستخدام جميع المفاتيح الممكنة مرتبة حسب نموذج اللغة"""
+    try:
+        results = ciphers.multiplicative_bruteforce(request.ciphertext)
+        return {
+            "ciphertext": request.ciphertext,
+            "results": [{"key": k, "plaintext": pt, "score": score} for k, pt, score in results]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== Playfair Cipher ==========
+
+@app.post("/playfair/encrypt", tags=["Playfair Cipher"])
+def encrypt_playfair(request: EncryptRequest):
+    """تشفير باستخدام Playfair Cipher"""
+    try:
+        result = ciphers.playfair_encrypt(request.plaintext, request.key)
+        return {"plaintext": request.plaintext, "key": request.key, "ciphertext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/playfair/decrypt", tags=["Playfair Cipher"])
+def decrypt_playfair(request: DecryptRequest):
+    """فك التشفير باستخدام Playfair Cipher"""
+    try:
+        result = ciphers.playfair_decrypt(request.ciphertext, request.key)
+        return {"ciphertext": request.ciphertext, "key": request.key, "plaintext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== Polyalphabetic Ciphers ==========
+
+@app.post("/polyalphabetic/vigenere/encrypt", tags=["Polyalphabetic Ciphers"])
+def encrypt_vigenere(request: EncryptRequest):
+    """تشفير باستخدام Vigenere Cipher"""
+    try:
+        result = ciphers.vigenere_encrypt(request.plaintext, request.key)
+        return {"plaintext": request.plaintext, "key": request.key, "ciphertext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/polyalphabetic/vigenere/decrypt", tags=["Polyalphabetic Ciphers"])
+def decrypt_vigenere(request: DecryptRequest):
+    """فك التشفير باستخدام Vigenere Cipher"""
+    try:
+        result = ciphers.vigenere_decrypt(request.ciphertext, request.key)
+        return {"ciphertext": request.ciphertext, "key": request.key, "plaintext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/polyalphabetic/autokey/encrypt", tags=["Polyalphabetic Ciphers"])
+def encrypt_autokey(request: EncryptRequest):
+    """تشفير باستخدام AutoKey Cipher"""
+    try:
+        result = ciphers.autokey_encrypt(request.plaintext, request.key)
+        return {"plaintext": request.plaintext, "key": request.key, "ciphertext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/polyalphabetic/autokey/decrypt", tags=["Polyalphabetic Ciphers"])
+def decrypt_autokey(request: DecryptRequest):
+    """فك التشفير باستخدام AutoKey Cipher"""
+    try:
+        result = ciphers.autokey_decrypt(request.ciphertext, request.key)
+        return {"ciphertext": request.ciphertext, "key": request.key, "plaintext": result}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== Streaming Variants ==========
+# الجسم نص خام (text/plain) والمفتاح في query string، والناتج يُرسل
+# مباشرة دون إعادة النص المدخل
+
+@app.post("/classical/additive/encrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def encrypt_additive_stream(request: Request, key: int = Query(..., ge=0, le=25)):
+    """تشفير Additive لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.additive_encrypt_stream(chunks, key))
+
+
+@app.post("/classical/additive/decrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def decrypt_additive_stream(request: Request, key: int = Query(..., ge=0, le=25)):
+    """فك تشفير Additive لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.additive_decrypt_stream(chunks, key))
+
+
+@app.post("/classical/multiplicative/encrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def encrypt_multiplicative_stream(request: Request, key: int = Query(..., ge=1, le=25)):
+    """تشفير Multiplicative لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.multiplicative_encrypt_stream(chunks, key))
+
+
+@app.post("/classical/multiplicative/decrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def decrypt_multiplicative_stream(request: Request, key: int = Query(..., ge=1, le=25)):
+    """فك تشفير Multiplicative لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.multiplicative_decrypt_stream(chunks, key))
+
+
+@app.post("/playfair/encrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def encrypt_playfair_stream(request: Request, key: str = Query(...)):
+    """تشفير Playfair لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.playfair_encrypt_stream(chunks, key))
+
+
+@app.post("/playfair/decrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def decrypt_playfair_stream(request: Request, key: str = Query(...)):
+    """فك تشفير Playfair لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.playfair_decrypt_stream(chunks, key))
+
+
+@app.post("/polyalphabetic/vigenere/encrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def encrypt_vigenere_stream(request: Request, key: str = Query(...)):
+    """تشفير Vigenere لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.vigenere_encrypt_stream(chunks, key))
+
+
+@app.post("/polyalphabetic/vigenere/decrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def decrypt_vigenere_stream(request: Request, key: str = Query(...)):
+    """فك تشفير Vigenere لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.vigenere_decrypt_stream(chunks, key))
+
+
+@app.post("/polyalphabetic/autokey/encrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def encrypt_autokey_stream(request: Request, key: str = Query(...)):
+    """تشفير AutoKey لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.autokey_encrypt_stream(chunks, key))
+
+
+@app.post("/polyalphabetic/autokey/decrypt/stream", tags=["Streaming"], openapi_extra=TEXT_BODY)
+async def decrypt_autokey_stream(request: Request, key: str = Query(...)):
+    """فك تشفير AutoKey لنص كبير على شكل stream"""
+    return await stream_text(request, lambda chunks: ciphers.autokey_decrypt_stream(chunks, key))
+
+
+# ========== ADFGVX Cipher ==========
+
+@app.post("/adfgvx/encrypt", tags=["ADFGVX Cipher"])
+def encrypt_adfgvx(request: EncryptRequest):
+    """تشفير باستخدام ADFGVX Cipher"""
+    try:
+        result = ciphers.adfgvx_encrypt(request.plaintext, request.key)
+        matrix = ciphers.adfgvx_key_matrix(request.key)
+        return {
+            "plaintext": request.plaintext,
+            "key": request.key,
+            "ciphertext": result,
+            "key_matrix": matrix
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== RC4 Cipher ==========
+
+@app.post("/rc4/keystream", tags=["RC4 Cipher"])
+def generate_rc4_keystream(request: RC4Request):
+    """إنشاء RC4 keystream"""
+    try:
+        keystream = ciphers.rc4_keystream(request.key, request.length)
+        bits = ciphers.keystream_to_bits(keystream)
+        derivative = ciphers.binary_derivative_test(bits)
+        changes = ciphers.change_point_test(bits)
+        
+        return {
+            "key": request.key,
+            "length": request.length,
+            "keystream_bytes": keystream,
+            "keystream_binary": bits,
+            "binary_derivative": derivative,
+            "change_point_count": changes
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== DES Key Schedule ==========
+
+@app.post("/des/subkeys", tags=["DES"])
+async def generate_des_subkeys(request: DESRequest):
+    """إنشاء DES subkeys من المفتاح"""
+    try:
+        if len(request.hex_key) != 16:
+            raise ValueError("المفتاح يجب أن يكون 16 حرف hexadecimal")
+        
+        subkeys = ciphers.des_generate_subkeys(request.hex_key)
+        return {
+            "hex_key": request.hex_key,
+            "subkeys": [
+                {"round": i + 1, "subkey": subkey}
+                for i, subkey in enumerate(subkeys)
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ========== Response Cache ==========
+# CIPHER_API_CACHE=1 يفعّل تخزين نتائج المسارات الحتمية (انظر api/response_cache.py)
+# الحجم بـ CIPHER_API_CACHE_BYTES، العمر بـ CIPHER_API_CACHE_TTL (ثانية)،
+# وCIPHER_API_CACHE_DIR يضيف تخزيناً على القرص مشتركاً بين العمال، حجمه
+# بـ CIPHER_API_CACHE_DISK_BYTES.
+# المسار الجديد لا يُضاف هنا إلا إذا كانت نتيجته دالة في المدخلات فقط.
+CACHEABLE_ROUTES = (
+    "/classical/additive/encrypt", "/classical/additive/decrypt", "/classical/additive/bruteforce",
+    "/classical/multiplicative/encrypt", "/classical/multiplicative/decrypt",
+    "/classical/multiplicative/bruteforce",
+    "/playfair/encrypt", "/playfair/decrypt",
+    "/polyalphabetic/vigenere/encrypt", "/polyalphabetic/vigenere/decrypt",
+    "/polyalphabetic/autokey/encrypt", "/polyalphabetic/autokey/decrypt",
+    "/adfgvx/encrypt",
+    "/rc4/keystream",
+    "/des/subkeys",
+)
+
+response_cache = None
+if os.environ.get("CIPHER_API_CACHE") == "1":
+    response_cache = ResponseCache(
+        max_bytes=int(os.environ.get("CIPHER_API_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+        ttl=float(os.environ.get("CIPHER_API_CACHE_TTL", DEFAULT_TTL)),
+        directory=os.environ.get("CIPHER_API_CACHE_DIR") or None,
+        disk_bytes=int(os.environ.get("CIPHER_API_CACHE_DISK_BYTES", DEFAULT_DISK_BYTES)),
+    )
+    app.add_middleware(CacheMiddleware, cache=response_cache, paths=CACHEABLE_ROUTES)
+
+
+# ========== Admission Control ==========
+# تكلفة كل مسار بوحدة تقارب ميلي ثانية: base + per_kb لكل كيلوبايت من الجسم
+# (انظر api/admission.py). الحدود من CIPHER_API_MAX_BYTES (حجم الجسم)،
+# CIPHER_API_RATE وCIPHER_API_BURST (رصيد كل عميل، 0 يلغي حد المعدل)،
+# وCIPHER_API_HEAVY_COST وCIPHER_API_HEAVY_SLOTS (الطلبات الغالية المتزامنة).
+# المسارات التي قد تتجاوز HEAVY_COST معرّفة بـ def وليس async def، فيشغلها
+# FastAPI في threadpool ولا يتوقف event loop عن خدمة الطلبات الرخيصة، أو
+# ترسل عملها إلى عمليات منفصلة (الإخلاء والمهام).
+# حد /evacuation/grids أكبر من الحد العام لأن الخريطة نفسها في الجسم، وتكلفته
+# ثابتة لأن الخريطة المضغوطة لا يعكس حجمها عدد الخلايا.
+ROUTE_COSTS = {
+    "/classical/additive/encrypt": admission.RouteCost(per_kb=0.05),
+    "/classical/additive/decrypt": admission.RouteCost(per_kb=0.05),
+    "/classical/additive/bruteforce": admission.RouteCost(per_kb=0.5),
+    "/classical/multiplicative/encrypt": admission.RouteCost(per_kb=0.05),
+    "/classical/multiplicative/decrypt": admission.RouteCost(per_kb=0.05),
+    "/classical/multiplicative/bruteforce": admission.RouteCost(per_kb=0.3),
+    "/playfair/encrypt": admission.RouteCost(per_kb=1.0),
+    "/playfair/decrypt": admission.RouteCost(per_kb=1.0),
+    "/polyalphabetic/vigenere/encrypt": admission.RouteCost(per_kb=0.5),
+    "/polyalphabetic/vigenere/decrypt": admission.RouteCost(per_kb=0.5),
+    "/polyalphabetic/autokey/encrypt": admission.RouteCost(per_kb=0.6),
+    "/polyalphabetic/autokey/decrypt": admission.RouteCost(per_kb=0.6),
+    "/adfgvx/encrypt": admission.RouteCost(per_kb=1.0),
+    # العمل يعتمد على length (حتى 10000) وليس على حجم الجسم
+    "/rc4/keystream": admission.RouteCost(base=15.0),
+    "/des/subkeys": admission.RouteCost(),
+    "/classical/additive/encrypt/stream": admission.RouteCost(per_kb=0.05, stream=True),
+    "/classical/additive/decrypt/stream": admission.RouteCost(per_kb=0.05, stream=True),
+    "/classical/multiplicative/encrypt/stream": admission.RouteCost(per_kb=0.05, stream=True),
+    "/classical/multiplicative/decrypt/stream": admission.RouteCost(per_kb=0.05, stream=True),
+    "/playfair/encrypt/stream": admission.RouteCost(per_kb=1.0, stream=True),
+    "/playfair/decrypt/stream": admission.RouteCost(per_kb=1.0, stream=True),
+    "/polyalphabetic/vigenere/encrypt/stream": admission.RouteCost(per_kb=0.5, stream=True),
+    "/polyalphabetic/vigenere/decrypt/stream": admission.RouteCost(per_kb=0.5, stream=True),
+    "/polyalphabetic/autokey/encrypt/stream": admission.RouteCost(per_kb=0.6, stream=True),
+    "/polyalphabetic/autokey/decrypt/stream": admission.RouteCost(per_kb=0.6, stream=True),
+    # المهمة تُحفظ وتعمل لاحقاً في عامل، فالتكلفة هنا هي إضافتها للقائمة فقط
+    "/jobs": admission.RouteCost(max_bytes=1 << 20),
+    "/evacuation/grids": admission.RouteCost(base=50.0, max_bytes=32 << 20),
+    "/evacuation/grids/{grid_id}/distances": admission.RouteCost(base=5.0, per_kb=0.5, max_bytes=1 << 20),
+    "/evacuation/grids/{grid_id}/routes": admission.RouteCost(base=50.0, per_kb=0.5, max_bytes=1 << 20),
+}
+
+# تُضاف بعد CacheMiddleware فتعمل قبله، ولا يُقرأ جسم كبير حتى للتخزين المؤقت
+app.add_middleware(
+    admission.AdmissionControl,
+    routes=ROUTE_COSTS,
+    max_bytes=int(os.environ.get("CIPHER_API_MAX_BYTES", admission.DEFAULT_MAX_BYTES)),
+    rate=float(os.environ.get("CIPHER_API_RATE", admission.DEFAULT_RATE)),
+    burst=float(os.environ.get("CIPHER_API_BURST", admission.DEFAULT_BURST)),
+    heavy_cost=float(os.environ.get("CIPHER_API_HEAVY_COST", admission.DEFAULT_HEAVY_COST)),
+    heavy_slots=int(os.environ.get("CIPHER_API_HEAVY_SLOTS", admission.DEFAULT_HEAVY_SLOTS)),
+)
+
+
+@app.get("/cache/stats", tags=["General"])
+async def cache_stats():
+    """إحصائيات التخزين المؤقت للنتائج"""
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+
+# ========== Root Endpoint ==========
+
+@app.get("/", tags=["General"])
+async def root():
+    """الصفحة الرئيسية - قائمة بجميع المشفرات المتاحة"""
+    return {
+        "message": "مرحباً بك في Cipher API",
+        "available_ciphers": {
+            "classical": {
+                "additive": ["encrypt", "decrypt", "bruteforce", "encrypt/stream", "decrypt/stream"],
+                "multiplicative": ["encrypt", "decrypt", "bruteforce", "encrypt/stream", "decrypt/stream"]
+            },
+            "playfair": ["encrypt", "decrypt", "encrypt/stream", "decrypt/stream"],
+            "polyalphabetic": {
+                "vigenere": ["encrypt", "decrypt", "encrypt/stream", "decrypt/stream"],
+                "autokey": ["encrypt", "decrypt", "encrypt/stream", "decrypt/stream"]
+            },
+            "adfgvx": ["encrypt"],
+            "rc4": ["keystream"],
+            "des": ["subkeys"]
+        },
+        "sessions": ["/ws/session?cipher=...&key=...&mode=encrypt|decrypt"],
+        "jobs": ["POST /jobs", "/jobs/{job_id}", "/jobs/{job_id}/events", "/jobs/{job_id}/cancel"],
+        "evacuation": ["grids", "grids/{grid_id}", "grids/{grid_id}/routes", "grids/{grid_id}/distances"],
+        "documentation": "/docs",
+        "alternative_docs": "/redoc"
+    }
+
+
+if __name__ == "__main__":
+    # التشغيل من جذر المستودع: python -m api.cipher_api
+    # أو مع عدة عمال: uvicorn api.cipher_api:app --workers 4
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+
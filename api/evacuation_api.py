@@ -0,0 +1,386 @@
+"""
+API لحساب مسارات الإخلاء، يعمل بجانب Cipher API
+
+تُرفع الخريطة مرة واحدة (run-length أو binary) وتحصل على grid_id هو hash
+لمحتواها، ثم تُرسل الاستعلامات عن المسارات والمسافات بهذا المعرّف.
+كل عملية ثقيلة (فك ترميز الخريطة، حقل المسافات، البحث) تعمل في
+ProcessPoolExecutor حتى لا يتوقف event loop. كل عامل يحتفظ بالخريطة
+المبنية وحقل المسافات الخاص بها حسب grid_id، لذلك الاستعلامات المتكررة
+على نفس المبنى لا تعيد المعالجة، والخلايا نفسها لا تُرسل للعامل إلا عند
+أول استعلام يصله عن هذه الخريطة.
+
+الخرائط المرفوعة تُحفظ أيضاً في قاعدة SQLite (EVACUATION_GRIDS_DB)، فمع
+uvicorn --workers N يجد أي عامل الخريطة التي رفعها عامل آخر.
+"""
+
+import asyncio
+import base64
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from algo.distance_field import UNREACHABLE, compute_distance_field
+from algo.engine import METHODS, evacuate, find_cells
+from algo.grid_core import GridCore
+from algo.grid_files import COMPRESSED_MAGIC, MAGIC, parse_binary, parse_rle
+from algo.pathfinding import EXIT, PERSON, PATH
+
+# أكبر خريطة مقبولة (عدد الخلايا)
+MAX_CELLS = int(os.environ.get("EVACUATION_MAX_CELLS", 16_000_000))
+# عدد الخرائط المحفوظة في الخادم وفي كل عامل، ويُحذف الأقدم استخداماً أولاً
+CACHED_GRIDS = int(os.environ.get("EVACUATION_CACHED_GRIDS", 32))
+# الخرائط المرفوعة تُحفظ في SQLite مشتركة بين عمال الخادم (uvicorn --workers)،
+# وأقصى عدد يبقى فيها قبل حذف الأقدم استخداماً
+GRIDS_DB = os.path.abspath(os.environ.get("EVACUATION_GRIDS_DB", "evacuation_grids.sqlite3"))
+STORED_GRIDS = int(os.environ.get("EVACUATION_STORED_GRIDS", 1000))
+# عدد العمليات في pool الحساب
+WORKERS = int(os.environ.get("EVACUATION_WORKERS", os.cpu_count() or 1))
+
+# العمال تبدأ بـ spawn: fork من خادم فيه threads قد يورث locks مقفلة (مثل قفل الاستيراد)
+SPAWN = multiprocessing.get_context("spawn")
+
+# field: المسارات من حقل المسافات المحفوظ، والباقي من algo.engine
+ROUTE_METHODS = ("field",) + tuple(m for m in METHODS if m != "field")
+
+
+# ========== نماذج البيانات ==========
+
+class GridUpload(BaseModel):
+    encoding: str = Field("rle", description="rle (نص .rle) أو binary (ملف .evg أو .evz بصيغة base64)")
+    data: str = Field(..., description="الخريطة بالترميز المحدد")
+    people: List[Tuple[int, int]] = Field([], description="خلايا (row, col) يوضع فيها أشخاص")
+    exits: List[Tuple[int, int]] = Field([], description="خلايا (row, col) تصبح مخارج")
+
+
+class RouteRequest(BaseModel):
+    people: Optional[List[Tuple[int, int]]] = Field(None, description="نقاط البداية، افتراضياً كل الأشخاص في الخريطة")
+    method: str = Field("field", description="طريقة الحساب: " + ", ".join(ROUTE_METHODS))
+    diagonal: bool = Field(False, description="السماح بالحركة القطرية (لطرق البحث فقط)")
+    include_paths: bool = Field(True, description="إرجاع المسارات وليس المسافات فقط")
+
+
+class DistanceRequest(BaseModel):
+    cells: List[Tuple[int, int]] = Field(..., description="الخلايا المطلوب معرفة بعدها عن أقرب مخرج")
+
+
+# ========== داخل العمال ==========
+
+# grid_id -> (GridCore, DistanceField) في كل عامل
+_compiled = OrderedDict()
+
+
+def _decode(encoding, data, people, exits):
+    """فك ترميز الخريطة ووضع الأشخاص والمخارج، ثم حساب grid_id من المحتوى"""
+    if encoding == "rle":
+        grid = parse_rle(data, MAX_CELLS)
+    elif encoding == "binary":
+        raw = base64.b64decode(data, validate=True)
+        magic = raw[:len(COMPRESSED_MAGIC)]
+        grid = parse_binary(raw, COMPRESSED_MAGIC if magic == COMPRESSED_MAGIC else MAGIC, MAX_CELLS)
+    else:
+        raise ValueError("الترميز يجب أن يكون rle أو binary")
+
+    cells = np.array(grid, dtype=np.uint8)
+    if cells.max(initial=0) > PATH:
+        raise ValueError("grid contains an unknown cell code")
+    for code, placed in ((EXIT, exits), (PERSON, people)):
+        for r, c in placed:
+            if not (0 <= r < cells.shape[0] and 0 <= c < cells.shape[1]):
+                raise ValueError(f"الخلية {(r, c)} خارج الخريطة")
+            cells[r, c] = code
+
+    digest = hashlib.sha256(f"{cells.shape[0]}x{cells.shape[1]}:".encode())
+    digest.update(cells.tobytes())
+    return digest.hexdigest()[:16], cells
+
+
+def _compiled_grid(grid_id, cells):
+    entry = _compiled.get(grid_id)
+    if entry is not None:
+        _compiled.move_to_end(grid_id)
+        return entry
+    if cells is None:
+        return None
+    entry = (GridCore.from_array(cells), compute_distance_field(cells))
+    _compiled[grid_id] = entry
+    while len(_compiled) > CACHED_GRIDS:
+        _compiled.popitem(last=False)
+    return entry
+
+
+def _compile(grid_id, cells):
+    """بناء الخريطة وحقل المسافات مسبقاً؛ يرجع عدد الخلايا التي تصل لمخرج"""
+    entry = _compiled_grid(grid_id, cells)
+    if entry is None:
+        return None
+    return int(np.count_nonzero(entry[1].dist != UNREACHABLE))
+
+
+def _distances(grid_id, cells, starts):
+    entry = _compiled_grid(grid_id, cells)
+    if entry is None:
+        return None
+    return [entry[1].distance(start) for start in starts]
+
+
+def _route(grid_id, cells, starts, method, diagonal, include_paths):
+    entry = _compiled_grid(grid_id, cells)
+    if entry is None:
+        return None
+    core, field = entry
+    started = time.perf_counter()
+    if method == "field":
+        paths = field.paths(starts)
+        distances = [None if path is None else len(path) for path in paths]
+        expanded = 0
+    else:
+        result = evacuate(core, method, diagonal, starts)
+        paths, expanded = result.paths, result.expanded
+        distances = [None if path is None else len(path) for path in paths]
+    elapsed = time.perf_counter() - started
+    return distances, paths if include_paths else None, expanded, elapsed
+
+
+# ========== في الخادم ==========
+
+class StoredGrid:
+    def __init__(self, grid_id, cells, reachable):
+        self.grid_id = grid_id
+        self.cells = cells
+        self.reachable = reachable
+        self.people = find_cells(cells, PERSON)
+        self.exits = len(find_cells(cells, EXIT))
+
+    def info(self, cached=False):
+        rows, cols = self.cells.shape
+        return {
+            "grid_id": self.grid_id,
+            "rows": rows,
+            "cols": cols,
+            "persons": len(self.people),
+            "exits": self.exits,
+            "reachable_cells": self.reachable,
+            "cached": cached,
+        }
+
+
+# ========== المخزن المشترك ==========
+# grid_id هو hash المحتوى، فكل عامل يرفع نفس الخريطة يحصل على نفس الصف.
+# الذاكرة (_grids) نسخة محلية؛ المخزن هو المرجع، فالخريطة المحذوفة من عامل
+# لا تبقى متاحة في عامل آخر.
+
+GRIDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS grids (
+    id TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    cells BLOB NOT NULL,
+    reachable INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS grids_used ON grids (used);
+"""
+
+_schema_ready = False
+
+
+def _connect():
+    global _schema_ready
+    db = sqlite3.connect(GRIDS_DB, timeout=30)
+    if not _schema_ready:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(GRIDS_SCHEMA)
+        _schema_ready = True
+    return db
+
+
+def _save_grid(grid):
+    rows, cols = grid.cells.shape
+    with _connect() as db:
+        db.execute("INSERT OR REPLACE INTO grids (id, rows, cols, cells, reachable, used) VALUES (?, ?, ?, ?, ?, ?)",
+                   (grid.grid_id, rows, cols, zlib.compress(grid.cells.tobytes(), 1), grid.reachable, time.time()))
+        db.execute("DELETE FROM grids WHERE id NOT IN (SELECT id FROM grids ORDER BY used DESC LIMIT ?)",
+                   (STORED_GRIDS,))
+
+
+def _grid_exists(grid_id):
+    with _connect() as db:
+        return db.execute("SELECT 1 FROM grids WHERE id = ?", (grid_id,)).fetchone() is not None
+
+
+def _load_grid(grid_id):
+    with _connect() as db:
+        row = db.execute("SELECT rows, cols, cells, reachable FROM grids WHERE id = ?", (grid_id,)).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE grids SET used = ? WHERE id = ?", (time.time(), grid_id))
+    rows, cols, data, reachable = row
+    cells = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(rows, cols).copy()
+    return StoredGrid(grid_id, cells, reachable)
+
+
+def _delete_grid(grid_id):
+    with _connect() as db:
+        return db.execute("DELETE FROM grids WHERE id = ?", (grid_id,)).rowcount > 0
+
+
+def _remember(grid):
+    _grids[grid.grid_id] = grid
+    _grids.move_to_end(grid.grid_id)
+    while len(_grids) > CACHED_GRIDS:
+        _grids.popitem(last=False)
+
+
+_grids = OrderedDict()
+_pool = None
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=SPAWN)
+    return _pool
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+router = APIRouter(prefix="/evacuation", tags=["Evacuation"], on_shutdown=[shutdown])
+
+
+async def _in_pool(fn, *args):
+    pool = _executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # مات أحد العمال: pool جديد للطلبات التالية، وهذا الطلب لا يُعاد حتى
+        # لا يسقط الـ pool الجديد إذا كان هو سبب المشكلة
+        global _pool
+        if _pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        raise HTTPException(status_code=503, detail="توقف عامل الحساب، أعد المحاولة")
+
+
+async def _on_grid(grid, fn, *args):
+    """تشغيل fn في عامل؛ الخلايا لا تُرسل إلا إذا لم تكن الخريطة محفوظة عنده"""
+    result = await _in_pool(fn, grid.grid_id, None, *args)
+    if result is None:
+        result = await _in_pool(fn, grid.grid_id, grid.cells, *args)
+    return result
+
+
+async def _stored(grid_id):
+    """الخريطة من الذاكرة إن وُجدت في المخزن، وإلا تُحمّل منه (رفعها عامل آخر)"""
+    grid = _grids.get(grid_id)
+    if grid is not None and await asyncio.to_thread(_grid_exists, grid_id):
+        _grids.move_to_end(grid_id)
+        return grid
+    _grids.pop(grid_id, None)
+    grid = await asyncio.to_thread(_load_grid, grid_id)
+    if grid is None:
+        raise HTTPException(status_code=404, detail=f"الخريطة {grid_id} غير موجودة، ارفعها من جديد")
+    _remember(grid)
+    return grid
+
+
+def _check_cells(grid, cells):
+    rows, cols = grid.cells.shape
+    for r, c in cells:
+        if not (0 <= r < rows and 0 <= c < cols):
+            raise HTTPException(status_code=400, detail=f"الخلية {(r, c)} خارج الخريطة")
+
+
+# ========== Endpoints ==========
+
+@router.post("/grids")
+async def upload_grid(request: GridUpload):
+    """رفع خريطة مبنى وتجهيز حقل المسافات الخاص بها"""
+    try:
+        grid_id, cells = await _in_pool(_decode, request.encoding, request.data,
+                                        request.people, request.exits)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if await asyncio.to_thread(_grid_exists, grid_id):
+        return (await _stored(grid_id)).info(cached=True)
+    grid = StoredGrid(grid_id, cells, None)
+    grid.reachable = await _in_pool(_compile, grid_id, cells)
+    await asyncio.to_thread(_save_grid, grid)
+    _remember(grid)
+    return grid.info()
+
+
+@router.get("/grids/{grid_id}")
+async def grid_info(grid_id: str):
+    """معلومات خريطة محفوظة"""
+    return (await _stored(grid_id)).info(cached=True)
+
+
+@router.delete("/grids/{grid_id}")
+async def delete_grid(grid_id: str):
+    """حذف خريطة من الخادم"""
+    _grids.pop(grid_id, None)
+    if not await asyncio.to_thread(_delete_grid, grid_id):
+        raise HTTPException(status_code=404, detail=f"الخريطة {grid_id} غير موجودة، ارفعها من جديد")
+    return {"grid_id": grid_id, "deleted": True}
+
+
+@router.post("/grids/{grid_id}/distances")
+async def grid_distances(grid_id: str, request: DistanceRequest):
+    """بعد كل خلية عن أقرب مخرج بالخطوات (null إذا لا يوجد طريق)"""
+    grid = await _stored(grid_id)
+    _check_cells(grid, request.cells)
+    distances = await _on_grid(grid, _distances, request.cells)
+    return {
+        "grid_id": grid_id,
+        "distances": [{"cell": cell, "distance": d} for cell, d in zip(request.cells, distances)],
+    }
+
+
+@router.post("/grids/{grid_id}/routes")
+async def grid_routes(grid_id: str, request: RouteRequest):
+    """مسار كل شخص إلى مخرج وطوله"""
+    if request.method not in ROUTE_METHODS:
+        raise HTTPException(status_code=400,
+                            detail=f"طريقة غير معروفة {request.method!r}، اختر من: {', '.join(ROUTE_METHODS)}")
+    grid = await _stored(grid_id)
+    starts = grid.people if request.people is None else [tuple(cell) for cell in request.people]
+    _check_cells(grid, starts)
+    try:
+        distances, paths, expanded, elapsed = await _on_grid(
+            grid, _route, starts, request.method, request.diagonal, request.include_paths
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    routes = []
+    for i, (start, distance) in enumerate(zip(starts, distances)):
+        route = {"start": start, "distance": distance}
+        if paths is not None:
+            route["path"] = paths[i]
+        routes.append(route)
+    return {
+        "grid_id": grid_id,
+        "method": request.method,
+        "routes": routes,
+        "routed": sum(d is not None for d in distances),
+        "stranded": sum(d is None for d in distances),
+        "expanded": expanded,
+        "solve_seconds": round(elapsed, 6),
+    }
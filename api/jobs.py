@@ -0,0 +1,551 @@
+"""
+مهام طويلة (كسر الشيفرات، إحصائيات keystream، مسح مفاتيح DES) تعمل في الخلفية
+
+الطلب يعيد job_id فوراً، والمهمة تُحفظ في قاعدة SQLite وتعمل في
+ProcessPoolExecutor محلي. العامل يكتب التقدم والنتائج الجزئية في نفس
+القاعدة ويقرأ منها طلب الإلغاء، لذلك يمكن متابعة المهمة بالاستعلام
+(GET /jobs/{id}) أو بـ server-sent events (GET /jobs/{id}/events).
+
+القائمة تبقى بعد إعادة التشغيل: المهام المنتظرة تُستأنف، والمهام التي
+كانت تعمل في عملية لم تعد موجودة تعود للانتظار وتبدأ من جديد.
+الإلغاء يأخذ مفعوله عند التقرير التالي للمهمة عن تقدمها.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+import information_security as ciphers
+
+DB_PATH = os.environ.get("CIPHER_API_JOBS_DB", "cipher_jobs.sqlite3")
+WORKERS = int(os.environ.get("CIPHER_API_JOB_WORKERS", os.cpu_count() or 1))
+# أقل فترة بين كتابتين للتقدم في القاعدة (ثانية)
+REPORT_INTERVAL = 0.25
+# فترة متابعة القاعدة في الـ dispatcher والـ events (ثانية)
+POLL_INTERVAL = 0.5
+
+# العمال تبدأ بـ spawn: fork من خادم فيه threads قد يورث locks مقفلة (مثل قفل الاستيراد)
+SPAWN = multiprocessing.get_context("spawn")
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    cancel INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ========== قاعدة البيانات ==========
+
+def connect(path=None):
+    db = sqlite3.connect(path or DB_PATH, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    return db
+
+
+def init_db(path=None):
+    with connect(path) as db:
+        db.executescript(SCHEMA)
+
+
+def _row(row):
+    if row is None:
+        return None
+    job = dict(row)
+    for name in ("params", "partial", "result"):
+        job[name] = json.loads(job[name]) if job[name] is not None else None
+    del job["cancel"], job["pid"]
+    return job
+
+
+def get_job(job_id, path=None):
+    with connect(path) as db:
+        return _row(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+
+def submit_job(kind, params, path=None):
+    job_id = uuid.uuid4().hex
+    with connect(path) as db:
+        db.execute("INSERT INTO jobs (id, kind, params, status, created) VALUES (?, ?, ?, ?, ?)",
+                   (job_id, kind, json.dumps(params), QUEUED, time.time()))
+    return job_id
+
+
+def list_jobs(status=None, limit=100, path=None):
+    with connect(path) as db:
+        if status:
+            rows = db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created DESC LIMIT ?", (status, limit))
+        else:
+            rows = db.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        return [_row(row) for row in rows]
+
+
+def cancel_job(job_id, path=None):
+    """المهمة المنتظرة تُلغى فوراً، والتي تعمل يُطلب منها التوقف"""
+    with connect(path) as db:
+        db.execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status = ?",
+                   (CANCELLED, time.time(), job_id, QUEUED))
+        db.execute("UPDATE jobs SET cancel = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+    return get_job(job_id, path)
+
+
+def delete_job(job_id, path=None):
+    with connect(path) as db:
+        return db.execute("DELETE FROM jobs WHERE id = ? AND status IN (?, ?, ?)",
+                          (job_id, *FINISHED)).rowcount > 0
+
+
+def recover_jobs(path=None):
+    """إعادة المهام التي كانت تعمل في عمليات انتهت إلى قائمة الانتظار"""
+    with connect(path) as db:
+        rows = db.execute("SELECT id, pid FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+        for row in rows:
+            if not _alive(row["pid"]):
+                db.execute("UPDATE jobs SET status = ?, progress = 0, partial = NULL, pid = NULL "
+                           "WHERE id = ? AND status = ?", (QUEUED, row["id"], RUNNING))
+
+
+def requeue_job(job_id, path=None):
+    """إعادة مهمة أخذها الخادم ولم يستطع إرسالها لعامل"""
+    with connect(path) as db:
+        db.execute("UPDATE jobs SET status = ?, started = NULL, pid = NULL WHERE id = ? AND status = ?",
+                   (QUEUED, job_id, RUNNING))
+
+
+def fail_job(job_id, error, path=None):
+    """إنهاء مهمة لم يكتب عاملها نتيجتها (مات العامل أو فشلت الكتابة)"""
+    with connect(path) as db:
+        db.execute("UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ? AND status = ?",
+                   (FAILED, error, time.time(), job_id, RUNNING))
+
+
+def _alive(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def claim_job(path=None):
+    """
+    أخذ أقدم مهمة منتظرة (عملية واحدة فقط تحصل على كل مهمة)؛ pid هو الخادم
+    حتى يستبدله العامل بـ pid الخاص به
+    """
+    with connect(path) as db:
+        row = db.execute(
+            "UPDATE jobs SET status = ?, started = ?, pid = ? WHERE id = "
+            "(SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1) AND status = ? RETURNING id",
+            (RUNNING, time.time(), os.getpid(), QUEUED, QUEUED),
+        ).fetchone()
+    return row["id"] if row else None
+
+
+# ========== داخل العمال ==========
+
+class Progress:
+    """يُمرر لكل مهمة: يكتب التقدم في القاعدة ويوقف المهمة عند طلب الإلغاء"""
+
+    def __init__(self, db, job_id):
+        self.db = db
+        self.job_id = job_id
+        self.last = 0.0
+
+    def __call__(self, done, total, partial=None, force=False):
+        now = time.monotonic()
+        if not force and now - self.last < REPORT_INTERVAL:
+            return
+        self.last = now
+        with self.db:
+            self.db.execute("UPDATE jobs SET progress = ?, partial = ? WHERE id = ?",
+                            (done / total if total else 1.0,
+                             None if partial is None else json.dumps(partial), self.job_id))
+        if self.db.execute("SELECT cancel FROM jobs WHERE id = ?", (self.job_id,)).fetchone()["cancel"]:
+            raise JobCancelled()
+
+
+def run_job(job_id, path=None):
+    """تنفيذ مهمة واحدة في العامل وحفظ نتيجتها أو خطئها"""
+    db = connect(path)
+    try:
+        row = db.execute("SELECT kind, params FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        with db:
+            db.execute("UPDATE jobs SET pid = ? WHERE id = ?", (os.getpid(), job_id))
+        report = Progress(db, job_id)
+        try:
+            result = JOB_KINDS[row["kind"]](report, **json.loads(row["params"]))
+            status, result, error = DONE, json.dumps(result), None
+        except JobCancelled:
+            status, result, error = CANCELLED, None, None
+        except Exception as e:
+            status, result, error = FAILED, None, str(e) or type(e).__name__
+        with db:
+            db.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, "
+                       "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+                       (status, result, error, time.time(), status, job_id))
+    finally:
+        db.close()
+
+
+# ========== أنواع المهام ==========
+# كل مهمة تأخذ report ثم معاملاتها، وتعيد نتيجة قابلة للتحويل لـ JSON.
+# report(done, total, partial) يحفظ التقدم والنتيجة الجزئية.
+
+PREVIEW = 200
+
+
+def _bruteforce(report, ciphertext, decrypt, keys):
+    from information_security.language_model import default_model
+    model = default_model()
+    results = []
+    for i, key in enumerate(keys):
+        plaintext = decrypt(ciphertext, key)
+        results.append({"key": key, "score": float(model.score(plaintext)), "preview": plaintext[:PREVIEW]})
+        results.sort(key=lambda r: r["score"], reverse=True)
+        report(i + 1, len(keys), {"best": results[:5]})
+    best = results[0]["key"] if results else None
+    return {"results": results, "best_key": best,
+            "plaintext": decrypt(ciphertext, best) if best is not None else ""}
+
+
+def additive_bruteforce_job(report, ciphertext: str):
+    """كل المفاتيح الـ 26 لـ Additive مرتبة حسب نموذج اللغة"""
+    return _bruteforce(report, ciphertext, ciphers.additive_decrypt, list(range(26)))
+
+
+def multiplicative_bruteforce_job(report, ciphertext: str):
+    """كل المفاتيح القابلة للعكس لـ Multiplicative مرتبة حسب نموذج اللغة"""
+    from information_security.classical_ciphers import modinv
+    keys = [a for a in range(26) if modinv(a, 26) is not None]
+    return _bruteforce(report, ciphertext, ciphers.multiplicative_decrypt, keys)
+
+
+def _crack(report, steps, decrypt, ciphertext, max_key_length):
+    """طول مفتاح واحد في كل خطوة، وأفضل مفتاح حتى الآن هو النتيجة الجزئية"""
+    report(0, 1, force=True)
+    for done, total, key, score in steps(ciphertext, max_key_length):
+        report(done, total, {"key": key, "score": float(score)})
+    return {"key": key, "plaintext": decrypt(ciphertext, key), "score": float(score)}
+
+
+def vigenere_crack_job(report, ciphertext: str, max_key_length: int = 20):
+    return _crack(report, ciphers.vigenere_crack_steps, ciphers.vigenere_decrypt,
+                  ciphertext, max_key_length)
+
+
+def autokey_crack_job(report, ciphertext: str, max_key_length: int = 12):
+    return _crack(report, ciphers.autokey_crack_steps, ciphers.autokey_decrypt,
+                  ciphertext, max_key_length)
+
+
+def playfair_crack_job(report, ciphertext: str, iterations: int = 30000, restarts: int = 8,
+                       seed: Optional[int] = None):
+    """
+    إعادة واحدة في كل خطوة، وأفضل مفتاح حتى الآن هو النتيجة الجزئية.
+    يتوقف عند أول مفتاح يعطي نصاً إنجليزياً كما في playfair_crack.
+    """
+    best = None
+    for i in range(restarts):
+        key, plaintext, score = ciphers.playfair_crack(
+            ciphertext, iterations, restarts=1, seed=None if seed is None else seed + i)
+        if best is None or score > best["score"]:
+            best = {"key": key, "plaintext": plaintext, "score": float(score)}
+        report(i + 1, restarts, best)
+        if ciphers.playfair_plausible(best["plaintext"]):
+            break
+    return best
+
+
+def rc4_statistics_job(report, key: str, length: int, chunk: int = 1 << 20):
+    """
+    إحصائيات keystream طويل على دفعات: عدد الآحاد، عدد نقاط التغير
+    (مجموع binary derivative) وتوزيع البايتات مع اختبار chi-square
+    """
+    import numpy as np
+    if not key:
+        raise ValueError("المفتاح لا يمكن أن يكون فارغاً")
+    if length < 1:
+        raise ValueError("الطول يجب أن يكون 1 على الأقل")
+    # chunk يأتي من المستخدم: 0 أو قيمة سالبة لا تتقدم، والكبيرة جداً تحجز ذاكرة بلا فائدة
+    chunk = max(1, min(chunk, 1 << 22))
+
+    zeros = bytes(chunk)
+    # XOR مع أصفار يعطي الـ keystream نفسه، والحالة تبقى بين الدفعات
+    stream = ciphers.rc4_crypt_stream((zeros[:min(chunk, length - done)]
+                                       for done in range(0, length, chunk)), key)
+    counts = np.zeros(256, dtype=np.int64)
+    ones = changes = 0
+    last_bit = None
+    done = 0
+    for block in stream:
+        bits = np.unpackbits(np.frombuffer(block, dtype=np.uint8))
+        counts += np.bincount(np.frombuffer(block, dtype=np.uint8), minlength=256)
+        ones += int(bits.sum())
+        changes += int(np.count_nonzero(bits[1:] != bits[:-1]))
+        if last_bit is not None:
+            changes += int(bits[0] != last_bit)
+        last_bit = bits[-1]
+        done += len(block)
+        report(done, length, {"bytes": done, "ones": ones, "change_points": changes})
+
+    expected = length / 256
+    return {
+        "key": key,
+        "length": length,
+        "bits": 8 * length,
+        "ones": ones,
+        "ones_fraction": ones / (8 * length),
+        "change_point_count": changes,
+        "byte_chi_square": float(((counts - expected) ** 2 / expected).sum()),
+    }
+
+
+def des_weak_key_sweep_job(report, start_key: str, count: int):
+    """
+    مسح count مفتاح DES متتالية من start_key: المفاتيح الضعيفة (كل المفاتيح
+    الفرعية متساوية) وشبه الضعيفة (مفتاحان فرعيان مختلفان فقط)
+    """
+    if len(start_key) != 16:
+        raise ValueError("المفتاح يجب أن يكون 16 حرف hexadecimal")
+    if count < 1:
+        raise ValueError("عدد المفاتيح يجب أن يكون 1 على الأقل")
+    first = int(start_key, 16)
+    weak, semi_weak = [], []
+    for i in range(count):
+        hex_key = format((first + i) % (1 << 64), "016X")
+        distinct = len(set(ciphers.des_generate_subkeys(hex_key)))
+        if distinct == 1:
+            weak.append(hex_key)
+        elif distinct == 2:
+            semi_weak.append(hex_key)
+        report(i + 1, count, {"checked": i + 1, "weak": weak, "semi_weak": semi_weak})
+    return {"start_key": start_key.upper(), "count": count, "weak": weak, "semi_weak": semi_weak}
+
+
+JOB_KINDS = {
+    "additive_bruteforce": additive_bruteforce_job,
+    "multiplicative_bruteforce": multiplicative_bruteforce_job,
+    "vigenere_crack": vigenere_crack_job,
+    "autokey_crack": autokey_crack_job,
+    "playfair_crack": playfair_crack_job,
+    "rc4_statistics": rc4_statistics_job,
+    "des_weak_key_sweep": des_weak_key_sweep_job,
+}
+
+
+# ========== في الخادم ==========
+
+class JobQueue:
+    """
+    يأخذ المهام المنتظرة من القاعدة ويشغلها في pool بحد WORKERS مهمة في نفس الوقت.
+
+    إذا مات عامل (kill أو نفاد الذاكرة) يصبح الـ pool كله BrokenProcessPool:
+    المهام التي كانت فيه تُعلَّم failed، ويُبنى pool جديد وتُستعاد المهام
+    العالقة. أي خطأ آخر في الـ dispatcher (مثل قاعدة مقفلة) يُسجل ثم يُعاد
+    المحاولة في الدورة التالية، فلا تتوقف القائمة بصمت.
+    """
+
+    def __init__(self, path=None, workers=WORKERS):
+        # مسار مطلق يُمرر للعمال، فلا يعتمدون على متغيرات البيئة أو المجلد الحالي عندهم
+        self.path = os.path.abspath(path or DB_PATH)
+        self.workers = workers
+        self.pool = None
+        self.task = None
+        # future -> (job_id, الـ pool الذي يعمل فيه)
+        self.running = {}
+        self.failed = []
+        self.wake = asyncio.Event()
+
+    async def start(self):
+        await asyncio.to_thread(init_db, self.path)
+        await asyncio.to_thread(recover_jobs, self.path)
+        self.pool = self._new_pool()
+        self.task = asyncio.create_task(self._dispatch())
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=SPAWN)
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.pool is not None:
+            # المهام التي تعمل تعود للانتظار عند التشغيل التالي
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def _rebuild(self, broken):
+        """استبدال الـ pool المعطل مرة واحدة فقط، ثم إعادة المهام العالقة للانتظار"""
+        if broken is not self.pool:
+            return
+        log.warning("job worker pool is broken, starting a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+        await asyncio.to_thread(recover_jobs, self.path)
+
+    async def _settle(self):
+        failed, self.failed = self.failed, []
+        for job_id, pool, error in failed:
+            if isinstance(error, BrokenProcessPool):
+                message = "توقف العامل أثناء تنفيذ المهمة"
+            else:
+                message = str(error) or type(error).__name__
+            await asyncio.to_thread(fail_job, job_id, message, self.path)
+            if isinstance(error, BrokenProcessPool):
+                await self._rebuild(pool)
+
+    async def _fill(self):
+        loop = asyncio.get_running_loop()
+        while len(self.running) < self.workers:
+            job_id = await asyncio.to_thread(claim_job, self.path)
+            if job_id is None:
+                return
+            pool = self.pool
+            try:
+                future = loop.run_in_executor(pool, run_job, job_id, self.path)
+            except BrokenProcessPool:
+                await asyncio.to_thread(requeue_job, job_id, self.path)
+                await self._rebuild(pool)
+                continue
+            self.running[future] = (job_id, pool)
+            future.add_done_callback(self._finished)
+
+    async def _dispatch(self):
+        while True:
+            try:
+                await self._settle()
+                await self._fill()
+            except Exception:
+                log.exception("job dispatcher failed, retrying")
+            try:
+                await asyncio.wait_for(self.wake.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+
+    def _finished(self, future):
+        job_id, pool = self.running.pop(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.failed.append((job_id, pool, future.exception()))
+        self.wake.set()
+
+
+queue = JobQueue()
+router = APIRouter(prefix="/jobs", tags=["Jobs"], on_startup=[queue.start], on_shutdown=[queue.stop])
+
+
+class JobRequest(BaseModel):
+    kind: str = Field(..., description="نوع المهمة: " + ", ".join(JOB_KINDS))
+    params: Dict[str, Any] = Field({}, description="معاملات المهمة")
+
+
+def _found(job, job_id):
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"المهمة {job_id} غير موجودة")
+    return job
+
+
+@router.post("")
+async def create_job(request: JobRequest):
+    """إضافة مهمة للقائمة، يعيد job_id"""
+    run = JOB_KINDS.get(request.kind)
+    if run is None:
+        raise HTTPException(status_code=400,
+                            detail=f"نوع غير معروف {request.kind!r}، اختر من: {', '.join(JOB_KINDS)}")
+    try:
+        inspect.signature(run).bind(None, **request.params)
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"معاملات غير صحيحة: {e}")
+    job_id = await asyncio.to_thread(submit_job, request.kind, request.params, queue.path)
+    queue.wake.set()
+    return {"job_id": job_id, "status": QUEUED}
+
+
+@router.get("")
+async def jobs(status: Optional[str] = Query(None), limit: int = Query(100, ge=1, le=1000)):
+    """أحدث المهام، مع إمكانية التصفية حسب الحالة"""
+    return {"jobs": await asyncio.to_thread(list_jobs, status, limit, queue.path)}
+
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    """الحالة والتقدم والنتيجة الجزئية أو النهائية"""
+    return _found(await asyncio.to_thread(get_job, job_id, queue.path), job_id)
+
+
+@router.post("/{job_id}/cancel")
+async def job_cancel(job_id: str):
+    """إلغاء مهمة منتظرة أو طلب إيقاف مهمة تعمل"""
+    return _found(await asyncio.to_thread(cancel_job, job_id, queue.path), job_id)
+
+
+@router.delete("/{job_id}")
+async def job_delete(job_id: str):
+    """حذف مهمة منتهية مع نتيجتها"""
+    job = _found(await asyncio.to_thread(get_job, job_id, queue.path), job_id)
+    if job["status"] not in FINISHED or not await asyncio.to_thread(delete_job, job_id, queue.path):
+        raise HTTPException(status_code=409, detail="لا يمكن حذف مهمة لم تنته، ألغها أولاً")
+    return {"job_id": job_id, "deleted": True}
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """server-sent events: حدث progress عند كل تغيير، ثم حدث end بالحالة النهائية"""
+    _found(await asyncio.to_thread(get_job, job_id, queue.path), job_id)
+
+    async def events():
+        last = None
+        while True:
+            job = await asyncio.to_thread(get_job, job_id, queue.path)
+            if job is None:
+                return
+            state = (job["status"], job["progress"], job["partial"])
+            if state != last:
+                last = state
+                name = "end" if job["status"] in FINISHED else "progress"
+                yield f"event: {name}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job["status"] in FINISHED:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-store"})
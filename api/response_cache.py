@@ -0,0 +1,271 @@
+"""
+تخزين مؤقت لنتائج الـ endpoints الحتمية (نفس المدخلات تعطي نفس الناتج دائماً)
+
+المفتاح هو hash لـ (method, path, query, body)، والـ body من نوع JSON يُعاد
+ترتيب مفاتيحه قبل الحساب حتى تتطابق الطلبات المتساوية في المعنى. النتائج
+تُحفظ في الذاكرة بحد أقصى للحجم بالبايت، ويُحذف الأقدم استخداماً (LRU)
+أو المنتهية صلاحيته (TTL) أولاً. إذا تم تحديد مجلد، تُكتب النتائج أيضاً
+على القرص، فتستفيد منها العمليات الأخرى (مثل عمال gunicorn) وتبقى بعد
+إعادة التشغيل. للقرص حد منفصل بالبايت (disk_bytes): كل DISK_SWEEP_INTERVAL
+ثانية، أو بعد كتابة عُشر الحد، يمر العامل على المجلد فيحذف الملفات المنتهية
+صلاحيتها ثم الأقدم كتابة حتى يعود الحجم تحت الحد. الحد تقريبي لأن كل عامل
+يكتب بين مرورين. الملف التالف يُعامل كأنه غير موجود ويُحذف.
+
+كل رد يحمل ETag (hash لمحتواه)، والطلب الذي يرسل If-None-Match بنفس
+القيمة يحصل على 304 بدون جسم.
+
+لا يُخزن إلا:
+  - المسارات المذكورة صراحة في `paths` (المسار الجديد لا يُخزن تلقائياً)؛
+  - الردود الناجحة (200) التي لا تحمل Cache-Control: no-store. أي endpoint
+    تصبح نتيجته عشوائية (مثل مفتاح عشوائي) يجب أن يرسل no-store.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+# الحد الافتراضي لحجم النتائج في الذاكرة (بايت) وعمرها (ثانية)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 3600
+# الحد الافتراضي لحجم ملفات القرص، وأقصى مدة (ثانية) بين مرورين على المجلد
+DEFAULT_DISK_BYTES = 512 * 1024 * 1024
+DISK_SWEEP_INTERVAL = 60
+
+
+class _Entry:
+    def __init__(self, body, etag, media_type, expires):
+        self.body = body
+        self.etag = etag
+        self.media_type = media_type
+        self.expires = expires
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.etag) + len(self.media_type)
+
+
+class ResponseCache:
+    """نتائج محفوظة حسب المفتاح، في الذاكرة (LRU بحد بايت) ثم على القرص اختيارياً"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, directory=None,
+                 disk_bytes=DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # ما كُتب على القرص منذ آخر مرور، ووقت ذلك المرور
+        self.unswept = 0
+        self.swept = time.monotonic()
+        self.sweeping = False
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(method, path, query, body):
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+        digest = hashlib.sha256(f"{method} {path}?{query}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+    def _remember(self, key, entry):
+        if key in self.entries:
+            self._drop(key)
+        if entry.size > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    def _file(self, key):
+        return os.path.join(self.directory, key + ".cache")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _read_disk(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            header, body = data.split(b"\n", 1)
+            expires, etag, media_type = header.decode("utf-8").split(" ", 2)
+            expires = float(expires)
+        except ValueError:
+            # ملف تالف (كتابة مقطوعة أو تعديل يدوي) يُعامل كأنه غير موجود
+            self._remove(self._file(key))
+            return None
+        if expires < time.time():
+            self._remove(self._file(key))
+            return None
+        return _Entry(body, etag, media_type, expires)
+
+    def _write_disk(self, key, entry):
+        # الكتابة لملف مؤقت ثم استبداله حتى لا يقرأ عامل آخر ملفاً ناقصاً
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(f"{entry.expires} {entry.etag} {entry.media_type}\n".encode("utf-8") + entry.body)
+        os.replace(tmp, self._file(key))
+
+    def _sweep_disk(self):
+        """
+        حذف الملفات المنتهية صلاحيتها ثم الأقدم كتابة حتى يصبح المجموع تحت disk_bytes.
+        الصلاحية هنا من وقت تعديل الملف + ttl حتى لا نقرأ كل ملف، والملفات
+        المؤقتة المتروكة من كتابة لم تكتمل تُحذف بنفس القاعدة.
+        """
+        now = time.time()
+        files, total = [], 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                try:
+                    if not item.is_file():
+                        continue
+                    stat = item.stat()
+                except OSError:
+                    continue
+                if stat.st_mtime + self.ttl < now:
+                    self._remove(item.path)
+                elif item.name.endswith(".cache"):
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    async def _maybe_sweep(self, written):
+        self.unswept += written
+        due = time.monotonic() - self.swept >= DISK_SWEEP_INTERVAL or self.unswept >= self.disk_bytes // 10
+        if not due or self.sweeping:
+            return
+        self.sweeping = True
+        try:
+            await asyncio.to_thread(self._sweep_disk)
+        finally:
+            self.sweeping = False
+            self.unswept = 0
+            self.swept = time.monotonic()
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires < time.time():
+            self._drop(key)
+            entry = None
+        if entry is None and self.directory:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def put(self, key, body, media_type):
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        entry = _Entry(body, etag, media_type, time.time() + self.ttl)
+        self._remember(key, entry)
+        if self.directory:
+            await asyncio.to_thread(self._write_disk, key, entry)
+            await self._maybe_sweep(entry.size)
+        return entry
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "ttl": self.ttl, "hits": self.hits, "misses": self.misses, "directory": self.directory,
+                "disk_bytes": self.disk_bytes}
+
+
+class CacheMiddleware:
+    """ASGI middleware يخدم طلبات POST للمسارات الحتمية من ResponseCache"""
+
+    def __init__(self, app, cache, paths):
+        self.app = app
+        self.cache = cache
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # قراءة الجسم كاملاً لحساب المفتاح، ثم إعادته للتطبيق كما هو
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        key = self.cache.key(scope["method"], scope["path"], scope["query_string"].decode("latin-1"), body)
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode("latin-1")
+
+        entry = await self.cache.get(key)
+        if entry is not None:
+            await self._send(send, entry, if_none_match, b"HIT")
+            return
+
+        sent = False
+
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start, parts = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+
+        await self.app(scope, replay, capture)
+        headers = {name.lower(): value for name, value in start["headers"]}
+        content = b"".join(parts)
+        if start["status"] == 200 and b"no-store" not in headers.get(b"cache-control", b""):
+            media_type = headers.get(b"content-type", b"application/json").decode("latin-1")
+            await self._send(send, await self.cache.put(key, content, media_type), if_none_match, b"MISS")
+            return
+        await send(start)
+        await send({"type": "http.response.body", "body": content})
+
+    @staticmethod
+    async def _send(send, entry, if_none_match, state):
+        headers = [(b"etag", entry.etag.encode("latin-1")), (b"x-cache", state)]
+        if entry.etag in (tag.strip() for tag in if_none_match.split(",")):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += [(b"content-type", entry.media_type.encode("latin-1")),
+                    (b"content-length", str(len(entry.body)).encode("latin-1"))]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
@@ -0,0 +1,183 @@
+"""
+جلسات WebSocket للتشفير التفاعلي بمعدل عالٍ
+
+الاتصال يحدد المشفر والمفتاح والاتجاه مرة واحدة:
+    /ws/session?cipher=vigenere&key=LEMON&mode=encrypt
+
+يُبنى المفتاح (مصفوفة Playfair، جدول S في RC4، تنظيف مفتاح Vigenere...)
+عند فتح الجلسة فقط، ثم تمر كل الرسائل عبر نسخة الـ stream من المشفر، لذلك
+تبقى الحالة بين الرسائل: موقع المفتاح في Vigenere، آخر الأحرف في AutoKey،
+موقع S-box في RC4، والحرف المنتظر شريكه في Playfair. ناتج عدة رسائل هو
+نفس ناتج تشفير النص المجمّع مرة واحدة.
+
+أشكال الرسائل (تُعالج بالترتيب، فيمكن إرسال عدة رسائل دون انتظار الردود):
+  - binary: البيانات الخام، والرد binary بدون أي إطار. في RC4 هي البايتات
+    نفسها، وفي باقي المشفرات نص UTF-8 (الحرف المقسوم بين رسالتين يُجمع).
+  - text: JSON مختصر {"i": 7, "t": "..."} والرد {"i": 7, "t": "..."}.
+    الحقل i اختياري ويُعاد كما هو. في RC4 يكون t بصيغة hex.
+  - {"op": "flush"}: إنهاء النص الحالي وإرجاع ما تبقى (مثل آخر حرف في
+    Playfair)، ثم تبدأ الحالة من جديد بنفس المفتاح.
+  - {"op": "reset"}: البدء من جديد بدون إرجاع شيء.
+
+عند الخطأ يكون الرد {"i": 7, "e": "..."}، وإذا كان الخطأ داخل المشفر نفسه
+تبدأ الحالة من جديد.
+"""
+
+import codecs
+import json
+from collections import deque
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+import information_security as ciphers
+
+# WebSocket close code عند مشفر أو مفتاح غير صالح (policy violation)
+INVALID_SESSION = 1008
+
+
+def _int_key(key):
+    try:
+        return int(key)
+    except ValueError:
+        raise ValueError("المفتاح يجب أن يكون رقماً") from None
+
+
+def _rc4_key(key):
+    if not key:
+        raise ValueError("المفتاح لا يجوز أن يكون فارغاً")
+    return key
+
+
+# cipher -> (تجهيز المفتاح، stream للتشفير، stream لفك التشفير)
+SESSION_CIPHERS = {
+    "additive": (_int_key, "additive_encrypt_stream", "additive_decrypt_stream"),
+    "multiplicative": (_int_key, "multiplicative_encrypt_stream", "multiplicative_decrypt_stream"),
+    "playfair": (str, "playfair_encrypt_stream", "playfair_decrypt_stream"),
+    "vigenere": (str, "vigenere_encrypt_stream", "vigenere_decrypt_stream"),
+    "autokey": (str, "autokey_encrypt_stream", "autokey_decrypt_stream"),
+    "rc4": (_rc4_key, "rc4_crypt_stream", "rc4_crypt_stream"),
+}
+
+
+def _drain(inbox):
+    while inbox:
+        yield inbox.popleft()
+
+
+class CipherSession:
+    """نسخة stream واحدة من المشفر، تُغذى رسالة رسالة عبر inbox"""
+
+    def __init__(self, cipher, key, mode):
+        if cipher not in SESSION_CIPHERS:
+            raise ValueError(f"مشفر غير معروف {cipher!r}، اختر من: {', '.join(SESSION_CIPHERS)}")
+        if mode not in ("encrypt", "decrypt"):
+            raise ValueError("mode يجب أن يكون encrypt أو decrypt")
+        prepare, encrypt, decrypt = SESSION_CIPHERS[cipher]
+        self.binary = cipher == "rc4"
+        self.key = prepare(key)
+        self.make_stream = getattr(ciphers, encrypt if mode == "encrypt" else decrypt)
+        self.reset()
+
+    def reset(self):
+        self.inbox = deque()
+        self.stream = self.make_stream(_drain(self.inbox), self.key)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        # rc4_crypt_stream لا يبني جدول S إلا عند أول قطعة، فنبدأه الآن
+        # حتى لا تدفع الرسالة الأولى ثمن بناء المفتاح
+        if self.binary:
+            self.feed(b"")
+
+    def feed(self, data):
+        """ناتج قطعة واحدة؛ أي خطأ يترك الـ stream منتهياً، فنعيد تشغيله"""
+        self.inbox.append(data)
+        try:
+            return next(self.stream)
+        except Exception:
+            self.reset()
+            raise
+
+    def feed_bytes(self, data):
+        if self.binary:
+            return self.feed(data)
+        text = self.decoder.decode(data)
+        return self.feed(text).encode("utf-8") if text else b""
+
+    def feed_text(self, text):
+        if self.binary:
+            return self.feed(bytes.fromhex(text)).hex()
+        return self.feed(text)
+
+    def flush(self):
+        """إنهاء الـ stream الحالي وإرجاع ما تبقى فيه"""
+        try:
+            tail = list(self.stream)
+        finally:
+            self.reset()
+        if self.binary:
+            return b"".join(tail).hex()
+        return "".join(tail)
+
+
+def _error(e):
+    if isinstance(e, KeyError):
+        return f"حرف أو حقل غير صالح: {e.args[0]!r}"
+    return str(e)
+
+
+def _reply(message, field, value):
+    reply = {field: value}
+    if "i" in message:
+        reply["i"] = message["i"]
+    return json.dumps(reply, ensure_ascii=False, separators=(",", ":"))
+
+
+router = APIRouter(tags=["Sessions"])
+
+
+@router.websocket("/ws/session")
+async def cipher_session(websocket: WebSocket, cipher: str, key: str, mode: str = "encrypt"):
+    """جلسة تشفير بمفتاح واحد وحالة مستمرة بين الرسائل"""
+    await websocket.accept()
+    try:
+        session = CipherSession(cipher, key, mode)
+    except Exception as e:
+        await websocket.close(code=INVALID_SESSION, reason=str(e)[:120])
+        return
+
+    # receive/send مباشرة بدلاً من receive_text/receive_json لتقليل العمل لكل رسالة
+    receive, send = websocket.receive, websocket.send
+    try:
+        while True:
+            event = await receive()
+            if event["type"] == "websocket.disconnect":
+                return
+            data = event.get("bytes")
+            if data is not None:
+                try:
+                    await send({"type": "websocket.send", "bytes": session.feed_bytes(data)})
+                except (ValueError, KeyError, TypeError) as e:
+                    await send({"type": "websocket.send", "text": _reply({}, "e", _error(e))})
+                continue
+
+            message = {}
+            try:
+                message = json.loads(event["text"])
+                if not isinstance(message, dict):
+                    message = {}
+                    raise ValueError("الرسالة يجب أن تكون JSON object")
+                op = message.get("op")
+                if op is None:
+                    out = session.feed_text(message["t"])
+                elif op == "flush":
+                    out = session.flush()
+                elif op == "reset":
+                    session.reset()
+                    out = ""
+                else:
+                    raise ValueError(f"عملية غير معروفة {op!r}")
+                text = _reply(message, "t", out)
+            except (ValueError, KeyError, TypeError) as e:
+                text = _reply(message, "e", _error(e))
+            await send({"type": "websocket.send", "text": text})
+    except WebSocketDisconnect:
+        return
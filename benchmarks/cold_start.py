@@ -0,0 +1,64 @@
+"""
+قياس زمن الإقلاع البارد لـ Cipher API.
+
+كل تجربة تشغّل مفسّر Python جديد (مثل عامل جديد عند التوسع التلقائي) وتقيس:
+- زمن استيراد api.cipher_api
+- زمن أول طلب (يتضمن تحميل المشفر عند أول استخدام)
+
+التشغيل من جذر المستودع:
+    python -m benchmarks.cold_start --runs 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import api.cipher_api as m
+t1 = time.perf_counter()
+request = m.EncryptRequest(plaintext="attack at dawn", key="lemon")
+m.encrypt_vigenere(request)
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_request": t2 - t1}))
+"""
+
+
+def run_once(warmup):
+    env = dict(os.environ)
+    env.pop("CIPHER_API_WARMUP", None)
+    if warmup:
+        env["CIPHER_API_WARMUP"] = "1"
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples) * 1000:7.2f} ms | p95 {p95 * 1000:7.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for label, warmup in (("lazy", False), ("warm-up", True)):
+        results = [run_once(warmup) for _ in range(args.runs)]
+        print(f"[{label}]")
+        print("  import        :", summarize([r["import"] for r in results]))
+        print("  first request :", summarize([r["first_request"] for r in results]))
+
+
+if __name__ == "__main__":
+    main()
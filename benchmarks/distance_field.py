@@ -0,0 +1,60 @@
+"""
+Exit distance field vs. one A* per person.
+
+Run from the repository root:
+    python -m benchmarks.distance_field --sizes 256 1024 4096 --people 100
+"""
+import argparse
+import time
+
+import numpy as np
+
+from algo.distance_field import compute_distance_field
+from algo.pathfinding import EMPTY, WALL, EXIT, astar
+
+
+def random_grid(size, density, exits, rng):
+    grid = np.where(rng.random((size, size)) < density, WALL, EMPTY).astype(np.uint8)
+    for _ in range(exits):
+        grid[rng.integers(size), rng.integers(size)] = EXIT
+    return grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="exit distance field benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--people", type=int, default=100)
+    parser.add_argument("--exits", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--astar-limit", type=int, default=512,
+                        help="skip the per-person A* baseline above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        grid = random_grid(size, args.density, args.exits, rng)
+        free = np.argwhere(grid == EMPTY)
+        starts = [tuple(map(int, free[i])) for i in rng.choice(len(free), args.people)]
+
+        t0 = time.perf_counter()
+        field = compute_distance_field(grid)
+        t1 = time.perf_counter()
+        paths = field.paths(starts)
+        t2 = time.perf_counter()
+        routed = sum(p is not None for p in paths)
+        line = (f"{size:>5}x{size:<5} field {1000 * (t1 - t0):9.1f} ms | "
+                f"{args.people} paths {1000 * (t2 - t1):7.2f} ms | routed {routed}")
+
+        if size <= args.astar_limit:
+            exits = [tuple(map(int, e)) for e in np.argwhere(grid == EXIT)]
+            grid_list = grid.tolist()
+            t3 = time.perf_counter()
+            for start in starts:
+                astar(grid_list, start, exits)
+            line += f" | astar x{args.people} {1000 * (time.perf_counter() - t3):9.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
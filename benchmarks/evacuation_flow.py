@@ -0,0 +1,59 @@
+"""
+Scaling of the congestion-aware evacuation planner.
+
+For each grid size and crowd size, reports planning time, total evacuation
+time, and the congestion delay compared with everyone walking alone.
+
+Run from the repository root:
+    python -m benchmarks.evacuation_flow --sizes 50 100 200 --people 50 200 800
+"""
+import argparse
+import time
+
+import numpy as np
+
+from algo.crowd import plan_evacuation
+from algo.distance_field import compute_distance_field
+from algo.pathfinding import EMPTY, WALL, EXIT, PERSON
+
+
+def random_building(size, density, exits, people, rng):
+    grid = np.where(rng.random((size, size)) < density, WALL, EMPTY).astype(np.uint8)
+    for _ in range(exits):
+        grid[rng.integers(size), rng.integers(size)] = EXIT
+    free = np.argwhere(grid == EMPTY)
+    for r, c in free[rng.choice(len(free), min(people, len(free)), replace=False)]:
+        grid[r, c] = PERSON
+    return grid.tolist()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="evacuation planner benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--people", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--exits", type=int, default=2)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--capacity", type=int, default=1)
+    parser.add_argument("--exit-capacity", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'grid':>9} {'people':>6} {'plan ms':>9} {'evac time':>9} "
+          f"{'alone':>6} {'delay':>7} {'stranded':>8}")
+    for size in args.sizes:
+        for people in args.people:
+            grid = random_building(size, args.density, args.exits, people, rng)
+            t0 = time.perf_counter()
+            field = compute_distance_field(grid)
+            plan = plan_evacuation(grid, capacity=args.capacity,
+                                   exit_capacity=args.exit_capacity, field=field)
+            elapsed = time.perf_counter() - t0
+            alone = max((field.distance(s) or 0 for s in plan.starts), default=0)
+            print(f"{size:>4}x{size:<4} {len(plan.starts):>6} {1000 * elapsed:>9.1f} "
+                  f"{plan.evacuation_time:>9} {alone:>6} {plan.congestion_delay:>7} "
+                  f"{len(plan.stranded):>8}")
+
+
+if __name__ == "__main__":
+    main()
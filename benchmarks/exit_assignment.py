@@ -0,0 +1,75 @@
+"""
+Exit load balancing vs. sending everyone to the nearest exit.
+
+Each run places doors of different widths around a random floor and packs
+the crowd into one corner near a narrow door, the case where nearest-exit
+routing overloads one door. It reports the time for the per-door distance
+fields and for the balancing itself, and every door's clearance time under
+both assignments.
+
+Run from the repository root:
+    python -m benchmarks.exit_assignment --sizes 256 1024 --people 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from algo.exits import assign_exits
+from algo.pathfinding import EMPTY, EXIT
+from benchmarks.distance_field import random_grid
+
+
+def add_doors(grid, widths, rng):
+    """Doors of the given widths at random places on the outer walls"""
+    size = len(grid)
+    for i, width in enumerate(widths):
+        at = int(rng.integers(size - width))
+        span = slice(at, at + width)
+        side = i % 4
+        if side == 0:
+            grid[0, span] = EXIT
+        elif side == 1:
+            grid[size - 1, span] = EXIT
+        elif side == 2:
+            grid[span, 0] = EXIT
+        else:
+            grid[span, size - 1] = EXIT
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="exit assignment benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--doors", type=int, nargs="+", default=[1, 4, 2, 3],
+                        help="door widths in cells")
+    parser.add_argument("--density", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        grid = random_grid(size, args.density, 0, rng)
+        add_doors(grid, args.doors, rng)
+        free = np.argwhere(grid == EMPTY)
+        corner = free[np.argsort(free.sum(axis=1))[:3 * args.people]]
+        starts = [tuple(map(int, cell)) for cell in corner[rng.choice(len(corner), args.people, replace=False)]]
+
+        t0 = time.perf_counter()
+        assign_exits(grid, starts, balance=False)
+        t1 = time.perf_counter()
+        assignment = assign_exits(grid, starts)
+        t2 = time.perf_counter()
+        fields = t1 - t0
+        balance = (t2 - t1) - fields
+        stranded = int((assignment.door < 0).sum())
+        print(f"{size:>5}x{size:<5} {args.people} people | fields {1000 * fields:7.1f} ms | "
+              f"balancing {1000 * balance:6.1f} ms | stranded {stranded}")
+        print(f"{'':>11} nearest  clearance {assignment.nearest_clearance.tolist()} "
+              f"-> {int(assignment.nearest_clearance.max())}")
+        print(f"{'':>11} balanced clearance {assignment.clearance.tolist()} "
+              f"-> {assignment.evacuation_time} | loads {assignment.loads.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
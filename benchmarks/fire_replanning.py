@@ -0,0 +1,91 @@
+"""
+Per-tick replanning latency while fire spreads: D* Lite repair vs. A* from scratch.
+
+A person walks from the centre of a random floor to one of the corner exits
+while the fire spreads. Every tick the route is repaired incrementally; every
+--scratch-every ticks the same route is also replanned from scratch with
+astar() over the same blocked cells.
+
+Run from the repository root:
+    python -m benchmarks.fire_replanning --sizes 256 1024 2048
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from algo.fire import FireEvacuation
+from algo.pathfinding import EMPTY, WALL, FIRE, EXIT, astar
+
+
+def random_floor(size, density, fires, rng):
+    grid = np.where(rng.random((size, size)) < density, WALL, EMPTY).astype(np.uint8)
+    exits = [(0, 0), (0, size - 1), (size - 1, 0), (size - 1, size - 1)]
+    for r, c in exits:
+        grid[r, c] = EXIT
+    for _ in range(fires):
+        grid[rng.integers(size), rng.integers(size)] = FIRE
+    start = (size // 2, size // 2)
+    grid[start] = EMPTY
+    return grid, start, exits
+
+
+def scratch_replan(grid, sim, exits):
+    """astar() over the walls plus every cell the planner currently treats as blocked"""
+    blocked = np.frombuffer(bytes(sim.planner.blocked), dtype=np.uint8).reshape(grid.shape)
+    snapshot = np.where(blocked.astype(bool), FIRE, grid).tolist()
+    r, c = sim.position
+    snapshot[r][c] = EMPTY
+    started = time.perf_counter()
+    astar(snapshot, sim.position, exits)
+    return time.perf_counter() - started
+
+
+def ms(samples, q=None):
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    value = statistics.median(samples) if q is None else samples[min(len(samples) - 1, int(len(samples) * q))]
+    return 1000 * value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="fire replanning latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 2048])
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--safety-ticks", type=int, default=10,
+                        help="block cells the fire is expected to reach within this many ticks of the person")
+    parser.add_argument("--density", type=float, default=0.15)
+    parser.add_argument("--fires", type=int, default=3)
+    parser.add_argument("--scratch-every", type=int, default=50,
+                        help="replan from scratch every N ticks for comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        grid, start, exits = random_floor(size, args.density, args.fires, rng)
+        t0 = time.perf_counter()
+        sim = FireEvacuation(grid.tolist(), start, args.spread, args.safety_ticks, seed=args.seed)
+        initial = time.perf_counter() - t0
+
+        scratch = []
+        while sim.outcome is None:
+            sim.step()
+            if sim.outcome is None and sim.fire.tick % args.scratch_every == 0:
+                scratch.append(scratch_replan(grid, sim, exits))
+
+        repair = [h.replan_seconds for h in sim.history]
+        expanded = [h.expanded for h in sim.history]
+        print(f"{size}x{size}: {sim.outcome} after {sim.fire.tick} ticks, "
+              f"{int(sim.fire.burning.sum())} cells burning")
+        print(f"  initial plan              {1000 * initial:9.1f} ms")
+        print(f"  incremental/tick  median {ms(repair):8.2f} ms | p95 {ms(repair, 0.95):8.2f} ms | "
+              f"median expanded {statistics.median(expanded) if expanded else 0:.0f}")
+        print(f"  A* from scratch   median {ms(scratch):8.2f} ms | p95 {ms(scratch, 0.95):8.2f} ms "
+              f"({len(scratch)} ticks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+GridCore.astar() vs. pathfinding.astar() on maze and open-floor grids.
+
+Each run searches from the top-left corner to an exit in the bottom-right
+corner and reports wall time and peak traced memory for both searches
+(memory is traced in a separate run so it does not skew the timings).
+
+Run from the repository root:
+    python -m benchmarks.grid_core --sizes 100 500 1000 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from algo.grid_core import GridCore
+from algo.pathfinding import EMPTY, WALL, EXIT, astar
+
+
+def open_floor(size, rng, density=0.1):
+    return np.where(rng.random((size, size)) < density, WALL, EMPTY).astype(np.uint8)
+
+
+def maze(size, rng):
+    """Depth-first backtracker maze; corridors on even rows and columns"""
+    grid = np.full((size, size), WALL, dtype=np.uint8)
+    grid[0, 0] = EMPTY
+    stack = [(0, 0)]
+    steps = ((0, 2), (0, -2), (2, 0), (-2, 0))
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in steps
+                   if 0 <= r + dr < size and 0 <= c + dc < size and grid[r + dr, c + dc] == WALL]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc = options[rng.integers(len(options))]
+        grid[(r + nr) // 2, (c + nc) // 2] = EMPTY
+        grid[nr, nc] = EMPTY
+        stack.append((nr, nc))
+    return grid
+
+
+def measure(fn):
+    """Time one call, then repeat it under tracemalloc for the peak allocation"""
+    started = time.perf_counter()
+    path = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return path, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="grid core A* benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    parser.add_argument("--kinds", nargs="+", choices=("maze", "open"), default=["maze", "open"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'grid':>11} {'kind':>5} {'path':>7} | {'astar s':>8} {'MB':>7} | "
+          f"{'core s':>8} {'MB':>7} | speedup")
+    for size in args.sizes:
+        for kind in args.kinds:
+            cells = maze(size, rng) if kind == "maze" else open_floor(size, rng)
+            # odd sizes leave the last maze row/column as wall; the exit sits on a corridor
+            goal = (size - 1 - (size - 1) % 2, size - 1 - (size - 1) % 2) if kind == "maze" else (size - 1, size - 1)
+            cells[0, 0] = EMPTY
+            cells[goal] = EXIT
+
+            rows = cells.tolist()
+            core = GridCore.from_rows(cells)
+            base, t_base, m_base = measure(lambda: astar(rows, (0, 0), [goal]))
+            fast, t_core, m_core = measure(lambda: core.astar((0, 0), [goal]))
+            assert (base is None) == (fast is None) and (base is None or len(base) == len(fast))
+
+            length = "-" if fast is None else len(fast)
+            print(f"{size:>5}x{size:<5} {kind:>5} {length:>7} | {t_base:8.3f} {m_base / 1e6:7.1f} | "
+                  f"{t_core:8.3f} {m_core / 1e6:7.1f} | {t_base / t_core:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Hierarchical routing (HPA*) vs. searching the flat grid on every query.
+
+For each size the building has --floors random floors of size x size cells,
+with exits on the ground floor only and --stairs random staircases between
+consecutive floors. The benchmark reports the one-off cluster build, the
+abstract exit table, per-query latency (distance alone and the full refined
+route) and, for single-floor runs, how much longer the routes are than the
+exact ones from a flat distance field. It then sets a small fire on the top
+floor and times the incremental update plus the first query after it, which
+re-solves the abstract exit table.
+
+Run from the repository root:
+    python -m benchmarks.hpa --sizes 512 1024 2048 --floors 1
+"""
+import argparse
+import time
+
+import numpy as np
+
+from algo.distance_field import compute_distance_field
+from algo.hpa import Building
+from algo.pathfinding import EMPTY, FIRE
+from benchmarks.distance_field import random_grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="hierarchical routing benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048])
+    parser.add_argument("--floors", type=int, default=1)
+    parser.add_argument("--stairs", type=int, default=4, help="staircases between two floors")
+    parser.add_argument("--cluster", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--exits", type=int, default=4)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--exact-limit", type=int, default=1024,
+                        help="skip the exact-length comparison above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        floors = [random_grid(size, args.density, args.exits if f == 0 else 0, rng)
+                  for f in range(args.floors)]
+        stairs = []
+        for f in range(1, args.floors):
+            for _ in range(args.stairs):
+                r, c = map(int, rng.integers(size, size=2))
+                floors[f][r, c] = floors[f - 1][r, c] = EMPTY
+                stairs.append(((f, r, c), (f - 1, r, c)))
+        starts = []
+        for _ in range(args.queries):
+            f = int(rng.integers(args.floors))
+            free = np.argwhere(floors[f] == EMPTY)
+            starts.append((f, *map(int, free[rng.integers(len(free))])))
+
+        t0 = time.perf_counter()
+        building = Building(floors, stairs, cluster_size=args.cluster)
+        t1 = time.perf_counter()
+        building.distance(starts[0])
+        t2 = time.perf_counter()
+        lengths = [building.distance(s) for s in starts]
+        t3 = time.perf_counter()
+        paths = [building.path(s) for s in starts]
+        t4 = time.perf_counter()
+        routed = sum(p is not None for p in paths)
+        nodes = sum(len(n) for n in building.nodes.values())
+        line = (f"{size:>5}x{size:<5} x{args.floors} build {t1 - t0:6.2f} s | {nodes} nodes | "
+                f"table {1000 * (t2 - t1):7.1f} ms | distance {1000 * (t3 - t2) / len(starts):5.2f} ms | "
+                f"route {1000 * (t4 - t3) / len(starts):5.2f} ms | routed {routed}/{len(starts)}")
+
+        if args.floors == 1 and size <= args.exact_limit:
+            field = compute_distance_field(floors[0])
+            exact = [field.distance(s[1:]) for s in starts]
+            pairs = [(h, e) for h, e in zip(lengths, exact) if e is not None]
+            if any((h is None) != (e is None) for h, e in zip(lengths, exact)):
+                line += " | REACHABILITY MISMATCH"
+            if pairs:
+                excess = sum(h for h, _ in pairs) / max(1, sum(e for _, e in pairs)) - 1
+                line += f" | +{100 * excess:.2f}% length, worst +{max(h - e for h, e in pairs)}"
+        print(line)
+
+        top = args.floors - 1
+        r, c = map(int, rng.integers(size - 8, size=2))
+        fire = [(r + dr, c + dc) for dr in range(8) for dc in range(8)]
+        t5 = time.perf_counter()
+        rebuilt = building.set_cells(top, fire, FIRE)
+        t6 = time.perf_counter()
+        building.distance(starts[-1])
+        t7 = time.perf_counter()
+        print(f"{'':>11} fire 8x8: update {1000 * (t6 - t5):6.1f} ms ({rebuilt} clusters) | "
+              f"first query after {1000 * (t7 - t6):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
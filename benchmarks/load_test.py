@@ -0,0 +1,599 @@
+"""
+اختبار تحميل لـ Cipher API انطلاقاً من Postman collection.
+
+يقرأ الطلبات وأمثلة الأجسام من postman/Cipher_API.postman_collection.json
+والمتغيرات من الـ environment، ثم يرسلها إلى:
+- التطبيق نفسه داخل نفس العملية (ASGI مباشرة، بدون شبكة) افتراضياً؛
+- خادم قائم (--url http://localhost:8000)؛
+- أو خادم uvicorn يُشغّل لكل عدد عمال في --workers ويُغلق بعد القياس.
+
+الحمل إما مغلق (--concurrency طلبات متزامنة، كل واحد ينتظر رده قبل التالي)
+أو مفتوح (--rate طلب في الثانية بتوزيع Poisson، بغض النظر عن سرعة الردود).
+في الحمل المفتوح يُقاس الزمن من موعد الطلب المجدول وليس من لحظة إرساله،
+حتى يظهر التأخير الذي يسببه تراكم الطلبات.
+
+حد المعدل لكل عميل (CIPHER_API_RATE) يُلغى افتراضياً في التطبيق داخل العملية
+وفي خوادم --workers، لأن كل الحمل يأتي من عميل واحد فتصبح معظم الردود 429
+ويُقاس حد المعدل بدلاً من الخادم. --limits يبقي الحدود كما في الـ environment.
+مع --url لا يمكن التحكم في الخادم، فيظهر تحذير إذا كانت أغلب الردود 429.
+
+الطلبات التي تحفظ متغيراً في Postman (مثل grid_id بعد رفع خريطة) تُرسل مرة
+قبل القياس حتى تعمل الطلبات التي تعتمد عليها. مجلد Jobs مستبعد افتراضياً
+لأنه يشغّل مهام خلفية حقيقية.
+
+التشغيل من جذر المستودع:
+    python -m benchmarks.load_test --duration 10 --concurrency 32
+    python -m benchmarks.load_test --rate 300 --mix "*/Additive/*=10" "Playfair*=1" --scale 50
+    python -m benchmarks.load_test --workers 1 2 4 --save runs/workers.json
+    python -m benchmarks.load_test --compare runs/before.json runs/workers.json
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLLECTION = os.path.join(ROOT, "postman", "Cipher_API.postman_collection.json")
+ENVIRONMENT = os.path.join(ROOT, "postman", "Cipher_API.postman_environment.json")
+
+DEFAULT_EXCLUDE = ["Jobs/*"]
+# حقول JSON التي تُكرر عند --scale
+TEXT_FIELDS = ("plaintext", "ciphertext")
+
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+# الشكل الوحيد المدعوم من سكربتات Postman: حفظ حقل من رد JSON في متغير
+_SET_VARIABLE = re.compile(r'pm\.collectionVariables\.set\("(\w+)",\s*pm\.response\.json\(\)\.(\w+)\)')
+
+
+# ========== قراءة الـ collection ==========
+
+class Route:
+    def __init__(self, name, method, url, headers, body, sets):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.sets = sets
+
+    def needs(self):
+        return set(_VARIABLE.findall(self.url + self.body))
+
+    def content_type(self):
+        return dict((k.lower(), v) for k, v in self.headers).get("content-type", "")
+
+
+def _walk(items, prefix=""):
+    for item in items:
+        name = prefix + item["name"]
+        if "item" in item:
+            yield from _walk(item["item"], name + "/")
+            continue
+        request = item["request"]
+        url = request["url"] if isinstance(request["url"], str) else request["url"]["raw"]
+        headers = [(h["key"], h["value"]) for h in request.get("header", []) if not h.get("disabled")]
+        body = (request.get("body") or {}).get("raw", "")
+        script = "\n".join(line for event in item.get("event", []) if event.get("listen") == "test"
+                           for line in event["script"].get("exec", []))
+        yield Route(name, request["method"], url, headers, body, _SET_VARIABLE.findall(script))
+
+
+def load_collection(path=COLLECTION, environment=ENVIRONMENT, overrides=()):
+    """الطلبات والمتغيرات؛ قيم الـ environment تغطي قيم الـ collection، و--var تغطي الجميع"""
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    variables = {v["key"]: v.get("value", "") for v in collection.get("variable", [])}
+    if environment and os.path.exists(environment):
+        with open(environment, encoding="utf-8") as f:
+            variables.update({v["key"]: v.get("value", "") for v in json.load(f)["values"]
+                              if v.get("enabled", True)})
+    for override in overrides:
+        key, _, value = override.partition("=")
+        variables[key] = value
+    return list(_walk(collection["item"])), variables
+
+
+def resolve(text, variables):
+    def value(match):
+        found = variables.get(match.group(1))
+        if found in (None, ""):
+            raise KeyError(match.group(1))
+        return str(found)
+    return _VARIABLE.sub(value, text)
+
+
+def scale_body(body, content_type, factor):
+    """تكبير الجسم بتكرار النص factor مرة (يبقى طول النص المشفر زوجياً وصالحاً)"""
+    if factor == 1 or not body:
+        return body
+    if "json" not in content_type:
+        return body * factor
+    data = json.loads(body)
+    for field in TEXT_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] *= factor
+    return json.dumps(data, ensure_ascii=False)
+
+
+class Prepared:
+    """طلب جاهز للإرسال: المسار والـ headers والجسم بعد التعويض والتكبير"""
+
+    def __init__(self, route, variables, scale):
+        # الهدف يحدد الخادم، فنأخذ من الرابط المسار والـ query فقط
+        url = urlsplit(resolve(route.url.replace("{{base_url}}", ""), variables))
+        self.name = route.name
+        self.method = route.method
+        self.target = (url.path or "/") + ("?" + url.query if url.query else "")
+        self.body = scale_body(resolve(route.body, variables), route.content_type(), scale).encode("utf-8")
+        self.headers = [(k.lower().encode("latin-1"), resolve(v, variables).encode("latin-1"))
+                        for k, v in route.headers]
+
+
+# ========== الأهداف ==========
+
+class InProcess:
+    """استدعاء تطبيق ASGI مباشرة؛ يقيس الخادم وحده بدون تكلفة الشبكة"""
+
+    label = "in-process"
+
+    async def start(self):
+        from api.cipher_api import app
+        self.app = app
+        await app.router.startup()
+
+    async def stop(self):
+        await self.app.router.shutdown()
+
+    async def request(self, prepared):
+        path, _, query = prepared.target.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": prepared.method, "scheme": "http", "root_path": "",
+            "path": unquote(path), "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "headers": prepared.headers + [(b"content-length", str(len(prepared.body)).encode("latin-1"))],
+            "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+        }
+        done = asyncio.Event()
+        sent = False
+        status, parts = None, []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": prepared.body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        await self.app(scope, receive, send)
+        done.set()
+        return status, b"".join(parts)
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.open = True
+
+    async def request(self, host, prepared):
+        lines = [f"{prepared.method} {prepared.target} HTTP/1.1", f"Host: {host}",
+                 f"Content-Length: {len(prepared.body)}"]
+        lines += [f"{k.decode('latin-1')}: {v.decode('latin-1')}" for k, v in prepared.headers]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + prepared.body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                parts.append((await self.reader.readexactly(size + 2))[:-2])
+            body = b"".join(parts)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.open = False
+        if headers.get("connection", "").lower() == "close":
+            self.open = False
+        return status, body
+
+    def close(self):
+        self.open = False
+        self.writer.close()
+
+
+class Server:
+    """خادم HTTP عبر اتصالات keep-alive يُعاد استخدامها"""
+
+    def __init__(self, url, label=None):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.label = label or url
+        self.idle = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        while self.idle:
+            self.idle.pop().close()
+
+    async def request(self, prepared):
+        connection = self.idle.pop() if self.idle else _Connection(
+            *await asyncio.open_connection(self.host, self.port))
+        try:
+            result = await connection.request(f"{self.host}:{self.port}", prepared)
+        except BaseException:
+            connection.close()
+            raise
+        if connection.open:
+            self.idle.append(connection)
+        else:
+            connection.close()
+        return result
+
+
+class Spawned(Server):
+    """uvicorn بعدد عمال محدد على منفذ محلي حر، يُغلق في stop()"""
+
+    def __init__(self, workers, env):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        super().__init__(f"http://127.0.0.1:{port}", label=f"uvicorn-w{workers}")
+        self.workers = workers
+        self.env = env
+
+    async def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "api.cipher_api:app", "--host", self.host,
+             "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=ROOT, env=self.env,
+        )
+        probe = Prepared(Route("probe", "GET", "/", [], "", []), {}, 1)
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                await self.request(probe)
+                return
+            except (OSError, asyncio.IncompleteReadError):
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+
+    async def stop(self):
+        await super().stop()
+        self.process.terminate()
+        self.process.wait(30)
+
+
+# ========== تشغيل الحمل ==========
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.codes = Counter()
+        self.errors = 0
+
+    def record(self, status, latency):
+        self.latencies.append(latency)
+        self.codes[status] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        n = len(latencies)
+
+        def percentile(q):
+            return round(1000 * latencies[min(n - 1, int(q * n))], 3) if n else None
+
+        return {
+            "requests": n,
+            "rps": round(n / elapsed, 2),
+            "error_rate": round(self.errors / n, 4) if n else 0.0,
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(1000 * latencies[-1], 3) if n else None,
+            "codes": {str(code): count for code, count in sorted(self.codes.items(), key=str)},
+        }
+
+
+async def _timed(target, prepared, stats, started):
+    try:
+        status, _ = await target.request(prepared)
+    except Exception as e:
+        status = type(e).__name__
+    stats.record(status, time.perf_counter() - started)
+
+
+async def closed_loop(target, requests, weights, stats, args, rng):
+    deadline = time.perf_counter() + args.duration
+    remaining = args.requests
+
+    async def user():
+        nonlocal remaining
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            i = rng.choices(range(len(requests)), weights)[0]
+            await _timed(target, requests[i], stats[i], time.perf_counter())
+
+    await asyncio.gather(*(user() for _ in range(args.concurrency)))
+
+
+async def open_loop(target, requests, weights, stats, args, rng):
+    """وصول Poisson بمعدل args.rate؛ الطلب الذي يصل والـ in-flight ممتلئ يُحسب dropped"""
+    start = time.perf_counter()
+    scheduled = start
+    count = 0
+    tasks = set()
+    while True:
+        scheduled += rng.expovariate(args.rate)
+        if scheduled - start > args.duration or (args.requests is not None and count >= args.requests):
+            break
+        count += 1
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        i = rng.choices(range(len(requests)), weights)[0]
+        if len(tasks) >= args.max_inflight:
+            stats[i].record("dropped", time.perf_counter() - scheduled)
+            continue
+        task = asyncio.ensure_future(_timed(target, requests[i], stats[i], scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def _matches(route, patterns):
+    target = urlsplit(route.url.replace("{{base_url}}", "")).path
+    return any(fnmatch.fnmatchcase(route.name, p) or fnmatch.fnmatchcase(target, p) for p in patterns)
+
+
+def select(routes, include, exclude, mix):
+    """(route, weight) للطلبات المختارة؛ الوزن من أول نمط يطابق في --mix"""
+    chosen = []
+    for route in routes:
+        if not _matches(route, include) or _matches(route, exclude):
+            continue
+        weight = 1.0
+        if mix:
+            weight = next((w for pattern, w in mix if _matches(route, [pattern])), 0.0)
+        if weight > 0:
+            chosen.append((route, weight))
+    return chosen
+
+
+async def setup(target, routes, chosen, variables):
+    """إرسال الطلبات التي تحفظ متغيرات تحتاجها الطلبات المختارة، بترتيب الـ collection"""
+    needed = set().union(*(route.needs() for route, _ in chosen)) if chosen else set()
+    for route in routes:
+        sets = [(name, field) for name, field in route.sets if name in needed]
+        if not sets:
+            continue
+        try:
+            status, body = await target.request(Prepared(route, variables, 1))
+        except KeyError:
+            continue
+        if status >= 400:
+            print(f"setup: {route.name} -> {status}", file=sys.stderr)
+            continue
+        data = json.loads(body)
+        for name, field in sets:
+            variables[name] = data.get(field, "")
+
+
+async def run(target, routes, variables, args):
+    chosen = select(routes, args.include, args.exclude, args.mix)
+    await target.start()
+    try:
+        await setup(target, routes, chosen, variables)
+        requests, weights = [], []
+        for route, weight in chosen:
+            try:
+                requests.append(Prepared(route, variables, args.scale))
+            except KeyError as e:
+                print(f"skipped {route.name}: variable {e.args[0]} is not set", file=sys.stderr)
+                continue
+            weights.append(weight)
+        if not requests:
+            raise SystemExit("no requests selected")
+
+        stats = [RouteStats() for _ in requests]
+        rng = random.Random(args.seed)
+        started = time.perf_counter()
+        if args.rate:
+            await open_loop(target, requests, weights, stats, args, rng)
+        else:
+            await closed_loop(target, requests, weights, stats, args, rng)
+        elapsed = time.perf_counter() - started
+    finally:
+        await target.stop()
+
+    total = RouteStats()
+    for s in stats:
+        total.latencies += s.latencies
+        total.codes.update(s.codes)
+        total.errors += s.errors
+    return {
+        "label": args.label or target.label,
+        "target": target.label,
+        "mode": f"open rate={args.rate}" if args.rate else f"closed concurrency={args.concurrency}",
+        "scale": args.scale,
+        "elapsed": round(elapsed, 3),
+        "routes": {r.name: s.summary(elapsed) for r, s in zip(requests, stats)},
+        "total": total.summary(elapsed),
+    }
+
+
+# ========== التقرير ==========
+
+def _row(name, summary):
+    codes = " ".join(f"{c}:{n}" for c, n in summary["codes"].items() if not c.startswith("2"))
+    p = [("-" if summary[k] is None else f"{summary[k]:.1f}") for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms")]
+    return (f"{name[:44]:<44} {summary['requests']:>7} {summary['rps']:>9.1f} {100 * summary['error_rate']:>6.1f}% "
+            f"{p[0]:>8} {p[1]:>8} {p[2]:>8} {p[3]:>8}  {codes}")
+
+
+def report(result):
+    print(f"\n[{result['label']}] {result['mode']} scale={result['scale']} {result['elapsed']:.1f}s")
+    print(f"{'route':<44} {'count':>7} {'req/s':>9} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for name, summary in result["routes"].items():
+        print(_row(name, summary))
+    print(_row("TOTAL", result["total"]))
+    total = result["total"]
+    limited = total["codes"].get("429", 0)
+    if total["requests"] and limited > total["requests"] / 2:
+        print(f"warning: {100 * limited / total['requests']:.0f}% of responses are 429, so this run measures "
+              "the rate limiter rather than the server (raise CIPHER_API_RATE or drop --limits)", file=sys.stderr)
+
+
+def _load_runs(paths):
+    runs = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        runs += data if isinstance(data, list) else [data]
+    return runs
+
+
+def compare(runs):
+    """req/s و p99 ونسبة الأخطاء لكل طلب في كل تشغيل، والنسبة إلى التشغيل الأول"""
+    names = list(dict.fromkeys(name for run in runs for name in run["routes"])) + ["TOTAL"]
+    print(f"{'route':<44} " + " ".join(f"{run['label'][:30]:>30}" for run in runs))
+    base = runs[0]
+    for name in names:
+        cells = []
+        for run in runs:
+            summary = run["total"] if name == "TOTAL" else run["routes"].get(name)
+            if summary is None:
+                cells.append(f"{'-':>30}")
+                continue
+            reference = base["total"] if name == "TOTAL" else base["routes"].get(name)
+            ratio = f"x{summary['rps'] / reference['rps']:.2f}" if reference and reference["rps"] else ""
+            p99 = "-" if summary["p99_ms"] is None else f"{summary['p99_ms']:.1f}"
+            cells.append(f"{summary['rps']:>8.1f}/s {p99:>6}ms {100 * summary['error_rate']:>5.1f}% {ratio:>5}")
+        print(f"{name[:44]:<44} " + " ".join(cells))
+
+
+def _weight(text):
+    pattern, _, weight = text.rpartition("=")
+    if not pattern:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=WEIGHT, got {text!r}")
+    return pattern, float(weight)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", default=COLLECTION)
+    parser.add_argument("--environment", default=ENVIRONMENT)
+    parser.add_argument("--var", action="append", default=[], metavar="KEY=VALUE",
+                        help="تغطية متغير من الـ collection أو الـ environment")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="خادم قائم بدلاً من التطبيق داخل العملية")
+    target.add_argument("--workers", type=int, nargs="+", help="تشغيل uvicorn بكل عدد عمال والمقارنة بينها")
+    parser.add_argument("--concurrency", type=int, default=16, help="عدد الطلبات المتزامنة (الحمل المغلق)")
+    parser.add_argument("--rate", type=float, help="طلبات في الثانية (الحمل المفتوح)")
+    parser.add_argument("--max-inflight", type=int, default=1000, help="أقصى طلبات معلقة في الحمل المفتوح")
+    parser.add_argument("--duration", type=float, default=10.0, help="مدة القياس بالثواني")
+    parser.add_argument("--requests", type=int, help="عدد الطلبات الكلي (يتوقف عند الأسبق مع --duration)")
+    parser.add_argument("--include", nargs="+", default=["*"], help="أنماط اسم الطلب (Folder/Name) أو مساره")
+    parser.add_argument("--exclude", nargs="+", default=DEFAULT_EXCLUDE)
+    parser.add_argument("--mix", nargs="+", type=_weight, default=[], metavar="PATTERN=WEIGHT",
+                        help="وزن كل نمط في خليط الطلبات؛ ما لا يطابق أي نمط لا يُرسل")
+    parser.add_argument("--scale", type=int, default=1, help="تكرار نصوص الأجسام لتكبيرها")
+    parser.add_argument("--limits", action="store_true",
+                        help="إبقاء حد المعدل لكل عميل (افتراضياً CIPHER_API_RATE=0 داخل العملية ومع --workers)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", help="اسم التشغيل في التقرير والملف المحفوظ")
+    parser.add_argument("--save", help="حفظ النتائج JSON للمقارنة لاحقاً")
+    parser.add_argument("--compare", nargs="+", metavar="FILE", help="مقارنة نتائج محفوظة فقط")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(_load_runs(args.compare))
+        return
+
+    # مهام الـ jobs والخرائط المرفوعة في قواعد مؤقتة وليس في قواعد الخادم الحقيقية
+    # تُحذف مع كل ما فيها بعد انتهاء القياس
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as scratch:
+        env.setdefault("CIPHER_API_JOBS_DB", os.path.join(scratch, "load_test_jobs.sqlite3"))
+        env.setdefault("EVACUATION_GRIDS_DB", os.path.join(scratch, "load_test_grids.sqlite3"))
+        if not args.limits:
+            env["CIPHER_API_RATE"] = "0"
+
+        routes, variables = load_collection(args.collection, args.environment, args.var)
+        if args.url:
+            targets = [Server(args.url)]
+        elif args.workers:
+            targets = [Spawned(n, env) for n in args.workers]
+        else:
+            # يجب ضبط المتغيرات قبل استيراد التطبيق
+            os.environ.update(env)
+            if ROOT not in sys.path:
+                sys.path.insert(0, ROOT)
+            targets = [InProcess()]
+
+        results = []
+        for target in targets:
+            result = asyncio.run(run(target, routes, dict(variables), args))
+            if args.label and len(targets) > 1:
+                result["label"] = f"{args.label}/{target.label}"
+            report(result)
+            results.append(result)
+        if len(results) > 1:
+            print()
+            compare(results)
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(results if len(results) > 1 else results[0], f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
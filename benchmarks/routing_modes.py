@@ -0,0 +1,58 @@
+"""
+Every routing mode of algo.engine on generated floor plans.
+
+Maps come from algo.floorplans: rooms and corridors, perfect mazes, pillared
+halls and random obstacles, one per kind and size, generated from --seed (or
+read from a corpus written by `python -m algo.engine generate`). Each method
+routes the people on every map; the table lists solve time, routed people,
+total path length and nodes expanded.
+
+Run from the repository root:
+    python -m benchmarks.routing_modes --sizes 128 256 --people 50
+    python -m benchmarks.routing_modes --corpus corpus/ --methods field jps balanced
+"""
+import argparse
+import os
+
+from algo.engine import METHODS, collect_scenarios, evacuate
+from algo.floorplans import KINDS, corpus_seed, generate
+from algo.grid_core import GridCore
+from algo.grid_files import load_grid
+
+
+def maps(args):
+    """(name, GridCore) for every map of the corpus, or generated from the arguments"""
+    if args.corpus:
+        for path in collect_scenarios([args.corpus]):
+            yield os.path.basename(path), load_grid(path)
+        return
+    for size in args.sizes:
+        for kind in args.kinds:
+            cells = generate(kind, size, seed=corpus_seed(args.seed, kind, size),
+                             exits=args.exits, people=args.people, fires=args.fires)
+            yield f"{kind}-{size}", GridCore.from_array(cells)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="routing modes on generated floor plans")
+    parser.add_argument("--corpus", help="directory of grid files instead of generated maps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--people", type=int, default=50)
+    parser.add_argument("--exits", type=int, default=4)
+    parser.add_argument("--fires", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'map':>14} {'method':>13} {'ms':>10} {'routed':>7} {'path total':>10} {'expanded':>10}")
+    for name, grid in maps(args):
+        for method in args.methods:
+            result = evacuate(grid, method)
+            row = result.summary(name)
+            print(f"{name:>14} {method:>13} {1000 * result.solve_seconds:10.1f} "
+                  f"{row['routed']:>3}/{row['persons']:<3} {row['path_length']:>10} {row['expanded']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Nodes expanded and wall time for each search strategy in algo.search.
+
+Open floors (sparse random walls) and mazes, 4- and 8-connected, from the
+top-left corner to an exit in the bottom-right corner. The legacy astar()
+is listed for 4-connected runs as a baseline.
+
+Run from the repository root:
+    python -m benchmarks.search_strategies --sizes 256 512 1024
+"""
+import argparse
+import time
+
+import numpy as np
+
+from algo.grid_core import GridCore
+from algo.pathfinding import EMPTY, EXIT, astar
+from algo.search import STRATEGIES, find_path
+from benchmarks.grid_core import maze, open_floor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="search strategy benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--kinds", nargs="+", choices=("open", "maze"), default=["open", "maze"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'grid':>11} {'kind':>5} {'moves':>5} {'strategy':>14} {'cost':>10} {'expanded':>9} {'ms':>9}")
+    for size in args.sizes:
+        for kind in args.kinds:
+            cells = maze(size, rng) if kind == "maze" else open_floor(size, rng)
+            corner = size - 1 - (size - 1) % 2 if kind == "maze" else size - 1
+            goal = (corner, corner)
+            cells[0, 0] = EMPTY
+            cells[goal] = EXIT
+            core = GridCore.from_rows(cells)
+            label = f"{size:>5}x{size:<5} {kind:>5}"
+
+            started = time.perf_counter()
+            path = astar(cells.tolist(), (0, 0), [goal])
+            elapsed = time.perf_counter() - started
+            cost = "-" if path is None else f"{len(path):.2f}"
+            print(f"{label} {4:>5} {'legacy astar':>14} {cost:>10} {'-':>9} {1000 * elapsed:9.1f}")
+
+            for diagonal in (False, True):
+                for name in STRATEGIES:
+                    started = time.perf_counter()
+                    result = find_path(core, (0, 0), [goal], name, diagonal)
+                    elapsed = time.perf_counter() - started
+                    cost = "-" if result.cost is None else f"{result.cost:.2f}"
+                    print(f"{label} {8 if diagonal else 4:>5} {name:>14} {cost:>10} "
+                          f"{result.expanded:>9} {1000 * elapsed:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
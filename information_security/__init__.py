@@ -0,0 +1,87 @@
+"""
+حزمة المشفرات الكلاسيكية والحديثة.
+
+يتم تحميل كل مشفر عند أول استخدام فقط (lazy loading)، لذلك استيراد الحزمة
+نفسها لا يكلف شيئاً تقريباً. يمكن استدعاء warm_up() قبل تفرع العمال
+(مثلاً gunicorn --preload) لتحميل جميع الوحدات وبناء الجداول مسبقاً.
+"""
+
+import importlib
+
+# اسم الدالة -> الوحدة التي تحتويها
+_EXPORTS = {
+    "additive_encrypt": "classical_ciphers",
+    "additive_decrypt": "classical_ciphers",
+    "additive_bruteforce": "classical_ciphers",
+    "multiplicative_encrypt": "classical_ciphers",
+    "multiplicative_decrypt": "classical_ciphers",
+    "multiplicative_bruteforce": "classical_ciphers",
+    "additive_encrypt_stream": "classical_ciphers",
+    "additive_decrypt_stream": "classical_ciphers",
+    "multiplicative_encrypt_stream": "classical_ciphers",
+    "multiplicative_decrypt_stream": "classical_ciphers",
+    "playfair_encrypt": "playfair_cipher",
+    "playfair_decrypt": "playfair_cipher",
+    "playfair_key_matrix": "playfair_cipher",
+    "playfair_encrypt_stream": "playfair_cipher",
+    "playfair_decrypt_stream": "playfair_cipher",
+    "playfair_crack": "playfair_cipher",
+    "playfair_plausible": "playfair_cipher",
+    "vigenere_encrypt": "polyalphabetic_ciphers",
+    "vigenere_decrypt": "polyalphabetic_ciphers",
+    "autokey_encrypt": "polyalphabetic_ciphers",
+    "autokey_decrypt": "polyalphabetic_ciphers",
+    "vigenere_encrypt_stream": "polyalphabetic_ciphers",
+    "vigenere_decrypt_stream": "polyalphabetic_ciphers",
+    "autokey_encrypt_stream": "polyalphabetic_ciphers",
+    "autokey_decrypt_stream": "polyalphabetic_ciphers",
+    "vigenere_crack": "polyalphabetic_ciphers",
+    "autokey_crack": "polyalphabetic_ciphers",
+    "vigenere_crack_steps": "polyalphabetic_ciphers",
+    "autokey_crack_steps": "polyalphabetic_ciphers",
+    "adfgvx_encrypt": "adfgvx_cipher",
+    "adfgvx_key_matrix": "adfgvx_cipher",
+    "rc4_ksa": "rc4_cipher",
+    "rc4_prga": "rc4_cipher",
+    "rc4_keystream": "rc4_cipher",
+    "rc4_crypt_stream": "rc4_cipher",
+    "keystream_to_bits": "rc4_cipher",
+    "binary_derivative_test": "rc4_cipher",
+    "change_point_test": "rc4_cipher",
+    "des_generate_subkeys": "des_key_schedule",
+    "default_model": "language_model",
+}
+
+MODULES = tuple(sorted(set(_EXPORTS.values())))
+
+__all__ = sorted(_EXPORTS) + ["MODULES", "warm_up"]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    # حفظ القيمة حتى لا نمر عبر __getattr__ مرة أخرى
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
+
+
+def warm_up():
+    """تحميل جميع المشفرات وبناء الجداول الثابتة مسبقاً"""
+    for module_name in MODULES:
+        importlib.import_module(f".{module_name}", __name__)
+    for name in _EXPORTS:
+        __getattr__(name)
+
+    from .classical_ciphers import precompute_tables
+    precompute_tables()
+
+    # فتح ملف نموذج اللغة (memmap) حتى يتشارك العمال نفس الصفحات
+    from .language_model import default_model
+    default_model()
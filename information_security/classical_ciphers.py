@@ -0,0 +1,121 @@
+
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+ALPHABET_UP = ALPHABET.upper()
+M = 26  
+
+@lru_cache(maxsize=M)
+def _additive_table(k: int) -> Dict[int, str]:
+    shifted = ALPHABET[k:] + ALPHABET[:k]
+    return str.maketrans(ALPHABET + ALPHABET_UP, shifted + shifted.upper())
+
+def additive_encrypt(plaintext: str, key: int) -> str:
+    key = key % M
+    return plaintext.translate(_additive_table(key))
+
+def additive_decrypt(ciphertext: str, key: int) -> str:
+    return additive_encrypt(ciphertext, -key)
+
+def additive_encrypt_stream(chunks: Iterable[str], key: int) -> Iterator[str]:
+    table = _additive_table(key % M)
+    return (chunk.translate(table) for chunk in chunks)
+
+def additive_decrypt_stream(chunks: Iterable[str], key: int) -> Iterator[str]:
+    return additive_encrypt_stream(chunks, -key)
+
+def _ranked(candidates: List[Tuple[int, str]], plain_codes) -> List[Tuple[int, str, float]]:
+    # التقييم بنموذج اللغة المشترك ثم الترتيب من الأقرب للإنجليزية إلى الأبعد
+    from .language_model import default_model
+    scores = default_model().score_matrix(plain_codes)
+    results = [(k, pt, float(score)) for (k, pt), score in zip(candidates, scores)]
+    results.sort(key=lambda r: r[2], reverse=True)
+    return results
+
+def additive_bruteforce(ciphertext: str) -> List[Tuple[int, str, float]]:
+    import numpy as np
+    from .language_model import encode
+    codes = encode(ciphertext)
+    keys = np.arange(M)
+    candidates = [(k, additive_decrypt(ciphertext, k)) for k in range(M)]
+    return _ranked(candidates, (codes[None, :] - keys[:, None]) % M)
+
+
+#! ---------- Multiplicative cipher helpers ----------
+def egcd(a: int, b: int) -> Tuple[int, int, int]:
+    if b == 0:
+        return (a, 1, 0)
+    g, x1, y1 = egcd(b, a % b)
+    x = y1
+    y = x1 - (a // b) * y1
+    return (g, x, y)
+
+def modinv(a: int, m: int) -> Optional[int]:
+    g, x, _ = egcd(a, m)
+    if g != 1:
+        return None
+    return x % m
+
+@lru_cache(maxsize=M)
+def _mult_table(a: int) -> Dict[int, str]:
+    mapped = ''.join(ALPHABET[(a * idx) % M] for idx in range(M))
+    return str.maketrans(ALPHABET + ALPHABET_UP, mapped + mapped.upper())
+
+def multiplicative_encrypt(plaintext: str, a: int) -> str:
+    a = a % M
+    return plaintext.translate(_mult_table(a))
+
+def multiplicative_decrypt(ciphertext: str, a: int) -> str:
+    a = a % M
+    inv = modinv(a, M)
+    if inv is None:
+        raise ValueError(f"المفتاح a={a} غير قابل للعكس modulo {M} (gcd != 1).")
+    return ciphertext.translate(_mult_table(inv))
+
+def multiplicative_encrypt_stream(chunks: Iterable[str], a: int) -> Iterator[str]:
+    table = _mult_table(a % M)
+    return (chunk.translate(table) for chunk in chunks)
+
+def multiplicative_decrypt_stream(chunks: Iterable[str], a: int) -> Iterator[str]:
+    a = a % M
+    inv = modinv(a, M)
+    if inv is None:
+        raise ValueError(f"المفتاح a={a} غير قابل للعكس modulo {M} (gcd != 1).")
+    return multiplicative_encrypt_stream(chunks, inv)
+
+def multiplicative_bruteforce(ciphertext: str) -> List[Tuple[int, str, float]]:
+    import numpy as np
+    from .language_model import encode
+    codes = encode(ciphertext)
+    keys = [a for a in range(M) if modinv(a, M) is not None]
+    inverses = np.array([modinv(a, M) for a in keys])
+    candidates = [(a, multiplicative_decrypt(ciphertext, a)) for a in keys]
+    return _ranked(candidates, (codes[None, :] * inverses[:, None]) % M)
+
+def precompute_tables() -> None:
+    for k in range(M):
+        _additive_table(k)
+        _mult_table(k)
+
+if __name__ == "__main__":
+    plain = "Hello, World! abc XYZ"
+    print("=== Additive (shift) ===")
+    k = 3
+    c = additive_encrypt(plain, k)
+    print("Plain :", plain)
+    print(f"Encrypt (k={k}):", c)
+    print("Decrypt:", additive_decrypt(c, k))
+    print("Brute force (best 6 results):")
+    for key, candidate, score in additive_bruteforce(c)[:6]:
+        print(key, candidate, round(score, 2))
+
+    print("\n=== Multiplicative ===")
+    a = 5  
+    c2 = multiplicative_encrypt(plain, a)
+    print("Plain :", plain)
+    print(f"Encrypt (a={a}):", c2)
+    print("Decrypt:", multiplicative_decrypt(c2, a))
+    print("Brute force results:")
+    for key, candidate, score in multiplicative_bruteforce(c2):
+        print(key, candidate, round(score, 2))
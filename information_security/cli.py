@@ -0,0 +1,307 @@
+"""
+أداة سطر أوامر لمعالجة الملفات والمجلدات بالمشفرات دون الحاجة لتشغيل الـ API.
+
+أمثلة (من جذر المستودع):
+    python -m information_security encrypt vigenere --key LEMON notes.txt
+    python -m information_security decrypt rc4 --key SECRET data/ -o out/ --jobs 8
+    python -m information_security crack vigenere cipher.txt
+    cat big.txt | python -m information_security encrypt autokey --key QUEEN - > big.enc
+
+الملفات تُقرأ بـ mmap على شكل قطع، والمشفرات تحمل حالتها بين القطع،
+والنتائج تُكتب بشكل ذري (ملف مؤقت ثم os.replace).
+"""
+
+import argparse
+import codecs
+import itertools
+import mmap
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .adfgvx_cipher import adfgvx_key_matrix, find_position, LABELS
+from .classical_ciphers import (
+    additive_encrypt_stream, additive_decrypt_stream, additive_bruteforce,
+    multiplicative_encrypt_stream, multiplicative_decrypt_stream, multiplicative_bruteforce
+)
+from .playfair_cipher import playfair_encrypt_stream, playfair_decrypt_stream, playfair_crack
+from .polyalphabetic_ciphers import (
+    vigenere_encrypt_stream, vigenere_decrypt_stream,
+    autokey_encrypt_stream, autokey_decrypt_stream,
+    vigenere_crack, autokey_crack
+)
+from .rc4_cipher import rc4_crypt_stream
+
+CHUNK_SIZE = 1 << 20
+SUFFIXES = {"encrypt": ".enc", "decrypt": ".dec", "crack": ".crack"}
+
+
+def _adfgvx_encrypt_stream(chunks, key):
+    matrix = adfgvx_key_matrix(key)
+    for chunk in chunks:
+        out = []
+        for ch in chunk.upper():
+            if ch.isalnum():
+                r, c = find_position(matrix, ch)
+                out.append(LABELS[r] + LABELS[c])
+        yield ''.join(out)
+
+
+# (المشفر، العملية) -> دالة stream تأخذ قطعاً ومفتاحاً نصياً
+TEXT_STREAMS = {
+    ("additive", "encrypt"): lambda chunks, key: additive_encrypt_stream(chunks, int(key)),
+    ("additive", "decrypt"): lambda chunks, key: additive_decrypt_stream(chunks, int(key)),
+    ("multiplicative", "encrypt"): lambda chunks, key: multiplicative_encrypt_stream(chunks, int(key)),
+    ("multiplicative", "decrypt"): lambda chunks, key: multiplicative_decrypt_stream(chunks, int(key)),
+    ("vigenere", "encrypt"): vigenere_encrypt_stream,
+    ("vigenere", "decrypt"): vigenere_decrypt_stream,
+    ("autokey", "encrypt"): autokey_encrypt_stream,
+    ("autokey", "decrypt"): autokey_decrypt_stream,
+    ("playfair", "encrypt"): playfair_encrypt_stream,
+    ("playfair", "decrypt"): playfair_decrypt_stream,
+    ("adfgvx", "encrypt"): _adfgvx_encrypt_stream,
+}
+
+# المشفرات التي تعمل على البايتات مباشرة (التشفير وفكه نفس العملية)
+BYTE_STREAMS = {
+    ("rc4", "encrypt"): rc4_crypt_stream,
+    ("rc4", "decrypt"): rc4_crypt_stream,
+}
+
+def _even_letters(text):
+    letters = ''.join(ch for ch in text if ch.isalpha())
+    return letters[:len(letters) // 2 * 2]
+
+
+# المشفر -> دالة تأخذ عينة من النص المشفر وتعيد أفضل مفتاح حسب نموذج اللغة
+CRACKERS = {
+    "additive": lambda text: str(additive_bruteforce(text)[0][0]),
+    "multiplicative": lambda text: str(multiplicative_bruteforce(text)[0][0]),
+    "vigenere": lambda text: vigenere_crack(text)[0],
+    "autokey": lambda text: autokey_crack(text)[0],
+    "playfair": lambda text: playfair_crack(_even_letters(text))[0],
+}
+
+CIPHERS = ("additive", "multiplicative", "vigenere", "autokey", "playfair", "adfgvx", "rc4")
+
+
+# ---------- القراءة والكتابة ----------
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """قراءة ملف (أو stdin عند '-') على شكل قطع من البايتات"""
+    if path == "-":
+        stream = sys.stdin.buffer
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, size, chunk_size):
+                yield mm[offset:offset + chunk_size]
+
+
+def decode_chunks(chunks):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def encode_chunks(chunks):
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def write_atomic(path, chunks):
+    """الكتابة إلى ملف مؤقت في نفس المجلد ثم استبدال الهدف دفعة واحدة"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return written
+
+
+def write_stdout(chunks):
+    written = 0
+    for chunk in chunks:
+        sys.stdout.buffer.write(chunk)
+        written += len(chunk)
+    sys.stdout.buffer.flush()
+    return written
+
+
+# ---------- العمليات ----------
+
+def transform(chunks, cipher, operation, key):
+    """تحويل قطع بايتات إلى قطع بايتات مشفرة أو مفكوكة"""
+    if (cipher, operation) in BYTE_STREAMS:
+        if not key:
+            raise ValueError("المفتاح لا يجوز أن يكون فارغاً")
+        return BYTE_STREAMS[(cipher, operation)](chunks, key)
+    if (cipher, operation) not in TEXT_STREAMS:
+        raise ValueError(f"العملية {operation} غير مدعومة للمشفر {cipher}")
+    return encode_chunks(TEXT_STREAMS[(cipher, operation)](decode_chunks(chunks), key))
+
+
+def crack(chunks, cipher, sample_size, label="-"):
+    """إيجاد المفتاح من عينة من بداية النص ثم فك تشفير النص كاملاً به"""
+    if cipher not in CRACKERS:
+        raise ValueError(f"الكسر غير مدعوم للمشفر {cipher}")
+    chunks = iter(chunks)
+    buffered = []
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    sample = ""
+    for chunk in chunks:
+        buffered.append(chunk)
+        sample += decoder.decode(chunk)
+        if len(sample) >= sample_size:
+            break
+
+    key = CRACKERS[cipher](sample[:sample_size])
+    print(f"{label}: key={key}", file=sys.stderr)
+    return transform(itertools.chain(buffered, chunks), cipher, "decrypt", key)
+
+
+class _Counter:
+    """يمرر القطع كما هي ويحسب عدد البايتات المقروءة"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.total = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.total += len(chunk)
+            yield chunk
+
+
+def process_file(src, dst, cipher, operation, key, sample_size=4096, chunk_size=CHUNK_SIZE):
+    """معالجة ملف واحد، تُستدعى داخل عمليات الـ pool"""
+    started = time.perf_counter()
+    counted = _Counter(read_chunks(src, chunk_size))
+    if operation == "crack":
+        out = crack(counted, cipher, sample_size, src)
+    else:
+        out = transform(counted, cipher, operation, key)
+    written = write_stdout(out) if dst == "-" else write_atomic(dst, out)
+    return src, counted.total, written, time.perf_counter() - started
+
+
+def collect_jobs(inputs, output_dir, operation):
+    """تحويل المدخلات (ملفات ومجلدات) إلى أزواج (مصدر، هدف)"""
+    jobs = []
+    suffix = SUFFIXES[operation]
+    for item in inputs:
+        if item == "-":
+            jobs.append(("-", "-"))
+            continue
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    src = os.path.join(root, name)
+                    rel = os.path.relpath(src, item)
+                    base = os.path.join(output_dir, os.path.basename(os.path.normpath(item))) if output_dir else item
+                    jobs.append((src, os.path.join(base, rel) + suffix))
+        else:
+            base = output_dir if output_dir else os.path.dirname(item)
+            jobs.append((item, os.path.join(base, os.path.basename(item)) + suffix))
+    return jobs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m information_security",
+        description="تشفير وفك تشفير وكسر الملفات بالمشفرات المتاحة"
+    )
+    parser.add_argument("operation", choices=("encrypt", "decrypt", "crack"))
+    parser.add_argument("cipher", choices=CIPHERS)
+    parser.add_argument("inputs", nargs="+", help="ملفات أو مجلدات، أو '-' للقراءة من stdin")
+    parser.add_argument("-k", "--key", help="المفتاح (غير مطلوب مع crack)")
+    parser.add_argument("-o", "--output-dir", help="مجلد النتائج (الافتراضي: بجانب كل ملف)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="عدد العمليات المتوازية")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--sample", type=int, default=4096, help="عدد الأحرف المستخدمة في crack")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.operation != "crack" and args.key is None:
+        print("error: --key مطلوب للتشفير وفك التشفير", file=sys.stderr)
+        return 2
+
+    jobs = collect_jobs(args.inputs, args.output_dir, args.operation)
+    task_args = (args.cipher, args.operation, args.key, args.sample, args.chunk_size)
+
+    started = time.perf_counter()
+    done, failed, bytes_in, bytes_out = 0, 0, 0, 0
+
+    # stdin لا يمكن تمريره لعملية أخرى، ولا فائدة من pool لملف واحد
+    inline = [job for job in jobs if job[0] == "-"]
+    pooled = [job for job in jobs if job[0] != "-"]
+
+    for src, dst in inline:
+        try:
+            _, n_in, n_out, _ = process_file(src, dst, *task_args)
+            done, bytes_in, bytes_out = done + 1, bytes_in + n_in, bytes_out + n_out
+        except Exception as e:
+            failed += 1
+            print(f"error: stdin: {e}", file=sys.stderr)
+
+    if len(pooled) == 1 or args.jobs <= 1:
+        results = []
+        for src, dst in pooled:
+            try:
+                results.append(process_file(src, dst, *task_args))
+            except Exception as e:
+                failed += 1
+                print(f"error: {src}: {e}", file=sys.stderr)
+    else:
+        results = []
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(process_file, src, dst, *task_args): src for src, dst in pooled}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failed += 1
+                    print(f"error: {futures[future]}: {e}", file=sys.stderr)
+
+    for _, n_in, n_out, _ in results:
+        done, bytes_in, bytes_out = done + 1, bytes_in + n_in, bytes_out + n_out
+
+    elapsed = time.perf_counter() - started
+    rate = bytes_in / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(
+        f"{done} file(s) ok, {failed} failed | in {bytes_in} B, out {bytes_out} B | "
+        f"{elapsed:.3f} s | {rate:.2f} MB/s",
+        file=sys.stderr
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+نموذج لغة (n-gram) مشترك لكل أدوات كسر الشفرات.
+
+الاحتمالات اللوغاريتمية (log10) للـ unigram حتى quadgram مخزنة في مصفوفات
+مسطحة float32 مفهرسة بالرمز العددي للـ n-gram بالأساس 26:
+    "THE" -> 19*26^2 + 7*26 + 4
+الملف الثنائي يُفتح عبر numpy.memmap، لذلك التحميل فوري ويتشارك العمال
+نفس الصفحات في الذاكرة.
+
+بناء نموذج جديد من نص:
+    python -m information_security.language_model build corpus.txt -o english_ngrams.bin
+"""
+
+import argparse
+import os
+from functools import lru_cache
+
+import numpy as np
+
+M = 26
+MAX_ORDER = 4
+MAGIC = b"NGRAM\x00\x01\x00"
+HEADER_SIZE = 16
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "english_ngrams.bin")
+
+# جدول تحويل البايتات إلى رموز 0-25، و255 لكل ما ليس حرفاً
+_CODE_TABLE = np.full(256, 255, dtype=np.uint8)
+_CODE_TABLE[ord("A"):ord("Z") + 1] = np.arange(M)
+_CODE_TABLE[ord("a"):ord("z") + 1] = np.arange(M)
+
+
+def encode(text):
+    """تحويل نص إلى مصفوفة رموز uint8 (0-25) مع حذف كل ما ليس حرفاً لاتينياً"""
+    raw = np.frombuffer(text.encode("ascii", "ignore"), dtype=np.uint8)
+    codes = _CODE_TABLE[raw]
+    return codes[codes != 255]
+
+
+def decode(codes, upper=True):
+    base = ord("A") if upper else ord("a")
+    return (np.asarray(codes, dtype=np.uint8) + base).tobytes().decode("ascii")
+
+
+def ngram_indices(codes, order):
+    """الفهرس بالأساس 26 لكل n-gram متتالي في codes (يعمل على آخر محور)"""
+    codes = np.asarray(codes, dtype=np.int64)
+    length = codes.shape[-1] - order + 1
+    if length <= 0:
+        return np.zeros(codes.shape[:-1] + (0,), dtype=np.int64)
+    idx = codes[..., :length].copy()
+    for k in range(1, order):
+        idx *= M
+        idx += codes[..., k:k + length]
+    return idx
+
+
+class NgramModel:
+    """جداول log10 لاحتمالات الـ n-grams من الرتبة 1 حتى max_order"""
+
+    def __init__(self, tables):
+        self.tables = list(tables)
+        self.max_order = len(self.tables)
+        for n, table in enumerate(self.tables, start=1):
+            if table.shape != (M ** n,):
+                raise ValueError(f"جدول الرتبة {n} يجب أن يحتوي {M ** n} عنصراً")
+
+    # ---------- البناء والتخزين ----------
+
+    @classmethod
+    def build(cls, text, max_order=MAX_ORDER):
+        codes = encode(text)
+        tables = []
+        for n in range(1, max_order + 1):
+            counts = np.bincount(ngram_indices(codes, n), minlength=M ** n).astype(np.float64)
+            total = max(counts.sum(), 1.0)
+            # الـ n-grams غير الموجودة تأخذ احتمالاً صغيراً ثابتاً بدلاً من -inf
+            floor = np.log10(0.01 / total)
+            with np.errstate(divide="ignore"):
+                logp = np.where(counts > 0, np.log10(counts / total), floor)
+            tables.append(logp.astype(np.float32))
+        return cls(tables)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            header = MAGIC + np.array([self.max_order, 0], dtype="<u4").tobytes()
+            f.write(header)
+            for table in self.tables:
+                f.write(np.asarray(table, dtype="<f4").tobytes())
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:8] != MAGIC:
+            raise ValueError(f"{path} ليس ملف نموذج n-gram صالحاً")
+        max_order = int(np.frombuffer(header[8:12], dtype="<u4")[0])
+        total = sum(M ** n for n in range(1, max_order + 1))
+        flat = np.memmap(path, dtype="<f4", mode="r", offset=HEADER_SIZE, shape=(total,))
+        tables, offset = [], 0
+        for n in range(1, max_order + 1):
+            # np.asarray يزيل طبقة memmap (الفهرسة أسرع) مع بقاء البيانات على الملف
+            tables.append(np.asarray(flat[offset:offset + M ** n]))
+            offset += M ** n
+        return cls(tables)
+
+    # ---------- التقييم ----------
+
+    def _order_for(self, length, order):
+        order = self.max_order if order is None else order
+        return max(1, min(order, length))
+
+    def score_codes(self, codes, order=None):
+        """مجموع log10 لكل الـ n-grams في النص (كلما كان أكبر كان النص أقرب للإنجليزية)"""
+        n = self._order_for(len(codes), order)
+        if len(codes) == 0:
+            return 0.0
+        return float(self.tables[n - 1][ngram_indices(codes, n)].sum(dtype=np.float64))
+
+    def score(self, text, order=None):
+        return self.score_codes(encode(text), order)
+
+    def score_matrix(self, codes, order=None):
+        """تقييم عدة نصوص بنفس الطول دفعة واحدة: codes بشكل (عدد النصوص، الطول)"""
+        codes = np.asarray(codes)
+        n = self._order_for(codes.shape[-1], order)
+        return self.tables[n - 1][ngram_indices(codes, n)].sum(axis=-1, dtype=np.float64)
+
+    def score_many(self, texts, order=None):
+        """تقييم قائمة نصوص بأطوال مختلفة بعملية vectorized واحدة"""
+        encoded = [encode(t) for t in texts]
+        if not encoded:
+            return np.zeros(0)
+        lengths = np.array([len(c) for c in encoded])
+        if np.all(lengths == lengths[0]):
+            return self.score_matrix(np.stack(encoded), order)
+
+        n = self._order_for(int(lengths.max()), order)
+        scores = np.zeros(len(encoded))
+        short = lengths < n
+        for i in np.flatnonzero(short):
+            scores[i] = self.score_codes(encoded[i], order)
+
+        # دمج النصوص في مصفوفة واحدة ثم إسقاط النوافذ التي تعبر حدود النصوص
+        keep = np.flatnonzero(~short)
+        if len(keep):
+            joined = np.concatenate([encoded[i] for i in keep])
+            values = self.tables[n - 1][ngram_indices(joined, n)].astype(np.float64)
+            starts = np.concatenate(([0], np.cumsum(lengths[keep])[:-1]))
+            valid = np.ones(len(values), dtype=bool)
+            for k in range(1, n):
+                crossing = starts[1:] - k
+                valid[crossing[crossing >= 0]] = False
+            sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            scores[keep] = sums
+        return scores
+
+    def delta(self, codes, positions, new_values, order=None):
+        """
+        فرق التقييم عند تغيير الحروف في positions إلى new_values دون إعادة تقييم
+        النص كاملاً: فقط الـ n-grams التي تمر بالمواضع المتغيرة يُعاد حسابها.
+        """
+        new_values = np.broadcast_to(np.asarray(new_values), np.shape(positions))
+        return float(self.delta_many(codes, positions, new_values[None, :], order)[0])
+
+    def delta_many(self, codes, positions, candidates, order=None):
+        """
+        مثل delta لكن لعدة بدائل دفعة واحدة: candidates بشكل (عدد البدائل، len(positions))
+        ويعيد فرق التقييم لكل بديل.
+        """
+        codes = np.asarray(codes)
+        candidates = np.asarray(candidates)
+        n = self._order_for(len(codes), order)
+        positions = np.asarray(positions, dtype=np.int64)
+        last_start = len(codes) - n
+        if last_start < 0 or len(positions) == 0:
+            return np.zeros(len(candidates))
+
+        starts = (positions[:, None] - np.arange(n)[None, :]).ravel()
+        starts = np.unique(starts[(starts >= 0) & (starts <= last_start)])
+        windows = starts[:, None] + np.arange(n)[None, :]
+
+        perm = np.argsort(positions)
+        positions = positions[perm]
+        candidates = candidates[:, perm]
+
+        old = codes[windows]
+        slot = np.minimum(np.searchsorted(positions, windows), len(positions) - 1)
+        hit = positions[slot] == windows
+        new = np.broadcast_to(old, (len(candidates),) + old.shape).copy()
+        new[:, hit] = candidates[:, slot[hit]]
+
+        table = self.tables[n - 1]
+        old_score = table[ngram_indices(old, n)].sum(dtype=np.float64)
+        new_score = table[ngram_indices(new, n)].sum(axis=(-2, -1), dtype=np.float64)
+        return new_score - old_score
+
+
+@lru_cache(maxsize=None)
+def default_model():
+    """النموذج الإنجليزي المرفق مع الحزمة (يُحمل مرة واحدة عبر memmap)"""
+    return NgramModel.load(DEFAULT_PATH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="بناء ملف نموذج n-gram من نصوص")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("corpus", nargs="+", help="ملفات نصية")
+    build.add_argument("-o", "--output", default=DEFAULT_PATH)
+    build.add_argument("--max-order", type=int, default=MAX_ORDER)
+    score = sub.add_parser("score")
+    score.add_argument("text")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        text = []
+        for path in args.corpus:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                text.append(f.read())
+        model = NgramModel.build(" ".join(text), args.max_order)
+        model.save(args.output)
+        print(f"saved {args.output} (orders 1-{model.max_order})")
+    else:
+        print(default_model().score(args.text))
+
+
+if __name__ == "__main__":
+    main()
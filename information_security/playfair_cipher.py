@@ -0,0 +1,389 @@
+
+from typing import Iterable, Iterator
+
+ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ" 
+
+
+def playfair_prepare_text(text):
+    text = text.upper()
+    text = ''.join(ch for ch in text if ch.isalpha())
+    text = text.replace('J', 'I')
+
+    pairs = []
+    i = 0
+    while i < len(text):
+        a = text[i]
+        if i + 1 < len(text):
+            b = text[i + 1]
+            if a == b:
+                pairs.append(a + 'X')
+                i += 1
+            else:
+                pairs.append(a + b)
+                i += 2
+        else:
+            pairs.append(a + 'X')
+            i += 1
+
+    return pairs
+
+
+def playfair_key_matrix(key):
+    key = key.upper()
+    key = ''.join(ch for ch in key if ch.isalpha())
+    key = key.replace('J', 'I')
+
+    seen = set()
+    matrix = []
+
+    for ch in key:
+        if ch not in seen:
+            seen.add(ch)
+            matrix.append(ch)
+
+    for ch in ALPHABET:
+        if ch not in seen:
+            matrix.append(ch)
+
+    return [matrix[i:i+5] for i in range(0, 25, 5)]
+
+
+def find_position(matrix, ch):
+    for r in range(5):
+        for c in range(5):
+            if matrix[r][c] == ch:
+                return r, c
+    return None
+
+
+def playfair_encrypt(plaintext, key):
+    matrix = playfair_key_matrix(key)
+    pairs = playfair_prepare_text(plaintext)
+
+    cipher = ""
+
+    for a, b in pairs:
+        r1, c1 = find_position(matrix, a)
+        r2, c2 = find_position(matrix, b)
+
+        if r1 == r2:
+            cipher += matrix[r1][(c1 + 1) % 5]
+            cipher += matrix[r2][(c2 + 1) % 5]
+
+        elif c1 == c2:
+            cipher += matrix[(r1 + 1) % 5][c1]
+            cipher += matrix[(r2 + 1) % 5][c2]
+
+        else:
+            cipher += matrix[r1][c2]
+            cipher += matrix[r2][c1]
+
+    return cipher
+
+
+def playfair_decrypt(ciphertext, key):
+    matrix = playfair_key_matrix(key)
+    pairs = [ciphertext[i:i+2] for i in range(0, len(ciphertext), 2)]
+
+    plaintext = ""
+
+    for a, b in pairs:
+        r1, c1 = find_position(matrix, a)
+        r2, c2 = find_position(matrix, b)
+
+        if r1 == r2:
+            plaintext += matrix[r1][(c1 - 1) % 5]
+            plaintext += matrix[r2][(c2 - 1) % 5]
+
+        elif c1 == c2:
+            plaintext += matrix[(r1 - 1) % 5][c1]
+            plaintext += matrix[(r2 - 1) % 5][c2]
+
+        else:
+            plaintext += matrix[r1][c2]
+            plaintext += matrix[r2][c1]
+
+    return plaintext
+
+
+def _position_map(matrix):
+    return {ch: (r, c) for r, row in enumerate(matrix) for c, ch in enumerate(row)}
+
+
+def _playfair_pair(matrix, positions, a, b, step):
+    r1, c1 = positions[a]
+    r2, c2 = positions[b]
+
+    if r1 == r2:
+        return matrix[r1][(c1 + step) % 5] + matrix[r2][(c2 + step) % 5]
+    if c1 == c2:
+        return matrix[(r1 + step) % 5][c1] + matrix[(r2 + step) % 5][c2]
+    return matrix[r1][c2] + matrix[r2][c1]
+
+
+def _playfair_encrypt_stream(chunks, matrix):
+    positions = _position_map(matrix)
+    pending = None  # حرف ينتظر شريكه في القطعة التالية
+
+    for chunk in chunks:
+        out = []
+        for ch in chunk.upper():
+            if ch == 'J':
+                ch = 'I'
+            elif ch not in positions:
+                continue
+            if pending is None:
+                pending = ch
+            elif pending == ch:
+                out.append(_playfair_pair(matrix, positions, pending, 'X', 1))
+                pending = ch
+            else:
+                out.append(_playfair_pair(matrix, positions, pending, ch, 1))
+                pending = None
+        yield ''.join(out)
+
+    if pending is not None:
+        yield _playfair_pair(matrix, positions, pending, 'X', 1)
+
+
+def _playfair_decrypt_stream(chunks, matrix):
+    positions = _position_map(matrix)
+    pending = None
+
+    for chunk in chunks:
+        out = []
+        # نفس تنظيف التشفير: حروف كبيرة، J تصبح I، وكل ما ليس في المصفوفة يُتجاهل
+        for ch in chunk.upper():
+            if ch == 'J':
+                ch = 'I'
+            elif ch not in positions:
+                continue
+            if pending is None:
+                pending = ch
+            else:
+                out.append(_playfair_pair(matrix, positions, pending, ch, -1))
+                pending = None
+        yield ''.join(out)
+
+    if pending is not None:
+        raise ValueError("طول النص المشفر يجب أن يكون زوجياً")
+
+
+def playfair_encrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _playfair_encrypt_stream(chunks, playfair_key_matrix(key))
+
+
+def playfair_decrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _playfair_decrypt_stream(chunks, playfair_key_matrix(key))
+
+
+# ---------- Cryptanalysis ----------
+
+def _position_tables():
+    # قواعد Playfair تعتمد على المواضع فقط، لذلك نحسب مسبقاً لكل زوج مواضع
+    # (0-24, 0-24) موضعي الناتج عند فك التشفير، ثم يكفي البحث في المصفوفة
+    out_a = [[0] * 25 for _ in range(25)]
+    out_b = [[0] * 25 for _ in range(25)]
+    for pa in range(25):
+        for pb in range(25):
+            r1, c1 = divmod(pa, 5)
+            r2, c2 = divmod(pb, 5)
+            if r1 == r2:
+                out_a[pa][pb] = r1 * 5 + (c1 - 1) % 5
+                out_b[pa][pb] = r2 * 5 + (c2 - 1) % 5
+            elif c1 == c2:
+                out_a[pa][pb] = ((r1 - 1) % 5) * 5 + c1
+                out_b[pa][pb] = ((r2 - 1) % 5) * 5 + c2
+            else:
+                out_a[pa][pb] = r1 * 5 + c2
+                out_b[pa][pb] = r2 * 5 + c1
+    return out_a, out_b
+
+
+# نسبة تبديل حرفين بين الحركات، والباقي تبديل صفوف أو أعمدة أو قلب المصفوفة
+SWAP_SHARE = 0.9
+# عدد سلاسل الـ annealing التي تتقدم معاً: كل خطوة تفك وتُقيّم مرشحاً لكل سلسلة
+# بعملية numpy واحدة
+CRACK_CHAINS = 64
+# حرارة ثابتة لكل سلسلة (لكل حرف من النص) موزعة على هذا المدى: المفتاح الصحيح
+# يُلتقط قرب 0.03، والسلاسل الأسخن تتجول ولا تستقر والأبرد تعلق في قمم زائفة
+CRACK_TEMPERATURE = (0.025, 0.032)
+# كل هذا العدد من الخطوات تأخذ أسوأ ربع من السلاسل مصفوفات أفضل ربع
+CRACK_RESAMPLE = 2000
+# النص يُعتبر إنجليزياً إذا كان تقييمه لا يقل عن هذا المضاعف من متوسط تقييم
+# الإنجليزية نفسها تحت النموذج (entropy النموذج)
+PLAUSIBLE_FACTOR = 1.25
+
+
+def _moves():
+    # كل حركة ترتيب جديد للمواضع الـ 25: تبديلات الأحرف، ثم تبديل الصفوف والأعمدة والقلب
+    import numpy as np
+
+    grid = np.arange(25).reshape(5, 5)
+    swaps, others = [], []
+    for i in range(25):
+        for j in range(i + 1, 25):
+            move = np.arange(25)
+            move[[i, j]] = j, i
+            swaps.append(move)
+    for i in range(5):
+        for j in range(i + 1, 5):
+            order = list(range(5))
+            order[i], order[j] = j, i
+            others.append(grid[order].ravel())
+            others.append(grid[:, order].ravel())
+    others.append(grid[::-1].ravel())
+    others.append(grid[:, ::-1].ravel())
+    return np.array(swaps), np.array(others)
+
+
+def _square_decrypt(squares, a, b, table):
+    # فك تشفير كل الأزواج لعدة مصفوفات دفعة واحدة بمصفوفات numpy
+    # squares: رموز الأحرف الـ 25 (0-25) بترتيب كل مصفوفة بشكل (عدد المصفوفات، 25)،
+    # a و b: رموز الأزواج، table: موضعا الناتج لكل pa * 25 + pb بشكل (625، 2)
+    import numpy as np
+
+    count = len(squares)
+    pos = np.empty((count, 26), dtype=squares.dtype)
+    pos[np.arange(count)[:, None], squares] = np.arange(25, dtype=squares.dtype)
+    flat = pos[:, a] * 25
+    flat += pos[:, b]
+    # take على مصفوفات مسطحة أسرع بكثير من الفهرسة المتقدمة ثنائية الأبعاد
+    offsets = (np.arange(count, dtype=squares.dtype) * 25)[:, None]
+    return squares.ravel().take(table.take(flat, axis=0).reshape(count, -1) + offsets)
+
+
+def _quadgram_scores(plain, quadgrams):
+    # مثل NgramModel.score_matrix للرتبة 4 لكن عبر أزواج الأحرف: عمليات أقل
+    # على مصفوفات int32
+    pairs = plain[:, :-1] * 26
+    pairs += plain[:, 1:]
+    index = pairs[:, :-2] * 676
+    index += pairs[:, 2:]
+    return quadgrams.take(index).sum(axis=1, dtype=float)
+
+
+def _plausible_score(model, length):
+    # متوسط log10 لـ n-gram من الإنجليزية تحت النموذج نفسه، مضروباً في عدد النوافذ
+    import numpy as np
+
+    order = max(1, min(model.max_order, length))
+    table = model.tables[order - 1].astype(np.float64)
+    entropy = float((10 ** table * table).sum())
+    return PLAUSIBLE_FACTOR * entropy * (length - order + 1)
+
+
+def playfair_plausible(plaintext, model=None):
+    """هل يبدو النص (بعد فك التشفير) إنجليزياً بما يكفي لاعتبار المفتاح صحيحاً؟"""
+    from .language_model import default_model, encode
+
+    model = model or default_model()
+    codes = encode(plaintext)
+    return len(codes) > 0 and model.score_codes(codes) >= _plausible_score(model, len(codes))
+
+
+def playfair_crack(ciphertext, iterations=30000, restarts=8, seed=None, model=None):
+    """
+    إيجاد مفتاح Playfair بـ simulated annealing على مصفوفة المفتاح،
+    يعيد (مصفوفة المفتاح كنص من 25 حرفاً، النص الأصلي، التقييم).
+    كل إعادة تشغّل CRACK_CHAINS سلسلة لـ iterations خطوة، ويتوقف البحث عند أول
+    مفتاح يعطي نصاً إنجليزياً (playfair_plausible)، وإلا يعيد أفضل ما وجده.
+    نص من 200 حرف تقريباً يُحل عادة في الإعادة الأولى أو الثانية.
+    """
+    import numpy as np
+    from .language_model import default_model, encode
+
+    model = model or default_model()
+    codes = encode(ciphertext.upper().replace('J', 'I')).astype(np.intp)
+    if len(codes) < 2 or len(codes) % 2:
+        raise ValueError("طول النص المشفر يجب أن يكون زوجياً")
+    if model.max_order < 4 or len(codes) < 4:
+        raise ValueError("كسر Playfair يحتاج نموذج quadgram ونصاً من 4 أحرف على الأقل")
+    a, b = codes[0::2], codes[1::2]
+    quadgrams = model.tables[3]
+
+    table = np.stack([np.ravel(t) for t in _position_tables()], axis=1).astype(np.int32)
+    swaps, others = _moves()
+    moves = np.concatenate([swaps, others])
+    # احتمال كل حركة، ثم السحب بـ searchsorted على المجموع التراكمي
+    weights = np.concatenate([np.full(len(swaps), SWAP_SHARE / len(swaps)),
+                              np.full(len(others), (1 - SWAP_SHARE) / len(others))])
+    cumulative = np.cumsum(weights)
+    cumulative[-1] = 1.0
+
+    rng = np.random.default_rng(seed)
+    letters = np.array([ord(ch) - ord('A') for ch in ALPHABET], dtype=np.int32)
+    # فروق التقييم تكبر مع طول النص، لذلك الحرارة متناسبة مع الطول
+    temperatures = np.linspace(*CRACK_TEMPERATURE, CRACK_CHAINS) * len(codes)
+    quarter = CRACK_CHAINS // 4
+    target = _plausible_score(model, len(codes))
+    best_square, best_score = None, -np.inf
+
+    for _ in range(restarts):
+        squares = np.array([rng.permutation(letters) for _ in range(CRACK_CHAINS)])
+        scores = _quadgram_scores(_square_decrypt(squares, a, b, table), quadgrams)
+        finish = iterations
+
+        for step in range(1, iterations + 1):
+            picked = moves[np.searchsorted(cumulative, rng.random(CRACK_CHAINS))]
+            children = np.take_along_axis(squares, picked, axis=1)
+            child_scores = _quadgram_scores(_square_decrypt(children, a, b, table), quadgrams)
+            diff = child_scores - scores
+            accept = (diff >= 0) | (rng.random(CRACK_CHAINS) < np.exp(np.minimum(diff, 0) / temperatures))
+            squares[accept] = children[accept]
+            scores[accept] = child_scores[accept]
+
+            if step % CRACK_RESAMPLE == 0:
+                # السلاسل العالقة تكمل من أفضل المصفوفات بحرارتها هي
+                order = np.argsort(scores)
+                squares[order[:quarter]] = squares[order[-quarter:]]
+                scores[order[:quarter]] = scores[order[-quarter:]]
+            # أول وصول للعتبة يكون غالباً لمفتاح قريب من الصحيح لا الصحيح نفسه،
+            # فتستمر السلاسل فترة إعادة توزيع أخرى لتستقر عليه
+            if finish == iterations and scores.max() >= target:
+                finish = min(iterations, step + CRACK_RESAMPLE)
+            if step >= finish:
+                break
+
+        top = int(np.argmax(scores))
+        if scores[top] > best_score:
+            best_square, best_score = squares[top].copy(), float(scores[top])
+        if best_score >= target:
+            break
+
+    # قد يبقى حرفان في غير مكانهما: تحسين جشع يجرب كل الحركات على أفضل
+    # مصفوفة دفعة واحدة حتى لا تتحسن
+    while True:
+        children = best_square[moves]
+        child_scores = _quadgram_scores(_square_decrypt(children, a, b, table), quadgrams)
+        top = int(np.argmax(child_scores))
+        if child_scores[top] <= best_score:
+            break
+        best_square, best_score = children[top], float(child_scores[top])
+
+    key = ''.join(chr(ord('A') + int(c)) for c in best_square)
+    return key, playfair_decrypt(''.join(chr(ord('A') + int(c)) for c in codes), key), best_score
+
+
+if __name__ == "__main__":
+    key = "MONARCHY"
+    plaintext = "BALLOON"
+
+    print("Key:", key)
+    print("Plaintext:", plaintext)
+
+    cipher = playfair_encrypt(plaintext, key)
+    print("Encrypted:", cipher)
+
+    decrypted = playfair_decrypt(cipher, key)
+    print("Decrypted:", decrypted)
+
+    print("\n=== Cracking ===")
+    # نص من 200 حرف تقريباً: يجب أن يُسترجع كاملاً
+    text = ("The history of cryptography begins thousands of years ago. Until recent decades it has been "
+            "the story of what might be called classical cryptography, that is, of methods of encryption "
+            "that use pen and paper, or perhaps simple mechanical aids.")
+    cipher = playfair_encrypt(text, key)
+    found, recovered, score = playfair_crack(cipher, seed=0)
+    print("Key matrix:", found)
+    print("Recovered :", recovered == playfair_decrypt(cipher, key), round(score, 1))
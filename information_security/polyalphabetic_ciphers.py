@@ -0,0 +1,252 @@
+
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+ALPH = "abcdefghijklmnopqrstuvwxyz"
+ALPH_UP = ALPH.upper()
+M = 26
+
+def _is_alpha(ch: str) -> bool:
+    return ch.isalpha()
+
+def _char_to_index(ch: str) -> int:
+    return ALPH.index(ch.lower())
+
+def _index_to_char(idx: int, is_upper: bool) -> str:
+    idx %= M
+    return ALPH_UP[idx] if is_upper else ALPH[idx]
+
+def _sanitize_key(key: str) -> str:
+    return ''.join(ch.lower() for ch in key if ch.isalpha())
+
+
+def _require_key(key: str) -> str:
+    key_clean = _sanitize_key(key)
+    if not key_clean:
+        raise ValueError("المفتاح لا يجوز أن يكون فارغاً أو لا يحتوي أحرفاً أبجدية.")
+    return key_clean
+
+
+# ---------- Vigenere ----------
+# نسخ الـ stream تعالج النص على شكل قطع وتحمل الحالة (ki) من قطعة لأخرى،
+# وتُنتج قطعة واحدة لكل قطعة مدخلة.
+def _vigenere_stream(chunks: Iterable[str], key_clean: str, sign: int) -> Iterator[str]:
+    ki = 0
+    key_len = len(key_clean)
+
+    for chunk in chunks:
+        out_chars: List[str] = []
+        for ch in chunk:
+            if not _is_alpha(ch):
+                out_chars.append(ch)
+                continue
+            k = _char_to_index(key_clean[ki % key_len])
+            c_idx = _char_to_index(ch)
+            out_idx = (c_idx + sign * k) % M
+            out_chars.append(_index_to_char(out_idx, ch.isupper()))
+            ki += 1
+        yield ''.join(out_chars)
+
+
+def vigenere_encrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _vigenere_stream(chunks, _require_key(key), 1)
+
+
+def vigenere_decrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _vigenere_stream(chunks, _require_key(key), -1)
+
+
+def vigenere_encrypt(plaintext: str, key: str) -> str:
+    return ''.join(vigenere_encrypt_stream([plaintext], key))
+
+
+def vigenere_decrypt(ciphertext: str, key: str) -> str:
+    return ''.join(vigenere_decrypt_stream([ciphertext], key))
+
+
+# ---------- AutoKey ----------
+# الـ keystream هو المفتاح متبوعاً بأحرف النص الأصلي، لذلك يكفي الاحتفاظ
+# بآخر len(key) حرف من النص الأصلي بين القطع.
+def _autokey_stream(chunks: Iterable[str], key_clean: str, sign: int) -> Iterator[str]:
+    history = deque(key_clean)
+
+    for chunk in chunks:
+        out_chars: List[str] = []
+        for ch in chunk:
+            if not _is_alpha(ch):
+                out_chars.append(ch)
+                continue
+            k = _char_to_index(history.popleft())
+            in_idx = _char_to_index(ch)
+            out_idx = (in_idx + sign * k) % M
+            out_chars.append(_index_to_char(out_idx, ch.isupper()))
+            p_idx = in_idx if sign > 0 else out_idx
+            history.append(_index_to_char(p_idx, False))
+        yield ''.join(out_chars)
+
+
+def autokey_encrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _autokey_stream(chunks, _require_key(key), 1)
+
+
+def autokey_decrypt_stream(chunks: Iterable[str], key: str) -> Iterator[str]:
+    return _autokey_stream(chunks, _require_key(key), -1)
+
+
+def autokey_encrypt(plaintext: str, key: str) -> str:
+    return ''.join(autokey_encrypt_stream([plaintext], key))
+
+
+def autokey_decrypt(ciphertext: str, key: str) -> str:
+    return ''.join(autokey_decrypt_stream([ciphertext], key))
+
+
+
+# ---------- Cryptanalysis ----------
+# كلا المشفرين دوريان: حرف المفتاح رقم j يحدد وحده حروف العمود j (المواضع
+# j, j+L, j+2L, ...)، لذلك نبحث عن المفتاح بـ hill climbing عمود بعمود
+# مع تقييم تدريجي (delta) بنموذج اللغة بدلاً من إعادة تقييم النص كاملاً.
+
+def _climb_columns(model, length: int, key_len: int,
+                   column_plain: Callable, max_rounds: int = 20):
+    import numpy as np
+
+    columns = [np.arange(j, length, key_len) for j in range(key_len)]
+    shifts = np.arange(M)
+
+    # البداية: لكل عمود الحرف الذي يعطي أفضل توزيع أحرف (unigram)
+    key = np.zeros(key_len, dtype=np.int64)
+    for j in range(key_len):
+        candidates = column_plain(j, shifts[:, None])
+        key[j] = int(np.argmax(model.score_matrix(candidates, order=1)))
+
+    plain = np.zeros(length, dtype=np.int64)
+    for j in range(key_len):
+        plain[columns[j]] = column_plain(j, key[j])
+    score = model.score_codes(plain)
+
+    for _ in range(max_rounds):
+        improved = False
+        for j in range(key_len):
+            deltas = model.delta_many(plain, columns[j], column_plain(j, shifts[:, None]))
+            best_k = int(np.argmax(deltas))
+            best_delta = float(deltas[best_k])
+            if best_delta > 1e-9 and best_k != key[j]:
+                key[j] = best_k
+                plain[columns[j]] = column_plain(j, best_k)
+                score += best_delta
+                improved = True
+        if not improved:
+            break
+
+    return key, score
+
+
+def _key_to_str(key) -> str:
+    return ''.join(ALPH[int(k)] for k in key)
+
+
+def _better(score: float, best) -> bool:
+    # مضاعفات طول المفتاح الصحيح تعطي نفس النص تقريباً، لذلك لا نقبل مفتاحاً
+    # أطول إلا إذا حسّن التقييم بوضوح (1%)
+    return best is None or score > best[1] + 0.01 * abs(best[1])
+
+
+def _crack_steps(codes, max_key_length: int, model,
+                 column_solver: Callable) -> Iterator[Tuple[int, int, str, float]]:
+    total = max(1, min(max_key_length, len(codes) // 2))
+    best = None
+    for L in range(1, total + 1):
+        key, score = _climb_columns(model, len(codes), L, column_solver(L))
+        if _better(score, best):
+            best = (key, score)
+        yield L, total, _key_to_str(best[0]), best[1]
+
+
+def _crack_codes(ciphertext: str):
+    import numpy as np
+    from .language_model import encode
+
+    codes = encode(ciphertext).astype(np.int64)
+    if len(codes) == 0:
+        raise ValueError("النص المشفر لا يحتوي أحرفاً")
+    return codes
+
+
+def vigenere_crack_steps(ciphertext: str, max_key_length: int = 20,
+                         model=None) -> Iterator[Tuple[int, int, str, float]]:
+    """
+    نفس بحث vigenere_crack طولاً بطول: بعد كل طول مفتاح يُنتج
+    (الطول، عدد الأطوال، أفضل مفتاح حتى الآن، تقييمه)
+    """
+    from .language_model import default_model
+
+    model = model or default_model()
+    codes = _crack_codes(ciphertext)
+    return _crack_steps(codes, max_key_length, model,
+                        lambda L: lambda j, k: (codes[j::L] - k) % M)
+
+
+def vigenere_crack(ciphertext: str, max_key_length: int = 20,
+                   model=None) -> Tuple[str, str, float]:
+    """إيجاد مفتاح Vigenere دون معرفته، يعيد (المفتاح، النص الأصلي، التقييم)"""
+    for _, _, key, score in vigenere_crack_steps(ciphertext, max_key_length, model):
+        pass
+    return key, vigenere_decrypt(ciphertext, key), score
+
+
+def autokey_crack_steps(ciphertext: str, max_key_length: int = 12,
+                        model=None) -> Iterator[Tuple[int, int, str, float]]:
+    """
+    نفس بحث autokey_crack طولاً بطول: بعد كل طول مفتاح يُنتج
+    (الطول، عدد الأطوال، أفضل مفتاح حتى الآن، تقييمه)
+    """
+    import numpy as np
+    from .language_model import default_model
+
+    model = model or default_model()
+    codes = _crack_codes(ciphertext)
+
+    def column_solver(L):
+        # p_t = c_t - p_(t-L)  =>  p_t = (-1)^t * (sum_(u<=t) (-1)^u c_u - k)
+        prefix = []
+        for j in range(L):
+            col = codes[j::L]
+            sign = np.where(np.arange(len(col)) % 2 == 0, 1, -1)
+            prefix.append((sign, np.cumsum(sign * col)))
+        return lambda j, k: (prefix[j][0] * (prefix[j][1] - k)) % M
+
+    return _crack_steps(codes, max_key_length, model, column_solver)
+
+
+def autokey_crack(ciphertext: str, max_key_length: int = 12,
+                  model=None) -> Tuple[str, str, float]:
+    """إيجاد مفتاح AutoKey دون معرفته، يعيد (المفتاح، النص الأصلي، التقييم)"""
+    for _, _, key, score in autokey_crack_steps(ciphertext, max_key_length, model):
+        pass
+    return key, autokey_decrypt(ciphertext, key), score
+
+
+if __name__ == "__main__":
+    plain = "Attack at dawn! 123"
+    v_key = "LEMON"
+    print("=== Vigenere ===")
+    c_v = vigenere_encrypt(plain, v_key)
+    print("Plain :", plain)
+    print("Key   :", v_key)
+    print("Cipher:", c_v)
+    print("Decrypt:", vigenere_decrypt(c_v, v_key))
+
+    print("\n=== AutoKey ===")
+    a_key = "QUEEN"
+    c_a = autokey_encrypt(plain, a_key)
+    print("Plain :", plain)
+    print("Key   :", a_key)
+    print("Cipher:", c_a)
+    print("Decrypt:", autokey_decrypt(c_a, a_key))
+
+    print("\n=== Cracking ===")
+    text = ("It was the best of times, it was the worst of times, it was the age of "
+            "wisdom, it was the age of foolishness, it was the epoch of belief.")
+    print("Vigenere:", vigenere_crack(vigenere_encrypt(text, "LEMON"))[0])
+    print("AutoKey :", autokey_crack(autokey_encrypt(text, "QUEEN"))[0])
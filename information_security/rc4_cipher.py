@@ -32,28 +32,39 @@ def rc4_keystream(key, length):
     return rc4_prga(S, length)
 
 
+def rc4_crypt_stream(chunks, key):
+    # نفس الـ PRGA لكن الحالة (S, i, j) تبقى بين القطع، والتشفير وفكه نفس العملية
+    S = rc4_ksa(key)
+    i = 0
+    j = 0
+
+    for chunk in chunks:
+        out = bytearray(len(chunk))
+        for n, byte in enumerate(chunk):
+            i = (i + 1) % 256
+            j = (j + S[i]) % 256
+            S[i], S[j] = S[j], S[i]
+            out[n] = byte ^ S[(S[i] + S[j]) % 256]
+        yield bytes(out)
+
+
 def keystream_to_bits(keystream):
-    bits = ""
-    for byte in keystream:
-        bits += format(byte, '08b')
-    return bits
+    # join بدلاً من += حتى يبقى البناء خطياً في طول الـ keystream
+    return ''.join(format(byte, '08b') for byte in keystream)
 
 
 def binary_derivative_test(bits):
-    
-    derivative = ""
-    for i in range(len(bits) - 1):
-        derivative += str(int(bits[i]) ^ int(bits[i + 1]))
-    return derivative
+    # bits[i] XOR bits[i + 1] لكل الخانات مرة واحدة: XOR العدد مع نفسه مزاحاً بخانة
+    n = len(bits) - 1
+    if n <= 0:
+        return ""
+    value = int(bits, 2)
+    return format((value ^ (value >> 1)) & ((1 << n) - 1), f'0{n}b')
 
 
 def change_point_test(bits):
     
-    changes = 0
-    for i in range(len(bits) - 1):
-        if bits[i] != bits[i + 1]:
-            changes += 1
-    return changes
+    return binary_derivative_test(bits).count('1')
 
 
 if __name__ == "__main__":